@@ -1,7 +1,7 @@
 
 from blenderproc.python.types.StructUtility import Struct
 from blenderproc.python.types.EntityUtility import Entity
-from blenderproc.python.types.MeshObjectUtility import MeshObject
+from blenderproc.python.types.MeshObjectUtility import MeshObject, MultiObjectBVHTree
 from blenderproc.python.types.LightUtility import Light
 from blenderproc.python.types.MaterialUtility import Material
 from blenderproc.python.types.ArmatureUtility import Armature
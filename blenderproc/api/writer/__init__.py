@@ -1,4 +1,6 @@
 from blenderproc.python.writer.GifWriterUtility import write_gif_animation
 from blenderproc.python.writer.BopWriterUtility import write_bop
-from blenderproc.python.writer.CocoWriterUtility import write_coco_annotations
+from blenderproc.python.writer.CocoWriterUtility import write_coco_annotations, finalize_coco_annotations
 from blenderproc.python.writer.WriterUtility import write_hdf5
+from blenderproc.python.writer.AsyncWriterUtility import AsyncHdf5Writer
+from blenderproc.python.writer.ShardedWriterUtility import HDF5ShardWriter, load_shard_index
@@ -13,6 +13,8 @@
 # pylint: disable=wrong-import-position
 from blenderproc.python.utility.SetupUtility import SetupUtility
 from blenderproc.python.utility.InstallUtility import InstallUtility
+from blenderproc.python.utility.WorkerUtility import WorkerUtility
+from blenderproc.python.utility.BatchUtility import BatchRunner
 # pylint: enable=wrong-import-position
 
 
@@ -58,6 +60,13 @@ def cli():
     parser_debug = subparsers.add_parser('debug', help="Runs the BlenderProc pipeline in debug mode. This will open "
                                                        "the Blender UI, so the 3D scene created by the pipeline "
                                                        "can be visually inspected.")
+    parser_serve = subparsers.add_parser('serve', help="Starts a persistent blender worker, which executes the jobs "
+                                                       "submitted to the given job directory one after another "
+                                                       "without restarting blender.")
+    parser_submit = subparsers.add_parser('submit', help="Submits a job to the job directory of a worker started "
+                                                         "via 'blenderproc serve'.")
+    parser_batch = subparsers.add_parser('batch', help="Runs the BlenderProc pipeline on many scene files in "
+                                                       "parallel, using multiple blender processes.")
     parser_vis = subparsers.add_parser('vis', help=f"Visualize the content of BlenderProc output files. \n"
                                                    f"Options: {', '.join(options['vis'])}",
                                        formatter_class=argparse.RawTextHelpFormatter)
@@ -94,9 +103,46 @@ def cli():
                                  'folder, but into blenders python site-packages folder. This should only be used, '
                                  'if a specific pip package cannot be installed into a custom package path.')
 
+    parser_serve.add_argument('job_dir', help='The job directory, jobs are taken from its "pending" folder and their '
+                                              'status is written into its "finished" folder.')
+    parser_serve.add_argument('--idle-timeout', dest='idle_timeout', type=float, default=0,
+                              help="Stops the worker after this many seconds without a pending job. Default: 0, "
+                                   "which means the worker runs until a stop is requested.")
+    parser_serve.add_argument('--max-jobs-per-process', dest='max_jobs_per_process', type=int, default=0,
+                              help="Restarts blender after this many jobs, this bounds the memory growth of long "
+                                   "runs. Default: 0, which means blender is never restarted.")
+    parser_submit.add_argument('job_dir', help='The job directory of the worker.')
+    parser_submit.add_argument('file', nargs='?', default=None,
+                               help='The path to a python file which uses BlenderProc via the API. All additional '
+                                    'arguments are given to this script.')
+    parser_submit.add_argument('--stop', dest='stop', action='store_true',
+                               help="If set, all workers of the job directory are stopped after their current job.")
+
+    parser_batch.add_argument('--scenes', dest='scenes', required=True,
+                              help='A glob pattern matching all scene files, e.g. "3D-FRONT/*.json". In the script '
+                                   'arguments {scene}, {scene_name} and {index} are replaced by the path of the scene, '
+                                   'its file name without extension and its index.')
+    parser_batch.add_argument('--num-workers', dest='num_workers', type=int, default=1,
+                              help="The number of blender processes running in parallel. Default: 1.")
+    parser_batch.add_argument('--threads-per-worker', dest='threads_per_worker', type=int, default=0,
+                              help="The number of cpu threads used by each worker. Default: 0, which means the "
+                                   "available cores are split evenly among the workers.")
+    parser_batch.add_argument('--skip-if-exists', dest='skip_if_exists', default=None,
+                              help='A glob pattern, scenes for which it matches any file are skipped, '
+                                   'e.g. "output/{scene_name}*.png".')
+    parser_batch.add_argument('--max-retries', dest='max_retries', type=int, default=1,
+                              help="How often a failed or crashed scene is retried. Default: 1.")
+    parser_batch.add_argument('--manifest', dest='manifest', default="batch_manifest.json",
+                              help="The json file containing status, timings and errors of all scenes. Scenes "
+                                   "which succeeded according to an existing manifest are skipped. "
+                                   "Default: batch_manifest.json")
+    parser_batch.add_argument('--max-jobs-per-process', dest='max_jobs_per_process', type=int, default=0,
+                              help="Restarts a worker after this many scenes. Default: 0, which means workers are "
+                                   "never restarted.")
+
     # Setup all common arguments of run and debug mode
-    for subparser in [parser_run, parser_debug, parser_quickstart]:
-        if subparser != parser_quickstart:
+    for subparser in [parser_run, parser_debug, parser_quickstart, parser_serve, parser_batch]:
+        if subparser not in [parser_quickstart, parser_serve]:
             subparser.add_argument('file', help='The path to a python file which uses BlenderProc via the API.')
 
         subparser.add_argument('--reinstall-blender', dest='reinstall_blender', action='store_true',
@@ -113,7 +159,7 @@ def cli():
                                     "based on pip freeze.")
 
     # Setup common arguments of run, debug and pip mode
-    for subparser in [parser_run, parser_debug, parser_pip, parser_quickstart]:
+    for subparser in [parser_run, parser_debug, parser_pip, parser_quickstart, parser_serve, parser_batch]:
         subparser.add_argument('--blender-install-path', dest='blender_install_path', default=None,
                                help="Set path where blender should be installed. If None is given, "
                                     "/home_local/<env:USER>/blender/ is used per default.")
@@ -128,7 +174,7 @@ def cli():
         from blenderproc import __version__
         # pylint: enable=import-outside-toplevel
         print(__version__)
-    elif args.mode in ["run", "debug", "quickstart"]:
+    elif args.mode in ["run", "debug", "quickstart", "serve", "batch"]:
 
         # Install blender, if not already done
         determine_result = InstallUtility.determine_blender_install_path(args)
@@ -142,6 +188,17 @@ def cli():
             path_src_run = os.path.join(repo_root_directory, "blenderproc", "scripts", "quickstart.py")
             args.file = path_src_run
             print(f"'blenderproc quickstart' is an alias for 'blenderproc run {path_src_run}'")
+        elif args.mode == "batch":
+            SetupUtility.check_if_setup_utilities_are_at_the_top(args.file)
+            path_src_run = os.path.join(repo_root_directory, "blenderproc", "serve_startup.py")
+        elif args.mode == "serve":
+            path_src_run = os.path.join(repo_root_directory, "blenderproc", "serve_startup.py")
+            args.file = path_src_run
+            args.job_dir = os.path.abspath(args.job_dir)
+            WorkerUtility.prepare_job_dir(args.job_dir)
+            WorkerUtility.clear_stop_request(args.job_dir)
+            unknown_args = [args.job_dir, "--idle-timeout", str(args.idle_timeout),
+                            "--max-jobs", str(args.max_jobs_per_process)] + unknown_args
         else:
             path_src_run = args.file
             SetupUtility.check_if_setup_utilities_are_at_the_top(path_src_run)
@@ -158,42 +215,75 @@ def cli():
         if args.force_pip_update:
             SetupUtility.clean_installed_packages_cache(os.path.dirname(blender_run_path), major_version)
 
-        # Run either in debug or in normal mode
-        if args.mode == "debug":
-            # pylint: disable=consider-using-with
-            p = subprocess.Popen([blender_run_path, "--python-use-system-env", "--python-exit-code", "0", "--python",
-                                  os.path.join(repo_root_directory, "blenderproc/debug_startup.py"), "--",
-                                  path_src_run, temp_dir] + unknown_args,
-                                 env=used_environment)
-            # pylint: enable=consider-using-with
-        else:
-            # pylint: disable=consider-using-with
-            p = subprocess.Popen([blender_run_path, "--background", "--python-use-system-env", "--python-exit-code",
-                                  "2", "--python", path_src_run, "--", args.file, temp_dir] + unknown_args,
-                                 env=used_environment)
-            # pylint: enable=consider-using-with
-
         def clean_temp_dir():
             # If temp dir should not be kept and temp dir still exists => remove it
             if not args.keep_temp_dir and os.path.exists(temp_dir):
                 print("Cleaning temporary directory")
                 shutil.rmtree(temp_dir)
 
+        if args.mode == "batch":
+            batch_runner = BatchRunner(args.file, args.scenes, unknown_args, args.num_workers, args.manifest, temp_dir,
+                                       args.threads_per_worker, args.skip_if_exists, args.max_retries,
+                                       args.max_jobs_per_process)
+            signal.signal(signal.SIGTERM, lambda _signum, _frame: batch_runner.terminate())
+            try:
+                return_code = batch_runner.run([blender_run_path, "--background", "--python-use-system-env",
+                                                "--python-exit-code", "2", "--python", path_src_run, "--",
+                                                path_src_run], used_environment)
+            finally:
+                clean_temp_dir()
+            sys.exit(return_code)
+
+        def start_blender() -> subprocess.Popen:
+            # Run either in debug or in normal mode
+            if args.mode == "debug":
+                # pylint: disable=consider-using-with
+                return subprocess.Popen([blender_run_path, "--python-use-system-env", "--python-exit-code", "0",
+                                         "--python", os.path.join(repo_root_directory, "blenderproc/debug_startup.py"),
+                                         "--", path_src_run, temp_dir] + unknown_args,
+                                        env=used_environment)
+                # pylint: enable=consider-using-with
+            # pylint: disable=consider-using-with
+            return subprocess.Popen([blender_run_path, "--background", "--python-use-system-env", "--python-exit-code",
+                                     "2", "--python", path_src_run, "--", args.file, temp_dir] + unknown_args,
+                                    env=used_environment)
+            # pylint: enable=consider-using-with
+
+        processes = [start_blender()]
+        terminated = False
+
         # Listen for SIGTERM signal, so we can properly clean up and terminate the child process
         def handle_sigterm(_signum, _frame):
+            nonlocal terminated
+            terminated = True
             clean_temp_dir()
-            p.terminate()
+            processes[-1].terminate()
 
         signal.signal(signal.SIGTERM, handle_sigterm)
 
-        try:
-            p.wait()
-        except KeyboardInterrupt:
+        while True:
+            p = processes[-1]
             try:
-                p.terminate()
-            except OSError:
-                pass
-            p.wait()
+                p.wait()
+            except KeyboardInterrupt:
+                try:
+                    p.terminate()
+                except OSError:
+                    pass
+                p.wait()
+                break
+
+            if args.mode != "serve" or terminated:
+                break
+            # Jobs which were still running, were interrupted by a crash of blender
+            for job_id in WorkerUtility.fail_running_jobs_of_worker(args.job_dir, p.pid, f"Blender terminated with "
+                                                                                         f"exit code {p.returncode}"):
+                print(f"Job {job_id} failed, as blender terminated while executing it")
+            # Restart blender, if it stopped because of the job limit or a crash and there is still work to do
+            if WorkerUtility.is_stop_requested(args.job_dir) or not WorkerUtility.has_pending_jobs(args.job_dir):
+                break
+            print("Restarting blender to continue with the pending jobs")
+            processes.append(start_blender())
 
         # Clean up
         clean_temp_dir()
@@ -231,6 +321,16 @@ def handle_sigterm(_signum, _frame):
         sys.argv = sys.argv[:1] + unknown_args
         # Call the script
         current_cli()
+    elif args.mode == "submit":
+        if args.stop:
+            WorkerUtility.request_stop(args.job_dir)
+            print(f"Requested all workers of {args.job_dir} to stop")
+        elif args.file is None:
+            raise RuntimeError("Either the path to a python file or --stop has to be given.")
+        else:
+            SetupUtility.check_if_setup_utilities_are_at_the_top(args.file)
+            job_id = WorkerUtility.submit_job(args.job_dir, args.file, unknown_args)
+            print(f"Submitted job {job_id}")
     elif args.mode == "pip":
         # Install blender, if not already done
         custom_blender_path, blender_install_path = InstallUtility.determine_blender_install_path(args)
@@ -1,7 +1,7 @@
 """ Collection of camera projection helper functions."""
-from typing import Optional
+from typing import Optional, Union
 from blenderproc.python.postprocessing.PostProcessingUtility import dist2depth
-from blenderproc.python.types.MeshObjectUtility import create_primitive
+from blenderproc.python.types.MeshObjectUtility import create_primitive, MultiObjectBVHTree
 
 import bpy
 import numpy as np
@@ -11,7 +11,8 @@
 from blenderproc.python.camera.CameraUtility import get_camera_pose, get_intrinsics_as_K_matrix
 
 
-def depth_via_raytracing(bvh_tree: BVHTree, frame: Optional[int] = None, return_dist: bool = False) -> np.ndarray:
+def depth_via_raytracing(bvh_tree: Union[BVHTree, MultiObjectBVHTree], frame: Optional[int] = None,
+                         return_dist: bool = False) -> np.ndarray:
     """ Computes a depth images using raytracing.
 
     All pixel that correspond to rays which do not hit any object are set to inf.
@@ -38,11 +39,15 @@ def depth_via_raytracing(bvh_tree: BVHTree, frame: Optional[int] = None, return_
     return depth
 
 
-def depth_at_points_via_raytracing(bvh_tree: BVHTree, points_2d: np.ndarray, frame: Optional[int] = None, return_dist: bool = False) -> np.ndarray:
+def depth_at_points_via_raytracing(bvh_tree: Union[BVHTree, MultiObjectBVHTree], points_2d: np.ndarray,
+                                   frame: Optional[int] = None, return_dist: bool = False) -> np.ndarray:
     """ Computes the depth values at the given 2D points.
 
     All points that correspond to rays which do not hit any object are set to inf.
 
+    The ray directions of all points are computed at once. If a bvh tree with object lookup is given (see
+    create_bvh_tree_multi_objects) and embree is available, also all rays are cast at once.
+
     :param bvh_tree: The BVH tree to use for raytracing.
     :param points_2d: An array of N 2D points with shape [N, 2].
     :param frame: The frame number whose assigned camera pose should be used. If None is given, the current frame
@@ -54,39 +59,41 @@ def depth_at_points_via_raytracing(bvh_tree: BVHTree, points_2d: np.ndarray, fra
         cam_ob = bpy.context.scene.camera
         cam = cam_ob.data
 
-        cam2world_matrix = cam_ob.matrix_world
+        cam2world_matrix = np.array(cam_ob.matrix_world)
         resolution_x = bpy.context.scene.render.resolution_x
         resolution_y = bpy.context.scene.render.resolution_y
 
-        # Get position of the corners of the near plane
-        frame = cam.view_frame(scene=bpy.context.scene)
-        # Bring to world space
-        frame = [cam2world_matrix @ v for v in frame]
+        # Get position of the corners of the near plane in camera space
+        view_frame = np.array([list(v) for v in cam.view_frame(scene=bpy.context.scene)])
 
         # Compute vectors along both sides of the plane
-        vec_x = frame[3] - frame[0]
-        vec_y = frame[1] - frame[0]
-
-        dists = []
-        # Go in discrete grid-like steps over plane
-        position = cam2world_matrix.to_translation()
-        for p in points_2d:
-            # Compute current point on plane
-            end = frame[0] + vec_x * (resolution_x - (p[0] + 0.5)) / float(resolution_x) \
-                    + vec_y * (p[1] + 0.5) / float(resolution_y)
-            # Send ray from the camera position through the current point on the plane
-            _, _, _, dist = bvh_tree.ray_cast(position, end - position)
-            if dist is None:
-                dist = np.inf
-
-            dists.append(dist)
-        dists = np.array(dists)
+        vec_x = view_frame[3] - view_frame[0]
+        vec_y = view_frame[1] - view_frame[0]
+
+        # Compute the points on the plane for all 2D points
+        points_2d = np.asarray(points_2d)
+        ends = view_frame[0] + vec_x * ((resolution_x - (points_2d[:, :1] + 0.5)) / float(resolution_x)) \
+            + vec_y * ((points_2d[:, 1:2] + 0.5) / float(resolution_y))
+        # Bring the rays from the camera position through these points into world space
+        directions = ends @ cam2world_matrix[:3, :3].T
+        position = cam2world_matrix[:3, 3]
+
+        if isinstance(bvh_tree, MultiObjectBVHTree):
+            _, dists = bvh_tree.ray_cast_batch(position, directions)
+        else:
+            dists = np.full(len(directions), np.inf)
+            position = position.tolist()
+            for i, direction in enumerate(directions.tolist()):
+                _, _, _, dist = bvh_tree.ray_cast(position, direction)
+                if dist is not None:
+                    dists[i] = dist
 
         if not return_dist:
             return dist2depth(dists, points_2d)
         else:
             return dists
-    
+
+
 def unproject_points(points_2d: np.ndarray, depth: np.ndarray, frame: Optional[int] = None, depth_cut_off: float = 1e6) -> np.ndarray:
     """ Unproject 2D points into 3D
 
@@ -2,19 +2,19 @@
 
 import numbers
 import sys
-from typing import Union, List, Set
-from collections import defaultdict
+from typing import Union, List, Set, Dict, Any, Optional, Tuple, Mapping
 
 import bpy
 import numpy as np
 from mathutils import Matrix
 from mathutils.bvhtree import BVHTree
 
-from blenderproc.python.types.MeshObjectUtility import MeshObject
+from blenderproc.python.types.MeshObjectUtility import MeshObject, MultiObjectBVHTree
 
 
 def perform_obstacle_in_view_check(cam2world_matrix: Union[Matrix, np.ndarray], proximity_checks: dict,
-                                   bvh_tree: BVHTree, sqrt_number_of_rays: int = 10) -> bool:
+                                   bvh_tree: Union[BVHTree, MultiObjectBVHTree],
+                                   sqrt_number_of_rays: int = 10) -> bool:
     """ Check if there are obstacles in front of the camera which are too far or too close based on the given
         proximity_checks.
 
@@ -51,24 +51,11 @@ def perform_obstacle_in_view_check(cam2world_matrix: Union[Matrix, np.ndarray],
     range_distance = sys.float_info.max
 
     # Input validation
-    for operator in proximity_checks:
-        if operator in ["min", "max"] and not isinstance(proximity_checks[operator], numbers.Number):
-            raise RuntimeError("Threshold must be a number in perform_obstacle_in_view_check")
-        if operator in ["avg", "var"]:
-            if "min" not in proximity_checks[operator] or "max" not in proximity_checks[operator]:
-                raise RuntimeError("Please specify the accepted interval for the avg and var operators "
-                                   "in perform_obstacle_in_view_check")
-            if not isinstance(proximity_checks[operator]["min"], numbers.Number) or \
-                    not isinstance(proximity_checks[operator]["max"], numbers.Number):
-                raise ValueError("Threshold must be a number in perform_obstacle_in_view_check")
+    _validate_proximity_checks(proximity_checks)
 
     # If there are no average or variance operators, we can decrease the ray range distance for efficiency
     if "avg" not in proximity_checks and "var" not in proximity_checks:
-        if "max" in proximity_checks:
-            # Cap distance values at a value slightly higher than the max threshold
-            range_distance = proximity_checks["max"] + 1.0
-        else:
-            range_distance = proximity_checks["min"]
+        range_distance = _proximity_range_distance(proximity_checks)
 
     no_range_distance = False
     # if "no_background" in proximity_checks and proximity_checks["no_background"]:
@@ -123,7 +110,9 @@ def perform_obstacle_in_view_check(cam2world_matrix: Union[Matrix, np.ndarray],
     return True
 
 
-def visible_objects(cam2world_matrix: Union[Matrix, np.ndarray], sqrt_number_of_rays: int = 10, special_objects: list = None) -> List[MeshObject]:
+def visible_objects(cam2world_matrix: Union[Matrix, np.ndarray], sqrt_number_of_rays: int = 10,
+                    special_objects: list = None,
+                    bvh_tree: Optional[MultiObjectBVHTree] = None) -> List[MeshObject]:
     """ Returns a set of objects visible from the given camera pose.
 
     Sends a grid of rays through the camera frame and returns all objects hit by at least one ray.
@@ -131,54 +120,21 @@ def visible_objects(cam2world_matrix: Union[Matrix, np.ndarray], sqrt_number_of_
     :param cam2world_matrix: The world matrix which describes the camera orientation to check.
     :param sqrt_number_of_rays: The square root of the number of rays which will be used to determine the
                                 visible objects.
+    :param special_objects: Objects with these classes are not returned, uses the coarse_grained_class or if not
+                            SUNCG, 3D Front, the category_id.
+    :param bvh_tree: A bvh tree with object lookup (see create_bvh_tree_multi_objects), which is used for casting the
+                     rays. If None is given, the rays are cast into the whole scene, which is much slower.
     :return: A set of objects visible hit by the sent rays.
     """
-    cam2world_matrix = Matrix(cam2world_matrix)
-
-    visible_objects_set = list()
-    cam_ob = bpy.context.scene.camera
-    cam = cam_ob.data
-
-    # Get position of the corners of the near plane
-    frame = cam.view_frame(scene=bpy.context.scene)
-    # Bring to world space
-    frame = [cam2world_matrix @ v for v in frame]
-
-    # Compute vectors along both sides of the plane
-    vec_x = frame[1] - frame[0]
-    vec_y = frame[3] - frame[0]
-
-    # Go in discrete grid-like steps over plane
-    position = cam2world_matrix.to_translation()
-    for x in range(0, sqrt_number_of_rays):
-        for y in range(0, sqrt_number_of_rays):
-            # Compute current point on plane
-            end = frame[0] + vec_x * x / float(sqrt_number_of_rays - 1) + vec_y * y / float(sqrt_number_of_rays - 1)
-            hit, _, _, _, hit_object, _ = bpy.context.scene.ray_cast(bpy.context.evaluated_depsgraph_get(),
-                                                                     position, end - position)
-
-            if hit:
-                is_of_special_dataset = "is_suncg" in hit_object or "is_3d_front" in hit_object
-                is_suncg_object = "suncg_type" in hit_object and hit_object["suncg_type"] == "Object"
-                is_front_3d_object = "3D_future_type" in hit_object and hit_object["3D_future_type"] == "Object"
-                if is_of_special_dataset and is_suncg_object or is_of_special_dataset and is_front_3d_object:
-                    # calculate the score based on the type of the object,
-                    # wall, floor and ceiling objects have 0 score
-                    if "coarse_grained_class" in hit_object:
-                        object_class = hit_object["coarse_grained_class"]
-                        if object_class not in special_objects:
-                            #visible_objects_set.append(hit_object)
-                            visible_objects_set.append(MeshObject(hit_object))
-                elif "category_id" in hit_object:
-                    object_class = hit_object["category_id"]
-                    if object_class not in special_objects:
-                        #visible_objects_set.append(hit_object)
-                        visible_objects_set.append(MeshObject(hit_object))
-    return visible_objects_set
+    hit_object_indices, _, hit_objects = _cast_ray_grid_batch(np.array([cam2world_matrix]), sqrt_number_of_rays,
+                                                              bvh_tree)
+    _, visible_objects_of_poses = _evaluate_hit_objects(hit_object_indices, hit_objects, special_objects, 1)
+    return visible_objects_of_poses[0]
 
 
 def scene_coverage_score(cam2world_matrix: Union[Matrix, np.ndarray], special_objects: list = None,
-                         special_objects_weight: float = 2, sqrt_number_of_rays: int = 10) -> float:
+                         special_objects_weight: float = 2, sqrt_number_of_rays: int = 10,
+                         bvh_tree: Optional[MultiObjectBVHTree] = None) -> float:
     """ Evaluate the interestingness/coverage of the scene.
 
     This module tries to look at as many objects at possible, this might lead to
@@ -194,73 +150,284 @@ def scene_coverage_score(cam2world_matrix: Union[Matrix, np.ndarray], special_ob
                                    scene is. Default: 2.0.
     :param sqrt_number_of_rays: The square root of the number of rays which will be used to determine the
                                 visible objects.
+    :param bvh_tree: A bvh tree with object lookup (see create_bvh_tree_multi_objects), which is used for casting the
+                     rays. If None is given, the rays are cast into the whole scene, which is much slower.
     :return: the scoring of the scene.
     """
-    cam2world_matrix = Matrix(cam2world_matrix)
-
+    hit_object_indices, _, hit_objects = _cast_ray_grid_batch(np.array([cam2world_matrix]), sqrt_number_of_rays,
+                                                              bvh_tree)
+    coverage_scores, _ = _evaluate_hit_objects(hit_object_indices, hit_objects, special_objects,
+                                               special_objects_weight)
+    return float(coverage_scores[0])
+
+
+def score_camera_poses_batch(cam2world_matrices: Union[List[Union[Matrix, np.ndarray]], np.ndarray],
+                             proximity_checks: Optional[dict] = None,
+                             bvh_tree: Optional[Union[BVHTree, MultiObjectBVHTree]] = None,
+                             special_objects: Optional[list] = None, special_objects_weight: float = 2,
+                             sqrt_number_of_rays: int = 10) -> Dict[str, Any]:
+    """ Evaluates many candidate camera poses at once.
+
+    Computes the results of scene_coverage_score, perform_obstacle_in_view_check and visible_objects for all given
+    camera poses. The rays of all candidates are built at once with numpy and each ray is only cast once, its hit
+    object is used for the coverage score and the visible objects and its distance for the proximity checks.
+    The custom properties of each hit object are only evaluated once for all rays.
+
+    :param cam2world_matrices: The N camera poses to check, given as list or array of 4x4 cam2world matrices.
+    :param proximity_checks: The proximity checks to evaluate, see perform_obstacle_in_view_check. If None is given,
+                             all poses pass the proximity checks.
+    :param bvh_tree: The bvh tree used for casting the rays. If it has an object lookup (see
+                     create_bvh_tree_multi_objects), it is used for all computations, which is the fastest option.
+                     If it is a normal bvh tree, it is only used for the proximity checks and the hit objects are
+                     determined by casting the rays into the whole scene. If None is given, all rays are only cast
+                     into the whole scene.
+    :param special_objects: Objects that weights differently in calculating whether the scene is interesting or not,
+                            uses the coarse_grained_class or if not SUNCG, 3D Front, the category_id.
+    :param special_objects_weight: Weighting factor for more special objects, used to estimate how interesting the
+                                   scene is.
+    :param sqrt_number_of_rays: The square root of the number of rays which will be cast per camera pose.
+    :return: A dict containing the following entries, each one with one value per camera pose:
+             "coverage_score": The scores of scene_coverage_score with shape [N].
+             "proximity_check": The results of perform_obstacle_in_view_check with shape [N].
+             "min_dist", "max_dist": The minimum and maximum hit distance with shape [N], nan if no ray hit.
+             "avg_dist", "var_dist": The average and variance of the hit distances with shape [N], rays which hit
+             nothing count as zero as in perform_obstacle_in_view_check.
+             "visible_objects": A list with the list of visible objects of each camera pose, see visible_objects.
+    """
+    if proximity_checks:
+        _validate_proximity_checks(proximity_checks)
+
+    cam2world_matrices = np.array([np.array(matrix) for matrix in cam2world_matrices], dtype=np.float64)
+    object_bvh_tree = bvh_tree if isinstance(bvh_tree, MultiObjectBVHTree) else None
+    hit_object_indices, hit_dists, hit_objects = _cast_ray_grid_batch(cam2world_matrices, sqrt_number_of_rays,
+                                                                      object_bvh_tree)
+    num_poses, num_of_rays = hit_object_indices.shape
+    coverage_scores, visible_objects_of_poses = _evaluate_hit_objects(hit_object_indices, hit_objects,
+                                                                      special_objects, special_objects_weight)
+
+    # Compute the distance statistics used for the proximity checks
+    if bvh_tree is not None and object_bvh_tree is None:
+        origins, directions = _compute_ray_grid_batch(cam2world_matrices, sqrt_number_of_rays)
+        proximity_dists = np.full((num_poses, num_of_rays), np.nan)
+        for pose_index in range(num_poses):
+            for ray_index in range(num_of_rays):
+                _, _, _, dist = bvh_tree.ray_cast(origins[pose_index], directions[pose_index, ray_index])
+                if dist is not None:
+                    proximity_dists[pose_index, ray_index] = dist
+    else:
+        proximity_dists = hit_dists
+    if proximity_checks and "avg" not in proximity_checks and "var" not in proximity_checks:
+        # Same as the reduced ray range in perform_obstacle_in_view_check
+        proximity_dists = np.where(proximity_dists <= _proximity_range_distance(proximity_checks),
+                                   proximity_dists, np.nan)
+    has_hit = ~np.isnan(proximity_dists)
+    dists_or_zero = np.where(has_hit, proximity_dists, 0.0)
+    avg_dists = dists_or_zero.sum(axis=1) / num_of_rays
+    var_dists = (dists_or_zero ** 2).sum(axis=1) / num_of_rays - avg_dists ** 2
+    min_dists = np.where(has_hit, proximity_dists, np.inf).min(axis=1)
+    max_dists = np.where(has_hit, proximity_dists, -np.inf).max(axis=1)
+    min_dists[~has_hit.any(axis=1)] = np.nan
+    max_dists[~has_hit.any(axis=1)] = np.nan
+
+    proximity_check = np.ones(num_poses, dtype=bool)
+    if proximity_checks:
+        if "min" in proximity_checks:
+            proximity_check &= ~(np.nan_to_num(min_dists, nan=np.inf) <= proximity_checks["min"])
+        if "max" in proximity_checks:
+            proximity_check &= ~(np.nan_to_num(max_dists, nan=-np.inf) >= proximity_checks["max"])
+        if "avg" in proximity_checks:
+            proximity_check &= (avg_dists < proximity_checks["avg"]["max"]) & \
+                               (avg_dists > proximity_checks["avg"]["min"])
+        if "var" in proximity_checks:
+            proximity_check &= (var_dists < proximity_checks["var"]["max"]) & \
+                               (var_dists > proximity_checks["var"]["min"])
+
+    return {
+        "coverage_score": coverage_scores,
+        "proximity_check": proximity_check,
+        "min_dist": min_dists,
+        "max_dist": max_dists,
+        "avg_dist": avg_dists,
+        "var_dist": var_dists,
+        "visible_objects": visible_objects_of_poses
+    }
+
+
+def _compute_ray_grid_batch(cam2world_matrices: np.ndarray, sqrt_number_of_rays: int) -> Tuple[np.ndarray,
+                                                                                                 np.ndarray]:
+    """ Computes the origins and directions of the ray grid used to validate the given camera poses.
+
+    The rays go through the same grid of points on the near plane as in perform_obstacle_in_view_check and are in
+    the same order.
+
+    :param cam2world_matrices: The camera poses with shape [N, 4, 4].
+    :param sqrt_number_of_rays: The square root of the number of rays per camera pose.
+    :return: The ray origins with shape [N, 3] and the ray directions with shape [N, sqrt_number_of_rays ** 2, 3].
+    """
+    cam = bpy.context.scene.camera.data
+    # Get position of the corners of the near plane in camera space
+    frame = np.array([list(v) for v in cam.view_frame(scene=bpy.context.scene)])
+    vec_x = frame[1] - frame[0]
+    vec_y = frame[3] - frame[0]
+    # Go in discrete grid-like steps over plane, x is the outer loop
+    steps = np.arange(sqrt_number_of_rays) / float(sqrt_number_of_rays - 1)
+    step_x, step_y = np.meshgrid(steps, steps, indexing="ij")
+    ends = frame[0] + step_x.reshape(-1, 1) * vec_x + step_y.reshape(-1, 1) * vec_y
+    # The directions only depend on the rotation, as the rays start in the camera origin
+    directions = np.einsum("nij,rj->nri", cam2world_matrices[:, :3, :3], ends)
+    return cam2world_matrices[:, :3, 3], directions
+
+
+def _cast_ray_grid_batch(cam2world_matrices: np.ndarray, sqrt_number_of_rays: int,
+                         bvh_tree: Optional[MultiObjectBVHTree] = None) \
+        -> Tuple[np.ndarray, np.ndarray, List[Tuple[MeshObject, Mapping, str]]]:
+    """ Casts the ray grid of all given camera poses and collects the hit objects.
+
+    :param cam2world_matrices: The camera poses with shape [N, 4, 4].
+    :param sqrt_number_of_rays: The square root of the number of rays per camera pose.
+    :param bvh_tree: The bvh tree with object lookup used for casting the rays. If None is given, the rays are cast
+                     into the whole scene.
+    :return: The index of the hit object for each ray with shape [N, R] (-1 if nothing was hit), the distance of each
+             hit with shape [N, R] (nan if nothing was hit) and for each hit object the mesh object, its custom
+             properties and its name.
+    """
+    origins, directions = _compute_ray_grid_batch(np.array(cam2world_matrices, dtype=np.float64),
+                                                  sqrt_number_of_rays)
+    num_poses, num_of_rays = directions.shape[:2]
+    hit_object_indices = np.full((num_poses, num_of_rays), -1, dtype=np.int64)
+    hit_dists = np.full((num_poses, num_of_rays), np.nan)
+    hit_objects: List[Tuple[MeshObject, Mapping, str]] = []
+
+    if bvh_tree is not None:
+        # Cast all rays of all poses at once
+        object_indices, dists = bvh_tree.ray_cast_batch(np.repeat(origins, num_of_rays, axis=0),
+                                                        directions.reshape(-1, 3))
+        object_indices = object_indices.reshape(num_poses, num_of_rays)
+        # Only collect the objects which are hit at least once
+        used_object_indices = np.unique(object_indices[object_indices >= 0])
+        hit_object_indices = np.where(object_indices >= 0, np.searchsorted(used_object_indices, object_indices), -1)
+        hit_objects = [(bvh_tree.mesh_objects[index], bvh_tree.custom_properties[index], bvh_tree.object_names[index])
+                       for index in used_object_indices]
+        hit_dists = np.where(object_indices >= 0, dists.reshape(num_poses, num_of_rays), np.nan)
+    else:
+        # Cast all rays into the scene, the depsgraph is only evaluated once
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        scene = bpy.context.scene
+        name_to_index: Dict[str, int] = {}
+        for pose_index in range(num_poses):
+            origin = origins[pose_index]
+            for ray_index in range(num_of_rays):
+                hit, location, _, _, hit_object, _ = scene.ray_cast(depsgraph, origin,
+                                                                    directions[pose_index, ray_index])
+                if hit:
+                    if hit_object.name not in name_to_index:
+                        name_to_index[hit_object.name] = len(hit_objects)
+                        hit_objects.append((MeshObject(hit_object), hit_object, hit_object.name))
+                    hit_object_indices[pose_index, ray_index] = name_to_index[hit_object.name]
+                    hit_dists[pose_index, ray_index] = np.linalg.norm(np.array(location) - origin)
+    return hit_object_indices, hit_dists, hit_objects
+
+
+def _evaluate_hit_objects(hit_object_indices: np.ndarray, hit_objects: List[Tuple[MeshObject, Mapping, str]],
+                          special_objects: Optional[list],
+                          special_objects_weight: float) -> Tuple[np.ndarray, List[List[MeshObject]]]:
+    """ Computes the coverage score and the visible objects of multiple camera poses from their ray hits.
+
+    :param hit_object_indices: The index of the hit object for each ray with shape [N, R], -1 if nothing was hit.
+    :param hit_objects: For each hit object the mesh object, its custom properties and its name.
+    :param special_objects: Objects that weights differently in calculating whether the scene is interesting or not.
+    :param special_objects_weight: Weighting factor for more special objects.
+    :return: The coverage scores with shape [N] and the list of visible objects of each pose.
+    """
     if special_objects is None:
         special_objects = []
-    cam_ob = bpy.context.scene.camera
-    cam = cam_ob.data
-
-    num_of_rays = sqrt_number_of_rays * sqrt_number_of_rays
-    score = 0.0
-    objects_hit: defaultdict = defaultdict(int)
+    num_poses, num_of_rays = hit_object_indices.shape
+
+    # Evaluate the custom properties of every hit object only once
+    object_classes = [_classify_hit_object(custom_properties, name, special_objects, special_objects_weight)
+                      for _, custom_properties, name in hit_objects]
+    # The index -1 (nothing hit) maps to the appended dummy entries
+    object_weights = np.array([weight for _, weight, _ in object_classes] + [0.0])
+    # Objects with the same class share one class index, objects without a class get -1
+    class_keys: Dict[Any, int] = {}
+    object_class_indices = np.array([class_keys.setdefault(key, len(class_keys)) if key is not None else -1
+                                     for key, _, _ in object_classes] + [-1], dtype=np.int64)
+    object_is_visible = np.array([is_visible for _, _, is_visible in object_classes] + [False])
+
+    score = object_weights[hit_object_indices].sum(axis=1)
+    ray_classes = object_class_indices[hit_object_indices]
+    coverage_scores = np.empty(num_poses)
+    visible_objects_of_poses = []
+    for pose_index in range(num_poses):
+        _, counts = np.unique(ray_classes[pose_index][ray_classes[pose_index] >= 0], return_counts=True)
+        # For a scene with three different objects, the starting variance is 1.0, increases/decreases by '1/3' for
+        # each object more/less, excluding floor, ceiling and walls. For an object taking half of the scene, the
+        # scene_variance is halved, this penalizes non-even distribution of the objects in the scene
+        scene_variance = len(counts) / 3.0 * np.prod(1.0 - counts / float(num_of_rays))
+        coverage_scores[pose_index] = scene_variance * (score[pose_index] / float(num_of_rays))
+
+        object_indices = np.unique(hit_object_indices[pose_index])
+        visible_objects_of_poses.append([hit_objects[index][0] for index in object_indices
+                                         if index >= 0 and object_is_visible[index]])
+    return coverage_scores, visible_objects_of_poses
+
+
+def _classify_hit_object(custom_properties: Mapping, name: str, special_objects: list,
+                         special_objects_weight: float) -> Tuple[Any, float, bool]:
+    """ Determines how a hit object contributes to the coverage score and if it counts as visible object.
+
+    :param custom_properties: The custom properties of the object, which has been hit by a ray.
+    :param name: The name of the object, which has been hit by a ray.
+    :param special_objects: Objects that weights differently in calculating whether the scene is interesting or not.
+    :param special_objects_weight: Weighting factor for more special objects.
+    :return: The key under which the hits are counted (None if they are not counted), the score of one hit and
+             whether the object is returned as visible object.
+    """
+    is_of_special_dataset = "is_suncg" in custom_properties or "is_3d_front" in custom_properties
+    is_suncg_object = "suncg_type" in custom_properties and custom_properties["suncg_type"] == "Object"
+    is_front_3d_object = "3D_future_type" in custom_properties and custom_properties["3D_future_type"] == "Object"
+    if is_of_special_dataset and is_suncg_object or is_of_special_dataset and is_front_3d_object:
+        # calculate the score based on the type of the object,
+        # wall, floor and ceiling objects have 0 score
+        if "coarse_grained_class" in custom_properties:
+            object_class = custom_properties["coarse_grained_class"]
+            is_special = object_class in special_objects
+            return object_class, special_objects_weight if is_special else 1.0, not is_special
+        return None, 1.0, False
+    if "category_id" in custom_properties:
+        object_class = custom_properties["category_id"]
+        is_special = object_class in special_objects
+        return object_class, special_objects_weight if is_special else 1.0, not is_special
+    return name, 1.0, False
+
+
+def _validate_proximity_checks(proximity_checks: dict):
+    """ Checks that the given proximity checks are valid, see perform_obstacle_in_view_check.
+
+    :param proximity_checks: The proximity checks to validate.
+    """
+    for operator in proximity_checks:
+        if operator in ["min", "max"] and not isinstance(proximity_checks[operator], numbers.Number):
+            raise RuntimeError("Threshold must be a number in perform_obstacle_in_view_check")
+        if operator in ["avg", "var"]:
+            if "min" not in proximity_checks[operator] or "max" not in proximity_checks[operator]:
+                raise RuntimeError("Please specify the accepted interval for the avg and var operators "
+                                   "in perform_obstacle_in_view_check")
+            if not isinstance(proximity_checks[operator]["min"], numbers.Number) or \
+                    not isinstance(proximity_checks[operator]["max"], numbers.Number):
+                raise ValueError("Threshold must be a number in perform_obstacle_in_view_check")
 
-    # Get position of the corners of the near plane
-    frame = cam.view_frame(scene=bpy.context.scene)
-    # Bring to world space
-    frame = [cam2world_matrix @ v for v in frame]
 
-    # Compute vectors along both sides of the plane
-    vec_x = frame[1] - frame[0]
-    vec_y = frame[3] - frame[0]
+def _proximity_range_distance(proximity_checks: dict) -> float:
+    """ Returns the reduced ray range, which can be used if there are no average or variance checks.
 
-    # Go in discrete grid-like steps over plane
-    position = cam2world_matrix.to_translation()
-    for x in range(0, sqrt_number_of_rays):
-        for y in range(0, sqrt_number_of_rays):
-            # Compute current point on plane
-            end = frame[0] + vec_x * x / float(sqrt_number_of_rays - 1) + vec_y * y / float(sqrt_number_of_rays - 1)
-            # Send ray from the camera position through the current point on the plane
-            hit, _, _, _, hit_object, _ = bpy.context.scene.ray_cast(bpy.context.evaluated_depsgraph_get(),
-                                                                     position, end - position)
-
-            if hit:
-                is_of_special_dataset = "is_suncg" in hit_object or "is_3d_front" in hit_object
-                is_suncg_object = "suncg_type" in hit_object and hit_object["suncg_type"] == "Object"
-                is_front_3d_object = "3D_future_type" in hit_object and hit_object["3D_future_type"] == "Object"
-                if is_of_special_dataset and is_suncg_object or is_of_special_dataset and is_front_3d_object:
-                    # calculate the score based on the type of the object,
-                    # wall, floor and ceiling objects have 0 score
-                    if "coarse_grained_class" in hit_object:
-                        object_class = hit_object["coarse_grained_class"]
-                        objects_hit[object_class] += 1
-                        if object_class in special_objects:
-                            score += special_objects_weight
-                        else:
-                            score += 1
-                    else:
-                        score += 1
-                elif "category_id" in hit_object:
-                    object_class = hit_object["category_id"]
-                    if object_class in special_objects:
-                        score += special_objects_weight
-                    else:
-                        score += 1
-                    objects_hit[object_class] += 1
-                else:
-                    objects_hit[hit_object] += 1
-                    score += 1
-    # For a scene with three different objects, the starting variance is 1.0, increases/decreases by '1/3' for
-    # each object more/less, excluding floor, ceiling and walls
-    scene_variance = len(objects_hit) / 3.0
-    for object_hit_value in objects_hit.values():
-        # For an object taking half of the scene, the scene_variance is halved, this penalizes non-even
-        # distribution of the objects in the scene
-        scene_variance *= 1.0 - object_hit_value / float(num_of_rays)
-    score = scene_variance * (score / float(num_of_rays))
-    return score
+    :param proximity_checks: The proximity checks, which only contain min and/or max checks.
+    :return: The maximum distance up to which hits have to be considered.
+    """
+    if "max" in proximity_checks:
+        # Cap distance values at a value slightly higher than the max threshold
+        return proximity_checks["max"] + 1.0
+    return proximity_checks["min"]
 
 
 def decrease_interest_score(interest_score: float, min_interest_score: float, interest_score_step: float):
@@ -9,12 +9,12 @@
 """
 
 import os
-from typing import Union, List, Tuple, Optional
+from typing import Union, List, Tuple, Optional, Dict
 
 import numpy as np
 import yaml
 import bpy
-from scipy.ndimage import map_coordinates
+import cv2
 
 from blenderproc.python.utility.GlobalStorage import GlobalStorage
 from blenderproc.python.camera import CameraUtility
@@ -196,6 +196,12 @@ def set_lens_distortion(k1: float, k2: float, k3: float = 0.0, p1: float = 0.0,
     if use_global_storage:
         GlobalStorage.set("_lens_distortion_is_used", {"mapping_coords": mapping_coords,
                                                     "original_image_res": original_image_resolution})
+    # The remap is computed only once here and reused by apply_lens_distortion() for all images
+    GlobalStorage.set("_lens_distortion_remap", {
+        "mapping_coords": mapping_coords,
+        "remap": _LensDistortionUtility.create_remap(mapping_coords, original_image_resolution[1],
+                                                     original_image_resolution[0])
+    })
     return mapping_coords
 
 
@@ -233,46 +239,21 @@ def apply_lens_distortion(image: Union[List[np.ndarray], np.ndarray],
                             "'orig_res_x' + 'orig_res_x' to bproc.postprocessing.apply_lens_distortion(...). "
                             "Previously this could also have been done via the CameraInterface module, "
                             "see the example on lens_distortion.")
-    interpolation_order = 2 if use_interpolation else 0
+    remap = None
+    if GlobalStorage.is_in_storage("_lens_distortion_remap"):
+        content = GlobalStorage.get("_lens_distortion_remap")
+        # Reuse the precomputed remap, if the mapping of the last set_lens_distortion() call is applied
+        if content["mapping_coords"] is mapping_coords:
+            remap = content["remap"]
+    if remap is None:
+        remap = _LensDistortionUtility.create_remap(mapping_coords, orig_res_x, orig_res_y)
+    remap_maps = remap["interpolated"] if use_interpolation else remap["nearest"]
+    interpolation = cv2.INTER_CUBIC if use_interpolation else cv2.INTER_NEAREST
 
-    def _internal_apply(input_image: np.ndarray) -> np.ndarray:
-        """
-        Applies the distortion to the input image
-        :param input_image: input image, which will be distorted
-        :return: distorted input image
-        """
-        amount_of_output_channels = 1
-        if len(input_image.shape) == 3:
-            amount_of_output_channels = input_image.shape[2]
-        image_distorted = np.zeros((orig_res_y, orig_res_x, amount_of_output_channels))
-        used_dtpye = input_image.dtype
-        data = input_image.astype(np.float)
-        # Forward mapping in order to distort the undistorted image coordinates
-        # and reshape the arrays into the image shape grid.
-        # The reference frame for coords is as in DLR CalDe etc. (the upper-left pixel center is at [0,0])
-        for i in range(image_distorted.shape[2]):
-            if len(input_image.shape) == 3:
-                image_distorted[:, :, i] = np.reshape(map_coordinates(data[:, :, i], mapping_coords,
-                                                                      order=interpolation_order,
-                                                                      mode='nearest'), image_distorted[:, :, i].shape)
-            else:
-                image_distorted[:, :, i] = np.reshape(map_coordinates(data, mapping_coords, order=interpolation_order,
-                                                                      mode='nearest'),
-                                                      image_distorted[:, :, i].shape)
-        # Other options are:
-        # - map_coordinates() in all channels at the same time (turns out to be slower)
-        # - use torch.nn.functional.grid_sample() instead to do it on the GPU (even in batches)
-
-        if used_dtpye == np.uint8:
-            image_distorted = np.clip(image_distorted, 0, 255)
-        data = image_distorted.astype(used_dtpye)
-        if len(input_image.shape) == 2:
-            return data[:, :, 0]
-        return data
     if isinstance(image, list):
-        return [_internal_apply(img) for img in image]
+        return [_LensDistortionUtility.apply_remap(img, remap_maps, interpolation) for img in image]
     if isinstance(image, np.ndarray):
-        return _internal_apply(image)
+        return _LensDistortionUtility.apply_remap(image, remap_maps, interpolation)
     raise Exception(f"This type can not be worked with here: {type(image)}, only "
                     f"np.ndarray or list of np.ndarray are supported")
 
@@ -373,3 +354,61 @@ def _is_number(value: str) -> bool:
         cam2world = change_source_coordinate_frame_of_transformation_matrix(cam2world, ["X", "-Y", "-Z"])
         CameraUtility.add_camera_pose(cam2world)
     return extracted_camera_parameters["width"], extracted_camera_parameters["height"], mapping_coords
+
+
+class _LensDistortionUtility:
+
+    # The data types, which can be interpolated by cv2.remap()
+    REMAP_DTYPES = [np.uint8, np.uint16, np.int16, np.float32, np.float64]
+
+    @staticmethod
+    def create_remap(mapping_coords: np.ndarray, orig_res_x: int, orig_res_y: int) \
+            -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """ Converts the mapping coordinates into the fixed-point maps of cv2.remap().
+
+        :param mapping_coords: an array of pixel mappings from undistorted to distorted image
+        :param orig_res_x: original and output width resolution of the image
+        :param orig_res_y: original and output height resolution of the image
+        :return: The map pairs for the interpolated and the nearest neighbor remap.
+        """
+        # The reference frame for coords is as in DLR CalDe etc. (the upper-left pixel center is at [0,0])
+        map_y = mapping_coords[0].reshape(orig_res_y, orig_res_x).astype(np.float32)
+        map_x = mapping_coords[1].reshape(orig_res_y, orig_res_x).astype(np.float32)
+        return {
+            "interpolated": cv2.convertMaps(map_x, map_y, cv2.CV_16SC2),
+            "nearest": cv2.convertMaps(map_x, map_y, cv2.CV_16SC2, nninterpolation=True)
+        }
+
+    @staticmethod
+    def apply_remap(image: np.ndarray, remap_maps: Tuple[np.ndarray, np.ndarray], interpolation: int) -> np.ndarray:
+        """ Distorts the given image with the given remap.
+
+        :param image: The image to distort with shape [H, W] or [H, W, C].
+        :param remap_maps: The fixed-point maps, see create_remap().
+        :param interpolation: The interpolation used by cv2.remap().
+        :return: The distorted image in its original data type.
+        """
+        used_dtype = image.dtype
+        if used_dtype == bool:
+            image = image.astype(np.uint8)
+        elif used_dtype not in _LensDistortionUtility.REMAP_DTYPES:
+            image = image.astype(np.float64)
+
+        if image.ndim == 3 and image.shape[2] > 4:
+            # cv2.remap() processes at most four channels at once
+            distorted = np.concatenate([
+                cv2.remap(image[:, :, i:i + 4], remap_maps[0], remap_maps[1], interpolation,
+                          borderMode=cv2.BORDER_REPLICATE).reshape(remap_maps[0].shape[0], remap_maps[0].shape[1], -1)
+                for i in range(0, image.shape[2], 4)], axis=2)
+        else:
+            distorted = cv2.remap(image, remap_maps[0], remap_maps[1], interpolation,
+                                  borderMode=cv2.BORDER_REPLICATE)
+            # cv2 drops the channel axis of single channel images
+            distorted = distorted.reshape(distorted.shape[:2] + image.shape[2:])
+
+        if distorted.dtype != used_dtype:
+            if np.issubdtype(used_dtype, np.integer):
+                info = np.iinfo(used_dtype)
+                distorted = np.clip(np.round(distorted), info.min, info.max)
+            distorted = distorted.astype(used_dtype)
+        return distorted
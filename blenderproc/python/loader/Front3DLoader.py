@@ -1,10 +1,13 @@
 """Loads the 3D FRONT and FUTURE dataset"""
 
+import hashlib
 import json
 import os
+import shutil
+import uuid
 import warnings
 from math import radians
-from typing import List, Mapping
+from typing import Dict, List, Mapping, Optional, Tuple
 from urllib.request import urlretrieve
 
 import bpy
@@ -14,7 +17,9 @@
 from blenderproc.python.material import MaterialLoaderUtility
 from blenderproc.python.utility.LabelIdMapping import LabelIdMapping
 from blenderproc.python.types.MeshObjectUtility import MeshObject, create_with_empty_mesh
+from blenderproc.python.types.MaterialUtility import Material
 from blenderproc.python.utility.Utility import resolve_path
+from blenderproc.python.loader.BlendLoader import load_blend
 from blenderproc.python.loader.ObjectLoader import load_obj
 from blenderproc.python.loader.TextureLoader import load_texture
 
@@ -33,7 +38,11 @@ def add_spotlight(light_obj, strength):
     lamp_object.location = light_obj.blender_obj.location
 
 def load_front3d(json_path: str, future_model_path: str, front_3D_texture_path: str, label_mapping: LabelIdMapping,
-                 ceiling_light_strength: float , lamp_light_strength: float ) -> List[MeshObject]:
+                 ceiling_light_strength: float , lamp_light_strength: float,
+                 cache_dir: Optional[str] = None,
+                 merge_meshes_per_room: bool = False,
+                 furniture_cache_dir: Optional[str] = None,
+                 linked_furniture_duplicates: bool = False) -> List[MeshObject]:
     """ Loads the 3D-Front scene specified by the given json file.
 
     :param json_path: Path to the json file, where the house information is stored.
@@ -42,6 +51,19 @@ def load_front3d(json_path: str, future_model_path: str, front_3D_texture_path:
     :param label_mapping: A dict which maps the names of the objects to ids.
     :param ceiling_light_strength: Strength of the emission shader used in the ceiling.
     :param lamp_light_strength: Strength of the emission shader used in each lamp.
+    :param cache_dir: If given, each house json is converted once into a binary cache inside this folder, which
+                      is used instead of parsing the json file, when the same house is loaded again.
+    :param merge_meshes_per_room: If True, all architectural meshes (walls, floors, ceilings, ...) of the same type
+                                  inside the same room are combined into one object. This reduces the number of
+                                  objects drastically, which speeds up the scene construction and rendering.
+    :param furniture_cache_dir: If given, each furniture model is converted once into a .blend file inside this
+                                folder, which is appended instead of loading and processing the .obj file, when the
+                                same model is used again.
+    :param linked_furniture_duplicates: If True, furniture which is used multiple times in the house shares its mesh
+                                        data between all instances, which reduces the memory usage and the time
+                                        cycles needs to sync the geometry. Custom properties like the category_id are
+                                        still set per instance, but changing the mesh or the materials of one
+                                        instance changes all of them.
     :return: The list of loaded mesh objects.
     """
     json_path = resolve_path(json_path)
@@ -55,20 +77,22 @@ def load_front3d(json_path: str, future_model_path: str, front_3D_texture_path:
     if not os.path.exists(future_model_path):
         raise FileNotFoundError(f"The 3D future model path does not exist: {future_model_path}")
 
-    # load data from json file
-    with open(json_path, "r", encoding="utf-8") as json_file:
-        data = json.load(json_file)
+    # load data from json file or from its preprocessed cache
+    data = _Front3DLoader.load_json_data(json_path, cache_dir)
 
     if "scene" not in data:
         raise ValueError(f"There is no scene data in this json file: {json_path}")
 
     created_objects = _Front3DLoader.create_mesh_objects_from_file(data, front_3D_texture_path,
-                                                                   ceiling_light_strength, label_mapping, json_path)
+                                                                   ceiling_light_strength, label_mapping, json_path,
+                                                                   merge_meshes_per_room)
 
     all_loaded_furniture = _Front3DLoader.load_furniture_objs(data, future_model_path,
-                                                              lamp_light_strength, label_mapping)
+                                                              lamp_light_strength, label_mapping,
+                                                              furniture_cache_dir)
 
-    created_objects += _Front3DLoader.move_and_duplicate_furniture(data, all_loaded_furniture)
+    created_objects += _Front3DLoader.move_and_duplicate_furniture(data, all_loaded_furniture,
+                                                                   linked_furniture_duplicates)
 
     # add an identifier to the obj
     for obj in created_objects:
@@ -77,7 +101,10 @@ def load_front3d(json_path: str, future_model_path: str, front_3D_texture_path:
     return created_objects
 
 def load_only_furniture(json_path: str, future_model_path: str, front_3D_texture_path: str, label_mapping: LabelIdMapping,
-                 ceiling_light_strength: float , lamp_light_strength: float ) -> List[MeshObject]:
+                 ceiling_light_strength: float , lamp_light_strength: float,
+                 cache_dir: Optional[str] = None,
+                 furniture_cache_dir: Optional[str] = None,
+                 linked_furniture_duplicates: bool = False) -> List[MeshObject]:
     """ Loads the 3D-Front scene specified by the given json file.
 
     :param json_path: Path to the json file, where the house information is stored.
@@ -86,6 +113,16 @@ def load_only_furniture(json_path: str, future_model_path: str, front_3D_texture
     :param label_mapping: A dict which maps the names of the objects to ids.
     :param ceiling_light_strength: Strength of the emission shader used in the ceiling.
     :param lamp_light_strength: Strength of the emission shader used in each lamp.
+    :param cache_dir: If given, each house json is converted once into a binary cache inside this folder, which
+                      is used instead of parsing the json file, when the same house is loaded again.
+    :param furniture_cache_dir: If given, each furniture model is converted once into a .blend file inside this
+                                folder, which is appended instead of loading and processing the .obj file, when the
+                                same model is used again.
+    :param linked_furniture_duplicates: If True, furniture which is used multiple times in the house shares its mesh
+                                        data between all instances, which reduces the memory usage and the time
+                                        cycles needs to sync the geometry. Custom properties like the category_id are
+                                        still set per instance, but changing the mesh or the materials of one
+                                        instance changes all of them.
     :return: The list of loaded mesh objects.
     """
     json_path = resolve_path(json_path)
@@ -99,18 +136,19 @@ def load_only_furniture(json_path: str, future_model_path: str, front_3D_texture
     if not os.path.exists(future_model_path):
         raise FileNotFoundError(f"The 3D future model path does not exist: {future_model_path}")
 
-    # load data from json file
-    with open(json_path, "r", encoding="utf-8") as json_file:
-        data = json.load(json_file)
+    # load data from json file or from its preprocessed cache
+    data = _Front3DLoader.load_json_data(json_path, cache_dir)
 
     if "scene" not in data:
         raise ValueError(f"There is no scene data in this json file: {json_path}")
 
 
     all_loaded_furniture = _Front3DLoader.load_furniture_objs(data, future_model_path,
-                                                              lamp_light_strength, label_mapping)
+                                                              lamp_light_strength, label_mapping,
+                                                              furniture_cache_dir)
 
-    created_objects = _Front3DLoader.move_and_duplicate_furniture(data, all_loaded_furniture)
+    created_objects = _Front3DLoader.move_and_duplicate_furniture(data, all_loaded_furniture,
+                                                                  linked_furniture_duplicates)
 
     # add an identifier to the obj
     for obj in created_objects:
@@ -119,7 +157,11 @@ def load_only_furniture(json_path: str, future_model_path: str, front_3D_texture
     return created_objects
 
 def load_small_front3d(json_path: str, future_model_path: str, front_3D_texture_path: str, label_mapping: LabelIdMapping,
-                 ceiling_light_strength: float , lamp_light_strength: float ) -> List[MeshObject]:
+                 ceiling_light_strength: float , lamp_light_strength: float,
+                 cache_dir: Optional[str] = None,
+                 merge_meshes_per_room: bool = False,
+                 furniture_cache_dir: Optional[str] = None,
+                 linked_furniture_duplicates: bool = False) -> List[MeshObject]:
     """ Loads the 3D-Front scene specified by the given json file.
 
     :param json_path: Path to the json file, where the house information is stored.
@@ -128,6 +170,19 @@ def load_small_front3d(json_path: str, future_model_path: str, front_3D_texture_
     :param label_mapping: A dict which maps the names of the objects to ids.
     :param ceiling_light_strength: Strength of the emission shader used in the ceiling.
     :param lamp_light_strength: Strength of the emission shader used in each lamp.
+    :param cache_dir: If given, each house json is converted once into a binary cache inside this folder, which
+                      is used instead of parsing the json file, when the same house is loaded again.
+    :param merge_meshes_per_room: If True, all architectural meshes (walls, floors, ceilings, ...) of the same type
+                                  inside the same room are combined into one object. This reduces the number of
+                                  objects drastically, which speeds up the scene construction and rendering.
+    :param furniture_cache_dir: If given, each furniture model is converted once into a .blend file inside this
+                                folder, which is appended instead of loading and processing the .obj file, when the
+                                same model is used again.
+    :param linked_furniture_duplicates: If True, furniture which is used multiple times in the house shares its mesh
+                                        data between all instances, which reduces the memory usage and the time
+                                        cycles needs to sync the geometry. Custom properties like the category_id are
+                                        still set per instance, but changing the mesh or the materials of one
+                                        instance changes all of them.
     :return: The list of loaded mesh objects.
     """
     json_path = resolve_path(json_path)
@@ -141,20 +196,22 @@ def load_small_front3d(json_path: str, future_model_path: str, front_3D_texture_
     if not os.path.exists(future_model_path):
         raise FileNotFoundError(f"The 3D future model path does not exist: {future_model_path}")
 
-    # load data from json file
-    with open(json_path, "r", encoding="utf-8") as json_file:
-        data = json.load(json_file)
+    # load data from json file or from its preprocessed cache
+    data = _Front3DLoader.load_json_data(json_path, cache_dir)
 
     if "scene" not in data:
         raise ValueError(f"There is no scene data in this json file: {json_path}")
 
     created_objects = _Front3DLoader.create_mesh_objects_from_file(data, front_3D_texture_path,
-                                                                   ceiling_light_strength, label_mapping, json_path)
+                                                                   ceiling_light_strength, label_mapping, json_path,
+                                                                   merge_meshes_per_room)
 
     all_loaded_furniture = _Front3DLoader.load_small_furniture_objs(data, future_model_path,
-                                                              lamp_light_strength, label_mapping)
+                                                              lamp_light_strength, label_mapping,
+                                                              furniture_cache_dir)
 
-    created_objects += _Front3DLoader.move_and_duplicate_furniture(data, all_loaded_furniture)
+    created_objects += _Front3DLoader.move_and_duplicate_furniture(data, all_loaded_furniture,
+                                                                   linked_furniture_duplicates)
 
     # add an identifier to the obj
     for obj in created_objects:
@@ -163,7 +220,9 @@ def load_small_front3d(json_path: str, future_model_path: str, front_3D_texture_
     return created_objects
 
 def load_front3d_no_furniture(json_path: str, future_model_path: str, front_3D_texture_path: str, label_mapping: LabelIdMapping,
-                 ceiling_light_strength: float , lamp_light_strength: float ) -> List[MeshObject]:
+                 ceiling_light_strength: float , lamp_light_strength: float,
+                 cache_dir: Optional[str] = None,
+                 merge_meshes_per_room: bool = False) -> List[MeshObject]:
     """ Loads the 3D-Front scene specified by the given json file.
 
     :param json_path: Path to the json file, where the house information is stored.
@@ -172,6 +231,11 @@ def load_front3d_no_furniture(json_path: str, future_model_path: str, front_3D_t
     :param label_mapping: A dict which maps the names of the objects to ids.
     :param ceiling_light_strength: Strength of the emission shader used in the ceiling.
     :param lamp_light_strength: Strength of the emission shader used in each lamp.
+    :param cache_dir: If given, each house json is converted once into a binary cache inside this folder, which
+                      is used instead of parsing the json file, when the same house is loaded again.
+    :param merge_meshes_per_room: If True, all architectural meshes (walls, floors, ceilings, ...) of the same type
+                                  inside the same room are combined into one object. This reduces the number of
+                                  objects drastically, which speeds up the scene construction and rendering.
     :return: The list of loaded mesh objects.
     """
     json_path = resolve_path(json_path)
@@ -185,15 +249,15 @@ def load_front3d_no_furniture(json_path: str, future_model_path: str, front_3D_t
     if not os.path.exists(future_model_path):
         raise FileNotFoundError(f"The 3D future model path does not exist: {future_model_path}")
 
-    # load data from json file
-    with open(json_path, "r", encoding="utf-8") as json_file:
-        data = json.load(json_file)
+    # load data from json file or from its preprocessed cache
+    data = _Front3DLoader.load_json_data(json_path, cache_dir)
 
     if "scene" not in data:
         raise ValueError(f"There is no scene data in this json file: {json_path}")
 
     created_objects = _Front3DLoader.create_mesh_objects_from_file(data, front_3D_texture_path,
-                                                                   ceiling_light_strength, label_mapping, json_path)
+                                                                   ceiling_light_strength, label_mapping, json_path,
+                                                                   merge_meshes_per_room)
 
     # add an identifier to the obj
     for obj in created_objects:
@@ -215,6 +279,101 @@ class _Front3DLoader:
     The Front3DLoader creates automatically lights in the scene, by adding emission shaders to the ceiling and lamps.
     """
 
+    # The mesh arrays stored in the binary cache together with their data type
+    cached_mesh_arrays = {"xyz": np.float32, "normal": np.float32, "uv": np.float32, "faces": np.int32}
+    # Increase this, if the layout of the cache changes, to invalidate old caches
+    cache_version = 1
+
+    @staticmethod
+    def load_json_data(json_path: str, cache_dir: Optional[str] = None) -> dict:
+        """
+        Loads the data of the given house json file.
+
+        If a cache dir is given, the json file is converted once into a folder containing a small json file with
+        all non-mesh data and one contiguous .npy file per mesh attribute (float32 vertices, normals and uvs, int32
+        faces). The folder is named after the hash of the json file, so later loads of the same house memory map
+        these arrays instead of parsing the whole json file.
+
+        :param json_path: Path to the json file, where the house information is stored.
+        :param cache_dir: The folder in which the preprocessed houses are stored. If None, no cache is used.
+        :return: The json data, the mesh attributes are either lists or numpy arrays.
+        """
+        if cache_dir is None:
+            with open(json_path, "r", encoding="utf-8") as json_file:
+                return json.load(json_file)
+
+        hasher = hashlib.sha1()
+        with open(json_path, "rb") as json_file:
+            for chunk in iter(lambda: json_file.read(1 << 20), b""):
+                hasher.update(chunk)
+        house_cache_dir = os.path.join(resolve_path(cache_dir),
+                                       f"{hasher.hexdigest()}_v{_Front3DLoader.cache_version}")
+        if os.path.exists(house_cache_dir):
+            return _Front3DLoader._read_house_cache(house_cache_dir)
+
+        with open(json_path, "r", encoding="utf-8") as json_file:
+            data = json.load(json_file)
+        _Front3DLoader._write_house_cache(data, house_cache_dir)
+        return data
+
+    @staticmethod
+    def _write_house_cache(data: dict, house_cache_dir: str):
+        """
+        Writes the given json data into the given cache folder, see load_json_data().
+
+        The cache is first written into a temporary folder and then renamed, so concurrent processes never read a
+        partially written cache.
+
+        :param data: The json data of the house.
+        :param house_cache_dir: The folder in which the cache of this house should be stored.
+        """
+        meta_data = dict(data)
+        meta_data["mesh"] = []
+        arrays = {key: [] for key in _Front3DLoader.cached_mesh_arrays}
+        array_sizes = {key: 0 for key in _Front3DLoader.cached_mesh_arrays}
+        for mesh_data in data.get("mesh", []):
+            meta_mesh_data = {key: value for key, value in mesh_data.items()
+                              if key not in _Front3DLoader.cached_mesh_arrays}
+            meta_mesh_data["cache_ranges"] = {}
+            for key, dtype in _Front3DLoader.cached_mesh_arrays.items():
+                if key in mesh_data:
+                    # None values (e.g. in uvs) are stored as nan
+                    values = np.asarray(mesh_data[key], dtype=dtype).reshape(-1)
+                    meta_mesh_data["cache_ranges"][key] = [array_sizes[key], array_sizes[key] + len(values)]
+                    arrays[key].append(values)
+                    array_sizes[key] += len(values)
+            meta_data["mesh"].append(meta_mesh_data)
+
+        tmp_dir = house_cache_dir + f".{uuid.uuid4().hex}.tmp"
+        os.makedirs(tmp_dir)
+        for key, dtype in _Front3DLoader.cached_mesh_arrays.items():
+            values = np.concatenate(arrays[key]) if arrays[key] else np.zeros(0, dtype=dtype)
+            np.save(os.path.join(tmp_dir, key + ".npy"), values)
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as meta_file:
+            json.dump(meta_data, meta_file)
+        try:
+            os.replace(tmp_dir, house_cache_dir)
+        except OSError:
+            # Another process has written the same cache in the meantime
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _read_house_cache(house_cache_dir: str) -> dict:
+        """
+        Reads the json data of a house from the given cache folder, see load_json_data().
+
+        :param house_cache_dir: The folder in which the cache of this house is stored.
+        :return: The json data, where the mesh attributes are views into the memory mapped arrays.
+        """
+        with open(os.path.join(house_cache_dir, "meta.json"), "r", encoding="utf-8") as meta_file:
+            data = json.load(meta_file)
+        arrays = {key: np.load(os.path.join(house_cache_dir, key + ".npy"), mmap_mode="r")
+                  for key in _Front3DLoader.cached_mesh_arrays}
+        for mesh_data in data["mesh"]:
+            for key, (start, end) in mesh_data.pop("cache_ranges").items():
+                mesh_data[key] = arrays[key][start:end]
+        return data
+
     @staticmethod
     def extract_hash_nr_for_texture(given_url: str, front_3D_texture_path: str) -> str:
         """
@@ -261,7 +420,8 @@ def get_used_image(hash_folder_path: str, saved_image_dict: Mapping[str, bpy.typ
 
     @staticmethod
     def create_mesh_objects_from_file(data: dict, front_3D_texture_path: str, ceiling_light_strength: float,
-                                      label_mapping: LabelIdMapping, json_path: str) -> List[MeshObject]:
+                                      label_mapping: LabelIdMapping, json_path: str,
+                                      merge_meshes_per_room: bool = False) -> List[MeshObject]:
         """
         This creates for a given data json block all defined meshes and assigns the correct materials.
         This means that the json file contains some mesh, like walls and floors, which have to built up manually.
@@ -273,23 +433,30 @@ def create_mesh_objects_from_file(data: dict, front_3D_texture_path: str, ceilin
         :param ceiling_light_strength: Strength of the emission shader used in the ceiling.
         :param label_mapping: A dict which maps the names of the objects to ids.
         :param json_path: Path to the json file, where the house information is stored.
+        :param merge_meshes_per_room: If True, all meshes of the same type inside the same room are combined into
+                                      one object, each face keeps its material via its material index.
         :return: The list of loaded mesh objects.
         """
-        # extract all used materials -> there are more materials defined than used
-        used_materials = []
+        # extract all used materials -> there are more materials defined than used, index them by their uid
+        used_materials = {}
         for mat in data["material"]:
-            used_materials.append({"uid": mat["uid"], "texture": mat["texture"],
-                                   "normaltexture": mat["normaltexture"], "color": mat["color"]})
-
-        created_objects = []
-        # maps loaded images from image file path to bpy.type.image
-        saved_images = {}
-        saved_normal_images = {}
-        # materials based on colors to avoid recreating the same material over and over
-        used_materials_based_on_color = {}
-        # materials based on texture to avoid recreating the same material over and over
-        used_materials_based_on_texture = {}
-        for mesh_data in data["mesh"]:
+            if mat["uid"] not in used_materials:
+                used_materials[mat["uid"]] = {"texture": mat["texture"], "normaltexture": mat["normaltexture"],
+                                              "color": mat["color"]}
+
+        # caches the loaded images and created materials, to avoid recreating them over and over
+        material_cache = {"images": {}, "normal_images": {}, "based_on_color": {}, "based_on_texture": {}}
+
+        # maps each mesh uid to the room it belongs to
+        mesh_room_ids = {}
+        if merge_meshes_per_room:
+            for room_id, room in enumerate(data["scene"]["room"]):
+                for child in room["children"]:
+                    mesh_room_ids.setdefault(child["ref"], room_id)
+
+        # collect the meshes and their materials for each object which should be created
+        object_parts = {}
+        for mesh_index, mesh_data in enumerate(data["mesh"]):
             # extract the obj name, which also is used as the category_id name
             used_obj_name = mesh_data["type"].strip()
             if used_obj_name == "":
@@ -297,6 +464,26 @@ def create_mesh_objects_from_file(data: dict, front_3D_texture_path: str, ceilin
             if "material" not in mesh_data:
                 warnings.warn(f"Material is not defined for {used_obj_name} in this file: {json_path}")
                 continue
+
+            # get the material based on the uid of the current mesh data
+            used_mat = used_materials.get(mesh_data["material"])
+            mat = None
+            if used_mat:
+                mat = _Front3DLoader.get_material(used_mat, used_obj_name, front_3D_texture_path,
+                                                  ceiling_light_strength, material_cache)
+
+            if merge_meshes_per_room:
+                room_id = mesh_room_ids.get(mesh_data.get("uid"))
+                object_key = (room_id, used_obj_name)
+            else:
+                room_id = None
+                object_key = mesh_index
+            if object_key not in object_parts:
+                object_parts[object_key] = (used_obj_name, room_id, [])
+            object_parts[object_key][2].append((mesh_data, mat))
+
+        created_objects = []
+        for used_obj_name, room_id, parts in object_parts.values():
             # create a new mesh
             obj = create_with_empty_mesh(used_obj_name, used_obj_name + "_mesh")
             created_objects.append(obj)
@@ -304,151 +491,189 @@ def create_mesh_objects_from_file(data: dict, front_3D_texture_path: str, ceilin
             # set two custom properties, first that it is a 3D_future object and second the category_id
             obj.set_cp("is_3D_future", True)
             obj.set_cp("category_id", label_mapping.id_from_label(used_obj_name.lower()))
+            if room_id is not None:
+                obj.set_cp("room_id", room_id)
 
-            # get the material uid of the current mesh data
-            current_mat = mesh_data["material"]
-            used_mat = None
-            # search in the used materials after this uid
-            for u_mat in used_materials:
-                if u_mat["uid"] == current_mat:
-                    used_mat = u_mat
-                    break
-            # If there should be a material used
-            if used_mat:
-                if used_mat["texture"]:
-                    # extract the has folder is from the url and download it if necessary
-                    hash_folder = _Front3DLoader.extract_hash_nr_for_texture(used_mat["texture"], front_3D_texture_path)
-                    if hash_folder in used_materials_based_on_texture and "ceiling" not in used_obj_name.lower():
-                        mat = used_materials_based_on_texture[hash_folder]
-                        obj.add_material(mat)
-                    else:
-                        # Create a new material
-                        mat = MaterialLoaderUtility.create(name=used_obj_name + "_material")
-                        principled_node = mat.get_the_one_node_with_type("BsdfPrincipled")
-                        if used_mat["color"]:
-                            principled_node.inputs["Base Color"].default_value = mathutils.Vector(
-                                used_mat["color"]) / 255.0
-
-                        used_image = _Front3DLoader.get_used_image(hash_folder, saved_images)
-                        mat.set_principled_shader_value("Base Color", used_image)
-
-                        if "ceiling" in used_obj_name.lower():
-                            # Reshape the flat list into an array of points
-                            points = np.array(mesh_data["xyz"]).reshape(-1, 3)
-                            # Calculate the distances between each pair of points
-                            distances = np.linalg.norm(points[:, np.newaxis] - points, axis=-1)
-                            # Find the maximum distance
-                            max_distance = np.max(distances)
-                            mat.make_emissive(ceiling_light_strength,
-                                              emission_color=mathutils.Vector(used_mat["color"]) / 255.0)
-
-                        if used_mat["normaltexture"]:
-                            # get the used image based on the normal texture path
-                            # extract the has folder is from the url and download it if necessary
-                            hash_folder = _Front3DLoader.extract_hash_nr_for_texture(used_mat["normaltexture"],
-                                                                                     front_3D_texture_path)
-                            used_image = _Front3DLoader.get_used_image(hash_folder, saved_normal_images)
-
-                            # create normal texture
-                            normal_texture = MaterialLoaderUtility.create_image_node(mat.nodes, used_image, True)
-                            normal_map = mat.nodes.new("ShaderNodeNormalMap")
-                            normal_map.inputs["Strength"].default_value = 1.0
-                            mat.links.new(normal_texture.outputs["Color"], normal_map.inputs["Color"])
-                            # connect normal texture to principled shader
-                            mat.set_principled_shader_value("Normal", normal_map.outputs["Normal"])
-
-                        obj.add_material(mat)
-                        used_materials_based_on_texture[hash_folder] = mat
-                # if there is a normal color used
-                elif used_mat["color"]:
-                    used_hash = tuple(used_mat["color"])
-                    if used_hash in used_materials_based_on_color and "ceiling" not in used_obj_name.lower():
-                        mat = used_materials_based_on_color[used_hash]
-                    else:
-                        # Create a new material
-                        mat = MaterialLoaderUtility.create(name=used_obj_name + "_material")
-                        # create a principled node and set the default color
-                        principled_node = mat.get_the_one_node_with_type("BsdfPrincipled")
-                        principled_node.inputs["Base Color"].default_value = mathutils.Vector(used_mat["color"]) / 255.0
-                        # if the object is a ceiling add some light output
-                        if "ceiling" in used_obj_name.lower():
-                            mat.make_emissive(ceiling_light_strength,
-                                              emission_color=mathutils.Vector(used_mat["color"]) / 255.0)
-                    
-                        else:
-                            used_materials_based_on_color[used_hash] = mat
-
-                    # as this material was just created the material is just append it to the empty list
-                    obj.add_material(mat)
-
-            # extract the vertices from the mesh_data
-            vert = [float(ele) for ele in mesh_data["xyz"]]
-            # extract the faces from the mesh_data
-            faces = mesh_data["faces"]
-            # extract the normals from the mesh_data
-            normal = [float(ele) for ele in mesh_data["normal"]]
-
-            # map those to the blender coordinate system
-            num_vertices = int(len(vert) / 3)
-            vertices = np.reshape(np.array(vert), [num_vertices, 3])
-            normal = np.reshape(np.array(normal), [num_vertices, 3])
-            # flip the first and second value
-            vertices[:, 1], vertices[:, 2] = vertices[:, 2], vertices[:, 1].copy()
-            normal[:, 1], normal[:, 2] = normal[:, 2], normal[:, 1].copy()
-            # reshape back to a long list
-            vertices = np.reshape(vertices, [num_vertices * 3])
-            normal = np.reshape(normal, [num_vertices * 3])
-
-            # add this new data to the mesh object
-            mesh = obj.get_mesh()
-            mesh.vertices.add(num_vertices)
-            mesh.vertices.foreach_set("co", vertices)
-            mesh.vertices.foreach_set("normal", normal)
-
-            # link the faces as vertex indices
-            num_vertex_indicies = len(faces)
-            mesh.loops.add(num_vertex_indicies)
-            mesh.loops.foreach_set("vertex_index", faces)
-
-            # the loops are set based on how the faces are a ranged
-            num_loops = int(num_vertex_indicies / 3)
-            mesh.polygons.add(num_loops)
-            # always 3 vertices form one triangle
-            loop_start = np.arange(0, num_vertex_indicies, 3)
-            # the total size of each triangle is therefore 3
-            loop_total = [3] * num_loops
-            mesh.polygons.foreach_set("loop_start", loop_start)
-            mesh.polygons.foreach_set("loop_total", loop_total)
-
-            # the uv coordinates are reshaped then the face coords are extracted
-            uv_mesh_data = [float(ele) for ele in mesh_data["uv"] if ele is not None]
-            # bb1737bf-dae6-4215-bccf-fab6f584046b.json includes one mesh which only has no UV mapping
-            if uv_mesh_data:
-                uv = np.reshape(np.array(uv_mesh_data), [num_vertices, 2])
-                used_uvs = uv[faces, :]
-                # and again reshaped back to the long list
-                used_uvs = np.reshape(used_uvs, [2 * num_vertex_indicies])
-
-                mesh.uv_layers.new(name="new_uv_layer")
-                mesh.uv_layers[-1].data.foreach_set("uv", used_uvs)
+            _Front3DLoader.fill_mesh(obj, parts)
+
+        return created_objects
+
+    @staticmethod
+    def get_material(used_mat: dict, used_obj_name: str, front_3D_texture_path: str, ceiling_light_strength: float,
+                     material_cache: Dict[str, dict]) -> Optional[Material]:
+        """
+        Returns the material for the given material data, materials are reused based on their texture or color.
+        Ceilings always get their own emissive material.
+
+        :param used_mat: The material data containing "texture", "normaltexture" and "color".
+        :param used_obj_name: The name of the object the material is used for.
+        :param front_3D_texture_path: Path to the 3D-FRONT-texture folder.
+        :param ceiling_light_strength: Strength of the emission shader used in the ceiling.
+        :param material_cache: The already loaded images and created materials.
+        :return: The material or None, if the material data neither specifies a texture nor a color.
+        """
+        is_ceiling = "ceiling" in used_obj_name.lower()
+        if used_mat["texture"]:
+            # extract the has folder is from the url and download it if necessary
+            hash_folder = _Front3DLoader.extract_hash_nr_for_texture(used_mat["texture"], front_3D_texture_path)
+            if hash_folder in material_cache["based_on_texture"] and not is_ceiling:
+                return material_cache["based_on_texture"][hash_folder]
+
+            # Create a new material
+            mat = MaterialLoaderUtility.create(name=used_obj_name + "_material")
+            principled_node = mat.get_the_one_node_with_type("BsdfPrincipled")
+            if used_mat["color"]:
+                principled_node.inputs["Base Color"].default_value = mathutils.Vector(used_mat["color"]) / 255.0
+
+            used_image = _Front3DLoader.get_used_image(hash_folder, material_cache["images"])
+            mat.set_principled_shader_value("Base Color", used_image)
+
+            if is_ceiling:
+                mat.make_emissive(ceiling_light_strength, emission_color=mathutils.Vector(used_mat["color"]) / 255.0)
+
+            if used_mat["normaltexture"]:
+                # get the used image based on the normal texture path
+                # extract the has folder is from the url and download it if necessary
+                normal_hash_folder = _Front3DLoader.extract_hash_nr_for_texture(used_mat["normaltexture"],
+                                                                                front_3D_texture_path)
+                used_image = _Front3DLoader.get_used_image(normal_hash_folder, material_cache["normal_images"])
+
+                # create normal texture
+                normal_texture = MaterialLoaderUtility.create_image_node(mat.nodes, used_image, True)
+                normal_map = mat.nodes.new("ShaderNodeNormalMap")
+                normal_map.inputs["Strength"].default_value = 1.0
+                mat.links.new(normal_texture.outputs["Color"], normal_map.inputs["Color"])
+                # connect normal texture to principled shader
+                mat.set_principled_shader_value("Normal", normal_map.outputs["Normal"])
+
+            material_cache["based_on_texture"][hash_folder] = mat
+            return mat
+        # if there is a normal color used
+        if used_mat["color"]:
+            used_hash = tuple(used_mat["color"])
+            if used_hash in material_cache["based_on_color"] and not is_ceiling:
+                return material_cache["based_on_color"][used_hash]
+
+            # Create a new material
+            mat = MaterialLoaderUtility.create(name=used_obj_name + "_material")
+            # create a principled node and set the default color
+            principled_node = mat.get_the_one_node_with_type("BsdfPrincipled")
+            principled_node.inputs["Base Color"].default_value = mathutils.Vector(used_mat["color"]) / 255.0
+            # if the object is a ceiling add some light output
+            if is_ceiling:
+                mat.make_emissive(ceiling_light_strength, emission_color=mathutils.Vector(used_mat["color"]) / 255.0)
             else:
-                warnings.warn(f"This mesh {obj.get_name()} does not have a specified uv map!")
+                material_cache["based_on_color"][used_hash] = mat
+            return mat
+        return None
 
-            # this update converts the upper data into a mesh
-            mesh.update()
+    @staticmethod
+    def extract_mesh_arrays(mesh_data: dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """
+        Extracts the geometry of one mesh of the json file and maps it to the blender coordinate system.
 
-            # the generation might fail if the data does not line up
-            # this is not used as even if the data does not line up it is still able to render the objects
-            # We assume that not all meshes in the dataset do conform with the mesh standards set in blender
-            # result = mesh.validate(verbose=False)
-            # if result:
-            #    raise Exception("The generation of the mesh: {} failed!".format(used_obj_name))
+        :param mesh_data: The mesh data containing "xyz", "normal", "faces" and "uv".
+        :return: The vertices [N, 3], the vertex normals [N, 3], the vertex indices of all triangles [M * 3] and
+                 the uv coordinates of each triangle corner [M * 3, 2] or None, if the mesh has no uv map.
+        """
+        # extract the vertices, normals and faces from the mesh_data
+        vertices = np.array(mesh_data["xyz"], dtype=np.float32).reshape(-1, 3)
+        normals = np.array(mesh_data["normal"], dtype=np.float32).reshape(-1, 3)
+        faces = np.asarray(mesh_data["faces"], dtype=np.int32)
+
+        # map those to the blender coordinate system, by flipping the first and second value
+        vertices[:, [1, 2]] = vertices[:, [2, 1]]
+        normals[:, [1, 2]] = normals[:, [2, 1]]
+
+        # the uv coordinates are reshaped then the face coords are extracted
+        uv_mesh_data = np.asarray(mesh_data["uv"], dtype=np.float32)
+        # missing uv values are converted to nan by numpy, remove them
+        uv_mesh_data = uv_mesh_data[~np.isnan(uv_mesh_data)]
+        # bb1737bf-dae6-4215-bccf-fab6f584046b.json includes one mesh which only has no UV mapping
+        if len(uv_mesh_data) == 0:
+            return vertices, normals, faces, None
+        uv = np.reshape(uv_mesh_data, [len(vertices), 2])
+        return vertices, normals, faces, uv[faces, :]
 
-        return created_objects
+    @staticmethod
+    def fill_mesh(obj: MeshObject, parts: List[Tuple[dict, Optional[Material]]]):
+        """
+        Fills the empty mesh of the given object with the geometry of all given parts.
+
+        All attributes are concatenated first and then set with one foreach_set call each. If the parts use
+        different materials, each face gets the material index of its part.
+
+        :param obj: The object with an empty mesh.
+        :param parts: The mesh data of each part together with its material.
+        """
+        vertices, normals, faces, uvs, material_indices = [], [], [], [], []
+        materials: List[Optional[Material]] = []
+        num_vertices = 0
+        has_uvs = False
+        for mesh_data, mat in parts:
+            part_vertices, part_normals, part_faces, part_uvs = _Front3DLoader.extract_mesh_arrays(mesh_data)
+            if part_uvs is None:
+                warnings.warn(f"This mesh {obj.get_name()} does not have a specified uv map!")
+                part_uvs = np.zeros((len(part_faces), 2), dtype=np.float32)
+            else:
+                has_uvs = True
+            if mat not in materials:
+                materials.append(mat)
+
+            vertices.append(part_vertices)
+            normals.append(part_normals)
+            faces.append(part_faces + num_vertices)
+            uvs.append(part_uvs)
+            material_indices.append(np.full(len(part_faces) // 3, materials.index(mat), dtype=np.int32))
+            num_vertices += len(part_vertices)
+
+        vertices = np.concatenate(vertices)
+        normals = np.concatenate(normals)
+        faces = np.concatenate(faces)
+
+        # objects without any material do not get a material slot
+        if materials != [None]:
+            for mat in materials:
+                obj.get_mesh().materials.append(mat.blender_obj if mat is not None else None)
+
+        # add this new data to the mesh object
+        mesh = obj.get_mesh()
+        mesh.vertices.add(num_vertices)
+        mesh.vertices.foreach_set("co", vertices.reshape(-1))
+        mesh.vertices.foreach_set("normal", normals.reshape(-1))
+
+        # link the faces as vertex indices
+        num_vertex_indices = len(faces)
+        mesh.loops.add(num_vertex_indices)
+        mesh.loops.foreach_set("vertex_index", faces)
+
+        # the loops are set based on how the faces are a ranged
+        num_polygons = num_vertex_indices // 3
+        mesh.polygons.add(num_polygons)
+        # always 3 vertices form one triangle, the total size of each triangle is therefore 3
+        mesh.polygons.foreach_set("loop_start", np.arange(0, num_vertex_indices, 3, dtype=np.int32))
+        mesh.polygons.foreach_set("loop_total", np.full(num_polygons, 3, dtype=np.int32))
+        if len(materials) > 1:
+            mesh.polygons.foreach_set("material_index", np.concatenate(material_indices))
+
+        if has_uvs:
+            mesh.uv_layers.new(name="new_uv_layer")
+            mesh.uv_layers[-1].data.foreach_set("uv", np.concatenate(uvs).reshape(-1))
+
+        # this update converts the upper data into a mesh
+        mesh.update()
+
+        # the generation might fail if the data does not line up
+        # this is not used as even if the data does not line up it is still able to render the objects
+        # We assume that not all meshes in the dataset do conform with the mesh standards set in blender
+        # result = mesh.validate(verbose=False)
+        # if result:
+        #    raise Exception("The generation of the mesh: {} failed!".format(used_obj_name))
 
     @staticmethod
     def load_small_furniture_objs(data: dict, future_model_path: str, lamp_light_strength: float,
-                            label_mapping: LabelIdMapping) -> List[MeshObject]:
+                                  label_mapping: LabelIdMapping,
+                                  furniture_cache_dir: Optional[str] = None) -> List[MeshObject]:
         """
         Load all furniture objects specified in the json file, these objects are stored as "raw_model.obj" in the
         3D_future_model_path. For lamp the lamp_light_strength value can be changed via the config.
@@ -457,94 +682,20 @@ def load_small_furniture_objs(data: dict, future_model_path: str, lamp_light_str
         :param future_model_path: Path to the models used in the 3D-Front dataset.
         :param lamp_light_strength: Strength of the emission shader used in each lamp.
         :param label_mapping: A dict which maps the names of the objects to ids.
+        :param furniture_cache_dir: The folder in which processed furniture models are cached as .blend files.
         :return: The list of loaded mesh objects.
         """
-        # collect all loaded furniture objects
-        all_objs = []
-        # for each furniture element
-        for ele in data["furniture"]:
-            if (("category" in ele) and (not any(char in ele["category"] for char in ["sofa", "bed", "table", "Sofa", "Bed", "Table"]))) or (("title" in ele) and (not any(char in ele["title"] for char in ["sofa", "bed", "table", "Sofa", "Bed", "Table"]))):
-                # if any(char in ele["category"] for char in ["sofa", "bed", "table", "Sofa", "Bed", "Table"])):
-                # create the paths based on the "jid"
-                folder_path = os.path.join(future_model_path, ele["jid"])
-                obj_file = os.path.join(folder_path, "raw_model.obj")
-                # if the object exists load it -> a lot of object do not exist
-                # we are unsure why this is -> we assume that not all objects have been made public
-                if os.path.exists(obj_file) and not "7e101ef3-7722-4af8-90d5-7c562834fabd" in obj_file:
-                    # load all objects from this .obj file
-                    objs = load_obj(filepath=obj_file)
-                    # extract the name, which serves as category id
-                    used_obj_name = ""
-                    if "category" in ele:
-                        used_obj_name = ele["category"]
-                    elif "title" in ele:
-                        used_obj_name = ele["title"]
-                        if "/" in used_obj_name:
-                            used_obj_name = used_obj_name.split("/")[0]
-                    if used_obj_name == "":
-                        used_obj_name = "others"
-                    for obj in objs:
-                        obj.set_name(used_obj_name)
-                        # add some custom properties
-                        obj.set_cp("uid", ele["uid"])
-                        # this custom property determines if the object was used before
-                        # is needed to only clone the second appearance of this object
-                        obj.set_cp("is_used", False)
-                        obj.set_cp("is_3D_future", True)
-                        obj.set_cp("3D_future_type", "Non-Object")  # is an non object used for the interesting score
-                        # set the category id based on the used obj name
-                        obj.set_cp("category_id", label_mapping.id_from_label(used_obj_name.lower()))
-                        # walk over all materials
-                        for mat in obj.get_materials():
-                            if mat is None:
-                                continue
-                            principled_node = mat.get_nodes_with_type("BsdfPrincipled")
-                            if "bed" in used_obj_name.lower() or "sofa" in used_obj_name.lower():
-                                if len(principled_node) == 1:
-                                    principled_node[0].inputs["Roughness"].default_value = 0.5
-                            is_lamp = "lamp" in used_obj_name.lower()
-                            is_light = "light" in used_obj_name.lower()
-                            if len(principled_node) == 0 and is_lamp:
-                                # this material has already been transformed
-                                continue
-                            if len(principled_node) == 1:
-                                principled_node = principled_node[0]
-                            else:
-                                raise ValueError(f"The amount of principle nodes can not be more than 1, "
-                                                f"for obj: {obj.get_name()}!")
-
-                            # Front3d .mtl files contain emission color which make the object mistakenly emissive
-                            # => Reset the emission color
-                            principled_node.inputs["Emission"].default_value[:3] = [0, 0, 0]
-
-                            # Front3d .mtl files use Tf incorrectly, they make all materials fully transmissive
-                            # Revert that:
-                            principled_node.inputs["Transmission"].default_value = 0
-
-                            # For each a texture node
-                            image_node = mat.new_node('ShaderNodeTexImage')
-                            # and load the texture.png
-                            base_image_path = os.path.join(folder_path, "texture.png")
-                            image_node.image = bpy.data.images.load(base_image_path, check_existing=True)
-                            mat.link(image_node.outputs['Color'], principled_node.inputs['Base Color'])
-                            # if the object is a lamp, do the same as for the ceiling and add an emission shader
-                            if is_light or is_lamp:
-                                mat.make_emissive(lamp_light_strength)
-                                # light_data = bpy.data.lights.new(name="Lamp"+str(used_obj_name), type='POINT')
-                                # light_data.color = [1.0, 1.0, 1.0] 
-                                # light_data.energy = lamp_light_strength 
-                                # light_object = bpy.data.objects.new(name="Lamp"+str(used_obj_name), object_data=light_data)
-                                # bpy.context.collection.objects.link(light_object)
-                                # light_object.parent = obj.blender_obj
-
-                    all_objs.extend(objs)
-                elif "7e101ef3-7722-4af8-90d5-7c562834fabd" in obj_file:
-                    warnings.warn(f"This file {obj_file} was skipped as it can not be read by blender.")
-        return all_objs
-    
+        large_furniture = ["sofa", "bed", "table", "Sofa", "Bed", "Table"]
+        small_furniture = [ele for ele in data["furniture"]
+                           if (("category" in ele) and (not any(char in ele["category"] for char in large_furniture)))
+                           or (("title" in ele) and (not any(char in ele["title"] for char in large_furniture)))]
+        return _Front3DLoader.load_furniture_objs({"furniture": small_furniture}, future_model_path,
+                                                  lamp_light_strength, label_mapping, furniture_cache_dir)
+
     @staticmethod
     def load_furniture_objs(data: dict, future_model_path: str, lamp_light_strength: float,
-                            label_mapping: LabelIdMapping) -> List[MeshObject]:
+                            label_mapping: LabelIdMapping,
+                            furniture_cache_dir: Optional[str] = None) -> List[MeshObject]:
         """
         Load all furniture objects specified in the json file, these objects are stored as "raw_model.obj" in the
         3D_future_model_path. For lamp the lamp_light_strength value can be changed via the config.
@@ -553,6 +704,7 @@ def load_furniture_objs(data: dict, future_model_path: str, lamp_light_strength:
         :param future_model_path: Path to the models used in the 3D-Front dataset.
         :param lamp_light_strength: Strength of the emission shader used in each lamp.
         :param label_mapping: A dict which maps the names of the objects to ids.
+        :param furniture_cache_dir: The folder in which processed furniture models are cached as .blend files.
         :return: The list of loaded mesh objects.
         """
         # collect all loaded furniture objects
@@ -565,8 +717,6 @@ def load_furniture_objs(data: dict, future_model_path: str, lamp_light_strength:
             # if the object exists load it -> a lot of object do not exist
             # we are unsure why this is -> we assume that not all objects have been made public
             if os.path.exists(obj_file) and not "7e101ef3-7722-4af8-90d5-7c562834fabd" in obj_file:
-                # load all objects from this .obj file
-                objs = load_obj(filepath=obj_file)
                 # extract the name, which serves as category id
                 used_obj_name = ""
                 if "category" in ele:
@@ -577,6 +727,9 @@ def load_furniture_objs(data: dict, future_model_path: str, lamp_light_strength:
                         used_obj_name = used_obj_name.split("/")[0]
                 if used_obj_name == "":
                     used_obj_name = "others"
+                # load all objects from this .obj file or from the cache
+                objs = _Front3DLoader.load_furniture_model(folder_path, used_obj_name, lamp_light_strength,
+                                                           furniture_cache_dir)
                 for obj in objs:
                     obj.set_name(used_obj_name)
                     # add some custom properties
@@ -588,49 +741,6 @@ def load_furniture_objs(data: dict, future_model_path: str, lamp_light_strength:
                     obj.set_cp("3D_future_type", "Non-Object")  # is an non object used for the interesting score
                     # set the category id based on the used obj name
                     obj.set_cp("category_id", label_mapping.id_from_label(used_obj_name.lower()))
-                    # walk over all materials
-                    for mat in obj.get_materials():
-                        if mat is None:
-                            continue
-                        principled_node = mat.get_nodes_with_type("BsdfPrincipled")
-                        if "bed" in used_obj_name.lower() or "sofa" in used_obj_name.lower():
-                            if len(principled_node) == 1:
-                                principled_node[0].inputs["Roughness"].default_value = 0.5
-                        is_lamp = "lamp" in used_obj_name.lower()
-                        is_light = "light" in used_obj_name.lower()
-                        if len(principled_node) == 0 and is_lamp:
-                            # this material has already been transformed
-                            continue
-                        if len(principled_node) == 1:
-                            principled_node = principled_node[0]
-                        else:
-                            raise ValueError(f"The amount of principle nodes can not be more than 1, "
-                                             f"for obj: {obj.get_name()}!")
-
-                        # Front3d .mtl files contain emission color which make the object mistakenly emissive
-                        # => Reset the emission color
-                        principled_node.inputs["Emission"].default_value[:3] = [0, 0, 0]
-
-                        # Front3d .mtl files use Tf incorrectly, they make all materials fully transmissive
-                        # Revert that:
-                        principled_node.inputs["Transmission"].default_value = 0
-
-                        # For each a texture node
-                        image_node = mat.new_node('ShaderNodeTexImage')
-                        # and load the texture.png
-                        base_image_path = os.path.join(folder_path, "texture.png")
-                        image_node.image = bpy.data.images.load(base_image_path, check_existing=True)
-                        mat.link(image_node.outputs['Color'], principled_node.inputs['Base Color'])
-                        # if the object is a lamp, do the same as for the ceiling and add an emission shader
-                        if is_light or is_lamp:
-                            mat.make_emissive(lamp_light_strength)
-                            # light_data = bpy.data.lights.new(name="Lamp"+str(used_obj_name), type='POINT')
-                            # light_data.color = [1.0, 1.0, 1.0] 
-                            # light_data.energy = lamp_light_strength 
-                            # light_object = bpy.data.objects.new(name="Lamp"+str(used_obj_name), object_data=light_data)
-                            # bpy.context.collection.objects.link(light_object)
-                            # light_object.parent = obj.blender_obj
-
 
                 all_objs.extend(objs)
             elif "7e101ef3-7722-4af8-90d5-7c562834fabd" in obj_file:
@@ -638,7 +748,86 @@ def load_furniture_objs(data: dict, future_model_path: str, lamp_light_strength:
         return all_objs
 
     @staticmethod
-    def move_and_duplicate_furniture(data: dict, all_loaded_furniture: list) -> List[MeshObject]:
+    def load_furniture_model(folder_path: str, used_obj_name: str, lamp_light_strength: float,
+                             furniture_cache_dir: Optional[str] = None) -> List[MeshObject]:
+        """
+        Loads the "raw_model.obj" of one 3D-FUTURE model and fixes its materials.
+
+        If a cache folder is given, the processed model is stored there as .blend file the first time and appended
+        from there afterwards, which is much faster than parsing the .obj file and rebuilding all materials. As the
+        material processing depends on the category and the lamp light strength, these are part of the cache key.
+
+        :param folder_path: The folder of the model, which contains "raw_model.obj" and "texture.png".
+        :param used_obj_name: The name of the object, which is used to determine the category.
+        :param lamp_light_strength: Strength of the emission shader used in each lamp.
+        :param furniture_cache_dir: The folder in which processed furniture models are cached as .blend files.
+                                    If None, no cache is used.
+        :return: The list of loaded mesh objects.
+        """
+        is_bed_or_sofa = "bed" in used_obj_name.lower() or "sofa" in used_obj_name.lower()
+        is_lamp = "lamp" in used_obj_name.lower()
+        is_light = "light" in used_obj_name.lower()
+
+        cache_path = None
+        if furniture_cache_dir is not None:
+            variant = f"{_Front3DLoader.cache_version}_{is_bed_or_sofa}_{is_lamp}_{is_light}"
+            if is_lamp or is_light:
+                variant += f"_{lamp_light_strength}"
+            variant_hash = hashlib.sha1(variant.encode("utf-8")).hexdigest()[:10]
+            cache_path = os.path.join(resolve_path(furniture_cache_dir),
+                                      f"{os.path.basename(folder_path)}_{variant_hash}.blend")
+            if os.path.exists(cache_path):
+                return load_blend(cache_path, obj_types=["mesh"])
+
+        objs = load_obj(filepath=os.path.join(folder_path, "raw_model.obj"))
+        for obj in objs:
+            obj.set_name(used_obj_name)
+            # walk over all materials
+            for mat in obj.get_materials():
+                if mat is None:
+                    continue
+                principled_node = mat.get_nodes_with_type("BsdfPrincipled")
+                if is_bed_or_sofa:
+                    if len(principled_node) == 1:
+                        principled_node[0].inputs["Roughness"].default_value = 0.5
+                if len(principled_node) == 0 and is_lamp:
+                    # this material has already been transformed
+                    continue
+                if len(principled_node) == 1:
+                    principled_node = principled_node[0]
+                else:
+                    raise ValueError(f"The amount of principle nodes can not be more than 1, "
+                                     f"for obj: {obj.get_name()}!")
+
+                # Front3d .mtl files contain emission color which make the object mistakenly emissive
+                # => Reset the emission color
+                principled_node.inputs["Emission"].default_value[:3] = [0, 0, 0]
+
+                # Front3d .mtl files use Tf incorrectly, they make all materials fully transmissive
+                # Revert that:
+                principled_node.inputs["Transmission"].default_value = 0
+
+                # For each a texture node
+                image_node = mat.new_node('ShaderNodeTexImage')
+                # and load the texture.png
+                base_image_path = os.path.join(folder_path, "texture.png")
+                image_node.image = bpy.data.images.load(base_image_path, check_existing=True)
+                mat.link(image_node.outputs['Color'], principled_node.inputs['Base Color'])
+                # if the object is a lamp, do the same as for the ceiling and add an emission shader
+                if is_light or is_lamp:
+                    mat.make_emissive(lamp_light_strength)
+
+        if cache_path is not None:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            # write into a temporary file first, so concurrent processes never read a partially written file
+            tmp_path = cache_path + f".{uuid.uuid4().hex}.tmp"
+            bpy.data.libraries.write(tmp_path, {obj.blender_obj for obj in objs}, path_remap="ABSOLUTE")
+            os.replace(tmp_path, cache_path)
+        return objs
+
+    @staticmethod
+    def move_and_duplicate_furniture(data: dict, all_loaded_furniture: list,
+                                     linked_duplicates: bool = False) -> List[MeshObject]:
         """
         Move and duplicate the furniture depending on the data in the data json dir.
         After loading each object gets a location based on the data in the json file. Some objects are used more than
@@ -646,35 +835,41 @@ def move_and_duplicate_furniture(data: dict, all_loaded_furniture: list) -> List
 
         :param data: json data dir. Should contain "scene", which should contain "room"
         :param all_loaded_furniture: all objects which have been loaded in load_furniture_objs
+        :param linked_duplicates: If True, furniture which is used more than once shares its mesh data with all its
+                                  duplicates, only the object (pose and custom properties) is copied. Changing the
+                                  mesh or the materials of one of them changes all of them.
         :return: The list of loaded mesh objects.
         """
         # this rotation matrix rotates the given quaternion into the blender coordinate system
         blender_rot_mat = mathutils.Matrix.Rotation(radians(-90), 4, 'X')
+        # index all loaded furniture objects by their uid, one .obj file can contain multiple objects
+        furniture_per_uid: Dict[str, List[MeshObject]] = {}
+        for obj in all_loaded_furniture:
+            furniture_per_uid.setdefault(obj.get_cp("uid"), []).append(obj)
         created_objects = []
         # for each room
         for room_id, room in enumerate(data["scene"]["room"]):
             # for each object in that room
             for child in room["children"]:
                 if "furniture" in child["instanceid"]:
-                    # find the object where the uid matches the child ref id
-                    for obj in all_loaded_furniture:
-                        if obj.get_cp("uid") == child["ref"]:
-                            # if the object was used before, duplicate the object and move that duplicated obj
-                            if obj.get_cp("is_used"):
-                                new_obj = obj.duplicate()
-                            else:
-                                # if it is the first time use the object directly
-                                new_obj = obj
-                            created_objects.append(new_obj)
-                            new_obj.set_cp("is_used", True)
-                            new_obj.set_cp("room_id", room_id)
-                            new_obj.set_cp("3D_future_type", "Object")  # is an object used for the interesting score
-                            new_obj.set_cp("coarse_grained_class", new_obj.get_cp("category_id"))
-                            # this flips the y and z coordinate to bring it to the blender coordinate system
-                            new_obj.set_location(mathutils.Vector(child["pos"]).xzy)
-                            new_obj.set_scale(child["scale"])
-                            # extract the quaternion and convert it to a rotation matrix
-                            rotation_mat = mathutils.Quaternion(child["rot"]).to_euler().to_matrix().to_4x4()
-                            # transform it into the blender coordinate system and then to an euler
-                            new_obj.set_rotation_euler((blender_rot_mat @ rotation_mat).to_euler())
+                    # find the objects where the uid matches the child ref id
+                    for obj in furniture_per_uid.get(child["ref"], []):
+                        # if the object was used before, duplicate the object and move that duplicated obj
+                        if obj.get_cp("is_used"):
+                            new_obj = obj.duplicate(linked=linked_duplicates)
+                        else:
+                            # if it is the first time use the object directly
+                            new_obj = obj
+                        created_objects.append(new_obj)
+                        new_obj.set_cp("is_used", True)
+                        new_obj.set_cp("room_id", room_id)
+                        new_obj.set_cp("3D_future_type", "Object")  # is an object used for the interesting score
+                        new_obj.set_cp("coarse_grained_class", new_obj.get_cp("category_id"))
+                        # this flips the y and z coordinate to bring it to the blender coordinate system
+                        new_obj.set_location(mathutils.Vector(child["pos"]).xzy)
+                        new_obj.set_scale(child["scale"])
+                        # extract the quaternion and convert it to a rotation matrix
+                        rotation_mat = mathutils.Quaternion(child["rot"]).to_euler().to_matrix().to_4x4()
+                        # transform it into the blender coordinate system and then to an euler
+                        new_obj.set_rotation_euler((blender_rot_mat @ rotation_mat).to_euler())
         return created_objects
@@ -1,6 +1,6 @@
 """A set of function to post process the produced images."""
 
-from typing import Union, List, Optional, Dict, Any
+from typing import Union, List, Optional, Dict, Any, Tuple
 
 import numpy as np
 import bpy
@@ -14,7 +14,8 @@
 
 def dist2depth(dist: Union[List[np.ndarray], np.ndarray], points_2d: Optional[np.ndarray] = None) -> Union[List[np.ndarray], np.ndarray]:
     """
-    Maps a distance image to depth image, also works with a list of images or a 1-dim array of dist values.
+    Maps a distance image to depth image, also works with a list of images, a stacked array of images with
+    shape [N, H, W] or a 1-dim array of dist values.
 
     :param dist: The distance data.
     :param points_2d: Can be used to specify the 2D points corresponding to the given distance values:
@@ -24,31 +25,27 @@ def dist2depth(dist: Union[List[np.ndarray], np.ndarray], points_2d: Optional[np
 
     dist = trim_redundant_channels(dist)
 
-    if isinstance(dist, list) or hasattr(dist, "shape") and len(dist.shape) > 2:
-        return [dist2depth(img) for img in dist]
-
     K = CameraUtility.get_intrinsics_as_K_matrix()
-    f, cx, cy = K[0, 0], K[0, 2], K[1, 2]
-
-    if points_2d is None:
-        xs, ys = np.meshgrid(np.arange(dist.shape[1]), np.arange(dist.shape[0]))
-    else:
-        xs, ys = points_2d[:, 0], points_2d[:, 1]
 
-    # coordinate distances to principal point
-    x_opt = np.abs(xs - cx)
-    y_opt = np.abs(ys - cy)
+    if points_2d is not None:
+        f, cx, cy = K[0, 0], K[0, 2], K[1, 2]
+        # coordinate distances to principal point
+        x_opt = np.abs(points_2d[:, 0] - cx)
+        y_opt = np.abs(points_2d[:, 1] - cy)
 
-    # Solve 3 equations in Wolfram Alpha:
-    # Solve[{X == (x-c0)/f0*Z, Y == (y-c1)/f0*Z, X*X + Y*Y + Z*Z = d*d}, {X,Y,Z}]
-    depth = dist * f / np.sqrt(x_opt ** 2 + y_opt ** 2 + f ** 2)
+        # Solve 3 equations in Wolfram Alpha:
+        # Solve[{X == (x-c0)/f0*Z, Y == (y-c1)/f0*Z, X*X + Y*Y + Z*Z = d*d}, {X,Y,Z}]
+        return dist * f / np.sqrt(x_opt ** 2 + y_opt ** 2 + f ** 2)
 
-    return depth
+    if isinstance(dist, list):
+        return [img * _PostProcessingUtility.get_ray_length_factors(img.shape[-2:], K)[1] for img in dist]
+    return dist * _PostProcessingUtility.get_ray_length_factors(dist.shape[-2:], K)[1]
 
 
 def depth2dist(depth: Union[List[np.ndarray], np.ndarray]) -> Union[List[np.ndarray], np.ndarray]:
     """
-    Maps a depth image to distance image, also works with a list of images.
+    Maps a depth image to distance image, also works with a list of images or a stacked array of images with
+    shape [N, H, W].
 
     :param depth: The depth data.
     :return: The distance data
@@ -56,23 +53,11 @@ def depth2dist(depth: Union[List[np.ndarray], np.ndarray]) -> Union[List[np.ndar
 
     depth = trim_redundant_channels(depth)
 
-    if isinstance(depth, list) or hasattr(depth, "shape") and len(depth.shape) > 2:
-        return [depth2dist(img) for img in depth]
-
     K = CameraUtility.get_intrinsics_as_K_matrix()
-    f, cx, cy = K[0, 0], K[0, 2], K[1, 2]
-
-    xs, ys = np.meshgrid(np.arange(depth.shape[1]), np.arange(depth.shape[0]))
 
-    # coordinate distances to principal point
-    x_opt = np.abs(xs - cx)
-    y_opt = np.abs(ys - cy)
-
-    # Solve 3 equations in Wolfram Alpha:
-    # Solve[{X == (x-c0)/f0*Z, Y == (y-c1)/f0*Z, X*X + Y*Y + Z*Z = d*d}, {X,Y,Z}]
-    dist = depth * np.sqrt(x_opt ** 2 + y_opt ** 2 + f ** 2) / f
-
-    return dist
+    if isinstance(depth, list):
+        return [img * _PostProcessingUtility.get_ray_length_factors(img.shape[-2:], K)[0] for img in depth]
+    return depth * _PostProcessingUtility.get_ray_length_factors(depth.shape[-2:], K)[0]
 
 
 def remove_segmap_noise(image: Union[list, np.ndarray]) -> Union[list, np.ndarray]:
@@ -81,42 +66,27 @@ def remove_segmap_noise(image: Union[list, np.ndarray]) -> Union[list, np.ndarra
     segmentation maps, where these values are not real labels, but some deviations from the real labels, that were
     generated as a result of Blender doing some interpolation, smoothing, or other numerical operations.
 
+    Each noisy pixel is replaced by the smallest value of its 3x3 neighbors, the pixels are processed in row major
+    order, so already replaced pixels are used as neighbors. Multiple images of the same size are processed at once.
+
     Assumes that noise pixel values won't occur more than 100 times.
 
-    :param image: ndarray of the .exr segmap
+    :param image: ndarray of the .exr segmap with shape [H, W, C], or a list/an array of them
     :return: The denoised segmap image
     """
 
     if isinstance(image, list) or hasattr(image, "shape") and len(image.shape) > 3:
+        if len(image) > 0 and all(img.shape == image[0].shape for img in image):
+            images = np.stack(image) if isinstance(image, list) else image
+            _PostProcessingUtility.remove_segmap_noise_batch(images)
+            if isinstance(image, list):
+                # Write the result back, as the images are denoised in place
+                for img, denoised_img in zip(image, images):
+                    img[...] = denoised_img
+            return list(image)
         return [remove_segmap_noise(img) for img in image]
 
-    noise_indices = _PostProcessingUtility.determine_noisy_pixels(image)
-
-    for index in noise_indices:
-        neighbors = _PostProcessingUtility.get_pixel_neighbors(image, index[0], index[
-            1])  # Extracting the indices surrounding 3x3 neighbors
-        curr_val = image[index[0]][index[1]][0]  # Current value of the noisy pixel
-
-        neighbor_vals = [image[neighbor[0]][neighbor[1]] for neighbor in
-                         neighbors]  # Getting the values of the neighbors
-        # Getting the unique values only
-        neighbor_vals = np.unique(np.array([np.array(index) for index in neighbor_vals]))
-
-        min_val = 10000000000
-        min_idx = 0
-
-        # Here we iterate through the unique values of the neighbor and find the one closest to the current noisy value
-        for idx, n in enumerate(neighbor_vals):
-            # Is this closer than the current closest value?
-            if n - curr_val <= min_val:
-                # If so, update
-                min_val = n - curr_val
-                min_idx = idx
-
-        # Now that we have found the closest value, assign it to the noisy value
-        new_val = neighbor_vals[min_idx]
-        image[index[0]][index[1]] = np.array([new_val, new_val, new_val])
-
+    _PostProcessingUtility.remove_segmap_noise_batch(image[np.newaxis])
     return image
 
 
@@ -140,20 +110,23 @@ def oil_paint_filter(image: Union[list, np.ndarray], filter_size: int = 5, edges
 
         intensity_img = np.sum(image, axis=2) / 3.0
 
-        neighbors = np.array(
-            _PostProcessingUtility.get_pixel_neighbors_stacked(image, filter_size, return_list=True))
-        neighbors_intensity = _PostProcessingUtility.get_pixel_neighbors_stacked(intensity_img, filter_size)
+        neighbors = _PostProcessingUtility.get_pixel_neighbors_view(image, filter_size)
+        neighbors_intensity = _PostProcessingUtility.get_pixel_neighbors_view(intensity_img, filter_size)
+        # The order in which get_pixel_neighbors_stacked() lists the neighbors, the first neighbor which has the mode
+        # intensity is chosen
+        neighbor_order = _PostProcessingUtility.get_pixel_neighbors_order(filter_size)
 
-        mode_intensity = stats.mode(neighbors_intensity, axis=2)[0].reshape(image.shape[0], image.shape[1])
+        filtered_img = np.empty_like(image)
+        for rows in _PostProcessingUtility.get_row_blocks(image.shape[0], image.shape[1] * filter_size ** 2):
+            block_intensity = neighbors_intensity[rows].reshape(-1, filter_size ** 2)
+            mode_intensity = stats.mode(block_intensity, axis=1)[0].reshape(-1, 1)
 
-        # keys here would match all instances of the mode value
-        mode_keys = np.argwhere(neighbors_intensity == np.expand_dims(mode_intensity, axis=3))
-        # Remove the duplicate keys, since they point to the same value, and to be able to use them for indexing
-        _, unique_indices = np.unique(mode_keys[:, 0:2], axis=0, return_index=True)
-        unique_keys = mode_keys[unique_indices]
-
-        filtered_img = neighbors[unique_keys[:, 2], unique_keys[:, 0], unique_keys[:, 1], :] \
-            .reshape(image.shape[0], image.shape[1], image.shape[2])
+            # Find the first neighbor with the mode intensity
+            mode_neighbor = np.argmin(np.where(block_intensity == mode_intensity, neighbor_order.ravel(),
+                                               filter_size ** 2), axis=1)
+            block_neighbors = neighbors[rows].reshape(-1, image.shape[2], filter_size ** 2)
+            filtered_img[rows] = block_neighbors[np.arange(len(mode_neighbor)), :, mode_neighbor] \
+                .reshape(filtered_img[rows].shape)
 
         if edges_only:
             edges = cv2.Canny(image, 0, np.max(image))  # Assuming "image" is an uint8 array.
@@ -167,8 +140,12 @@ def oil_paint_filter(image: Union[list, np.ndarray], filter_size: int = 5, edges
         if len(image.shape) == 3 and image.shape[2] > 1:
             image = image[:, :, 0]
 
-        filtered_img = stats.mode(_PostProcessingUtility.get_pixel_neighbors_stacked(image, filter_size), axis=2)[0]
-        filtered_img = filtered_img.reshape(filtered_img.shape[0], filtered_img.shape[1])
+        neighbors = _PostProcessingUtility.get_pixel_neighbors_view(image, filter_size)
+        filtered_img = np.empty_like(image)
+        # The mode is computed block by block, such that only a few rows of neighbors are copied at once
+        for rows in _PostProcessingUtility.get_row_blocks(image.shape[0], image.shape[1] * filter_size ** 2):
+            filtered_img[rows] = stats.mode(neighbors[rows].reshape(-1, filter_size ** 2), axis=1)[0] \
+                .reshape(filtered_img[rows].shape)
 
         if edges_only:
             # Handle inf and map input to the range: 0-255
@@ -335,16 +312,17 @@ def segmentation_mapping(image: Union[List[np.ndarray], np.ndarray],
 
             # map object ids in the image to the used objects
             object_ids = np.unique(stereo_image).astype(int)
+            used_object_ids = set(object_ids.tolist())
             object_ids_to_object = {}
             for obj in get_all_blender_mesh_objects():
-                if obj.pass_index in object_ids:
+                if obj.pass_index in used_object_ids:
                     object_ids_to_object[obj.pass_index] = obj
             object_ids_to_object[0] = bpy.context.scene.world
 
             for map_by_attribute in map_by:
 
-                # create result map
-                resulting_map = np.zeros((stereo_image.shape[0], stereo_image.shape[1]), dtype=np.float64)
+                # maps each object id to its value, it is applied to the whole image at once afterwards
+                lookup_table = np.zeros(np.max(object_ids) + 1, dtype=np.float64)
 
                 # save the type of the stored variable in the resulting map
                 found_dtype = None
@@ -400,7 +378,7 @@ def segmentation_mapping(image: Union[List[np.ndarray], np.ndarray],
 
                         # save everything which is not instance also in the .csv
                         if isinstance(value, (int, float, np.integer, np.floating)):
-                            resulting_map[stereo_image == object_id] = value
+                            lookup_table[object_id] = value
                             found_dtype = type(value)
 
                         if isinstance(value, (mathutils.Vector, mathutils.Matrix)):
@@ -413,7 +391,7 @@ def segmentation_mapping(image: Union[List[np.ndarray], np.ndarray],
 
                     # if a value was found the resulting map should be stored
                     if found_dtype is not None:
-                        resulting_map = resulting_map.astype(found_dtype)
+                        resulting_map = lookup_table.astype(found_dtype)[stereo_image]
                         mapped_results_stereo_dict.setdefault(f"{map_by_attribute}_segmaps", []).append(resulting_map)
                     elif "instance" not in map_by:
                         raise ValueError(f"The map_by key \"{map_by_attribute}\" requires that the instance map is "
@@ -443,6 +421,41 @@ def segmentation_mapping(image: Union[List[np.ndarray], np.ndarray],
 
 class _PostProcessingUtility:
 
+    # The per pixel factors of get_ray_length_factors(), keyed by the image size and the K matrix
+    ray_length_factors_cache: Dict[Tuple[Tuple[int, int], Tuple[float, ...]], Tuple[np.ndarray, np.ndarray]] = {}
+    max_ray_length_factors_cache_size = 8
+
+    @staticmethod
+    def get_ray_length_factors(image_size: Tuple[int, int], K: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """ Returns the factors which convert depth into distance values and vice versa.
+
+        The factors only depend on the image size and the intrinsics, so they are computed once and cached.
+
+        :param image_size: The height and width of the image.
+        :param K: The K matrix of the camera.
+        :return: The depth to distance factors and the distance to depth factors, both float32 with shape [H, W].
+        """
+        key = (tuple(int(size) for size in image_size), tuple(float(value) for value in np.asarray(K).flatten()))
+        factors = _PostProcessingUtility.ray_length_factors_cache.get(key)
+        if factors is None:
+            f, cx, cy = K[0, 0], K[0, 2], K[1, 2]
+            # coordinate distances to principal point
+            x_opt = np.abs(np.arange(key[0][1]) - cx)[np.newaxis, :]
+            y_opt = np.abs(np.arange(key[0][0]) - cy)[:, np.newaxis]
+
+            # Solve 3 equations in Wolfram Alpha:
+            # Solve[{X == (x-c0)/f0*Z, Y == (y-c1)/f0*Z, X*X + Y*Y + Z*Z = d*d}, {X,Y,Z}]
+            ray_lengths = np.sqrt(x_opt ** 2 + y_opt ** 2 + f ** 2)
+            factors = ((ray_lengths / f).astype(np.float32), (f / ray_lengths).astype(np.float32))
+            for factor in factors:
+                factor.setflags(write=False)
+
+            if len(_PostProcessingUtility.ray_length_factors_cache) >= \
+                    _PostProcessingUtility.max_ray_length_factors_cache_size:
+                _PostProcessingUtility.ray_length_factors_cache.clear()
+            _PostProcessingUtility.ray_length_factors_cache[key] = factors
+        return factors
+
     @staticmethod
     def get_pixel_neighbors(data: np.ndarray, i: int, j: int) -> np.ndarray:
         """ Returns the valid neighbor pixel indices of the given pixel.
@@ -460,6 +473,60 @@ def get_pixel_neighbors(data: np.ndarray, i: int, j: int) -> np.ndarray:
 
         return np.array(neighbors)
 
+    @staticmethod
+    def get_pixel_neighbors_view(img: np.ndarray, filter_size: int = 3) -> np.ndarray:
+        """ Returns a strided view of the square neighborhood around each pixel, out of image neighbors are zero.
+
+        Apart from padding the image once, no data is copied.
+
+        :param img: Input image with shape [H, W] or [H, W, C].
+        :param filter_size: Filter size, should be an odd number.
+        :return: A read-only view with shape [H, W, filter_size, filter_size] or [H, W, C, filter_size, filter_size],
+                 where [..., c + dy, c + dx] is the neighbor at [y + dy, x + dx] with c = (filter_size - 1) // 2.
+        """
+        after = int(filter_size / 2)
+        before = filter_size - 1 - after
+        padding = [(before, after), (before, after)] + [(0, 0)] * (len(img.shape) - 2)
+        padded_img = np.pad(img, padding, mode="constant", constant_values=0)
+        return np.lib.stride_tricks.sliding_window_view(padded_img, (filter_size, filter_size), axis=(0, 1))
+
+    @staticmethod
+    def get_pixel_neighbors_order(filter_size: int) -> np.ndarray:
+        """ Returns the index of each neighbor in the output of get_pixel_neighbors_stacked().
+
+        :param filter_size: Filter size.
+        :return: An array with shape [filter_size, filter_size], which contains the index of each neighbor in the
+                 view returned by get_pixel_neighbors_view().
+        """
+        center = filter_size - 1 - int(filter_size / 2)
+        order = np.empty((filter_size, filter_size), dtype=np.int64)
+        for index, (p, q) in enumerate(_PostProcessingUtility.get_pixel_neighbors_shifts(filter_size)):
+            order[center - p, center - q] = index
+        return order
+
+    @staticmethod
+    def get_pixel_neighbors_shifts(filter_size: int) -> List[Tuple[int, int]]:
+        """ Returns the shifts of the neighbors in the order used by get_pixel_neighbors_stacked().
+
+        :param filter_size: Filter size.
+        :return: The shifts [p, q], the image itself comes first.
+        """
+        _min = -int(filter_size / 2)
+        _max = _min + filter_size
+        return [(0, 0)] + [(p, q) for p in range(_min, _max) for q in range(_min, _max) if p != 0 or q != 0]
+
+    @staticmethod
+    def get_row_blocks(num_rows: int, elements_per_row: int, max_elements: int = 1 << 22) -> List[slice]:
+        """ Splits the rows of an image into blocks, such that each block contains at most max_elements elements.
+
+        :param num_rows: The number of rows of the image.
+        :param elements_per_row: The number of elements per row.
+        :param max_elements: The maximum number of elements per block.
+        :return: A list of row slices.
+        """
+        block_size = max(1, max_elements // max(1, elements_per_row))
+        return [slice(start, min(start + block_size, num_rows)) for start in range(0, num_rows, block_size)]
+
     @staticmethod
     def get_pixel_neighbors_stacked(img: np.ndarray, filter_size: int = 3,
                                     return_list: bool = False) -> Union[list, np.ndarray]:
@@ -470,27 +537,16 @@ def get_pixel_neighbors_stacked(img: np.ndarray, filter_size: int = 3,
         :param img: Input image. Type: blender object of type image.
         :param filter_size: Filter size. Type: int. Default: 5..
         :param return_list: Instead of stacking in the output array, just return a list of the "neighbor" \
-                            images along with the input image.
+                            images along with the input image. The "neighbor" images are views, no data is copied.
         :return: Either a tensor with the "neighbor" images stacked in a separate additional dimension, or a list of \
                  images of the same shape as the input image, containing the shifted images (simulating the neighbors) \
                  and the input image.
         """
-        _min = -int(filter_size / 2)
-        _max = _min + filter_size
-
-        rows, cols = img.shape[0], img.shape[1]
+        neighbors = _PostProcessingUtility.get_pixel_neighbors_view(img, filter_size)
+        center = filter_size - 1 - int(filter_size / 2)
 
-        channels = [img]
-        for p in range(_min, _max):
-            for q in range(_min, _max):
-                if p == 0 and q == 0:
-                    continue
-                shifted = np.zeros_like(img)
-                shifted[max(p, 0):min(rows, rows + p), max(q, 0):min(cols, cols + q)] = img[
-                                                                                        max(-p, 0):min(rows - p, rows),
-                                                                                        max(-q, 0):min(cols - q, cols)]
-
-                channels.append(shifted)
+        channels = [img] + [neighbors[..., center - p, center - q]
+                            for p, q in _PostProcessingUtility.get_pixel_neighbors_shifts(filter_size)[1:]]
 
         if return_list:
             return channels
@@ -510,18 +566,82 @@ def determine_noisy_pixels(image: np.ndarray) -> np.ndarray:
                               these pixels is to use a histogram and find the pixels with frequencies lower than \
                               a threshold, e.g. 100.
         """
+        return np.argwhere(_PostProcessingUtility.determine_noisy_pixels_batch(image[np.newaxis])[0])
+
+    @staticmethod
+    def determine_noisy_pixels_batch(images: np.ndarray) -> np.ndarray:
+        """ Determines the noisy pixels of multiple images, the histogram is computed separately per image.
+
+        :param images: The image data with shape [N, H, W, C].
+        :return: A boolean mask with shape [N, H, W], which is true for all noisy pixels.
+        """
         # The map was scaled to be ranging along the entire 16-bit color depth, and this is the scaling down operation
         # that should remove some noise or deviations
-        image = (image * 37) / (65536)  # assuming 16 bit color depth
-        image = image.astype(np.int32)
-        b, counts = np.unique(image.flatten(), return_counts=True)
+        scaled_images = ((images * 37) / 65536).astype(np.int32)  # assuming 16 bit color depth
+        # Compute one histogram per image by making the values of different images distinct
+        num_images = scaled_images.shape[0]
+        keys = scaled_images.reshape(num_images, -1).astype(np.int64) - scaled_images.min()
+        keys += np.arange(num_images, dtype=np.int64)[:, np.newaxis] * (int(keys.max()) + 1)
+        if keys.max() < 4 * keys.size:
+            # Counting is linear, but only possible if the range of values is small
+            inverse, counts = keys, np.bincount(keys.ravel())
+        else:
+            _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
 
         # Removing further noise where there are some stray pixel values with very small counts, by assigning them to
         # their closest (numerically, since this deviation is a
         # result of some numerical operation) neighbor.
-        hist = sorted((np.asarray((b, counts)).T), key=lambda x: x[1])
         # Assuming the stray pixels wouldn't have a count of more than 100
-        noise_vals = [h[0] for h in hist if h[1] <= 100]
-        noise_indices = np.argwhere(_PostProcessingUtility.is_in(image, noise_vals))
+        noisy_values = (counts[inverse] <= 100).reshape(scaled_images.shape)
+        return np.any(noisy_values, axis=-1)
 
-        return noise_indices
+    @staticmethod
+    def remove_segmap_noise_batch(images: np.ndarray):
+        """ Replaces the noisy pixels of the given images in place, see remove_segmap_noise().
+
+        The pixels in one row only depend on the already processed rows and on their left neighbors. So all pixels of
+        one row are processed at once in all images, the chains of adjacent noisy pixels are resolved via a
+        segmented prefix minimum.
+
+        :param images: The image data with shape [N, H, W, C].
+        """
+        noisy = _PostProcessingUtility.determine_noisy_pixels_batch(images)
+        num_images, height, width = noisy.shape
+        if not np.any(noisy):
+            return
+
+        # The value of each pixel is the minimum over its channels, out of image neighbors are never chosen
+        values = np.full((num_images, height + 2, width + 2), np.inf)
+        values[:, 1:-1, 1:-1] = images.min(axis=-1)
+        # The neighbors in the row below and the right neighbor are not denoised yet, when a pixel is processed.
+        # Their minimum, together with the left neighbor, if it is not noisy itself, is computed for all pixels at once.
+        left_is_noisy = np.zeros_like(noisy)
+        left_is_noisy[:, :, 1:] = noisy[:, :, :-1]
+        original_candidates = np.minimum.reduce([values[:, 2:, :-2], values[:, 2:, 1:-1], values[:, 2:, 2:],
+                                                 values[:, 1:-1, 2:]])
+        original_candidates = np.where(left_is_noisy, original_candidates,
+                                       np.minimum(original_candidates, values[:, 1:-1, :-2]))
+        # The index of the first pixel of the run of adjacent noisy pixels, which each pixel belongs to
+        columns = np.arange(width)
+        run_starts = np.maximum.accumulate(np.where(noisy & ~left_is_noisy, columns, 0), axis=2)
+        run_lengths = np.where(noisy, columns - run_starts + 1, 0)
+
+        for row in np.flatnonzero(np.any(noisy, axis=(0, 2))):
+            # The neighbors in the row above are already denoised
+            above = values[:, row]
+            candidates = np.minimum(np.minimum(above[:, :-2], above[:, 1:-1]),
+                                    np.minimum(above[:, 2:], original_candidates[:, row]))
+
+            # The new value of a noisy left neighbor is used, so the minimum is accumulated over each run of adjacent
+            # noisy pixels via a prefix minimum
+            step = 1
+            max_run_length = run_lengths[:, row].max()
+            while step < max_run_length:
+                in_run = columns[step:] - step >= run_starts[:, row, step:]
+                candidates[:, step:] = np.where(in_run, np.minimum(candidates[:, step:], candidates[:, :-step]),
+                                                candidates[:, step:])
+                step *= 2
+
+            values[:, row + 1, 1:-1] = np.where(noisy[:, row], candidates, values[:, row + 1, 1:-1])
+
+        images[noisy] = values[:, 1:-1, 1:-1][noisy][:, np.newaxis]
@@ -1,6 +1,8 @@
 """Use stereo global matching to calculate an distance image. """
 
-from typing import Tuple, List, Optional
+from functools import partial
+from multiprocessing import Pool
+from typing import Tuple, List, Optional, Any
 
 import bpy
 import cv2
@@ -8,14 +10,19 @@
 
 from blenderproc.python.camera import CameraUtility
 
+# The matchers of the current process, which are created by _StereoGlobalMatching.matchers_init()
+matchers: Optional[Tuple[Any, Optional[Any], Optional[Any]]] = None
+
 
 def stereo_global_matching(color_images: List[np.ndarray], depth_max: Optional[float] = None, window_size: int = 7,
                            num_disparities: int = 32, min_disparity: int = 0, disparity_filter: bool = True,
-                           depth_completion: bool = True) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+                           depth_completion: bool = True, num_workers: int = 1) \
+        -> Tuple[List[np.ndarray], List[np.ndarray]]:
     """ Does the stereo global matching in the following steps:
     1. Collect camera object and its state,
-    2. For each frame, load left and right images and call the `sgm()` methode.
-    3. Write the results to a numpy file.
+    2. Create the matchers once, in every worker process if num_workers > 1,
+    3. For each frame, load left and right images and call the `sgm()` methode.
+    4. Write the results to a numpy file.
 
     :param color_images: A list of stereo images, where each entry has the shape [2, height, width, 3].
     :param depth_max: The maximum depth value for clipping the resulting depth values. If None,
@@ -25,6 +32,8 @@ def stereo_global_matching(color_images: List[np.ndarray], depth_max: Optional[f
     :param min_disparity: Semi-global matching minimum disparity.
     :param disparity_filter: Applies post-processing of the generated disparity map using WLS filter.
     :param depth_completion: Applies basic depth completion using image processing techniques.
+    :param num_workers: The number of worker processes, over which the frames are distributed. If 1, all frames
+                        are processed in the current process.
     :return: Returns the computed depth and disparity images for all given frames.
     """
     # Collect camera and camera object
@@ -44,16 +53,20 @@ def stereo_global_matching(color_images: List[np.ndarray], depth_max: Optional[f
 
     focal_length = CameraUtility.get_intrinsics_as_K_matrix()[0, 0]
 
-    depth_frames = []
-    disparity_frames = []
-    for color_image in color_images:
-        depth, disparity = _StereoGlobalMatching.stereo_global_matching(color_image[0], color_image[1], baseline,
-                                                                        depth_max, focal_length, window_size,
-                                                                        num_disparities, min_disparity,
-                                                                        disparity_filter, depth_completion)
-
-        depth_frames.append(depth)
-        disparity_frames.append(disparity)
+    process_frame = partial(_StereoGlobalMatching.stereo_global_matching_iteration, baseline, depth_max,
+                            focal_length, disparity_filter, depth_completion)
+    if num_workers > 1 and len(color_images) > 1:
+        # Each worker creates the matchers once and keeps them for all of its frames
+        with Pool(min(num_workers, len(color_images)), initializer=_StereoGlobalMatching.matchers_init,
+                  initargs=[window_size, num_disparities, min_disparity, disparity_filter]) as pool:
+            results = pool.map(process_frame, color_images,
+                               chunksize=max(1, len(color_images) // (4 * num_workers)))
+    else:
+        _StereoGlobalMatching.matchers_init(window_size, num_disparities, min_disparity, disparity_filter)
+        results = [process_frame(color_image) for color_image in color_images]
+
+    depth_frames = [depth for depth, _ in results]
+    disparity_frames = [disparity for _, disparity in results]
 
     return depth_frames, disparity_frames
 
@@ -61,25 +74,16 @@ def stereo_global_matching(color_images: List[np.ndarray], depth_max: Optional[f
 class _StereoGlobalMatching:
 
     @staticmethod
-    def stereo_global_matching(left_color_image: np.ndarray, right_color_image: np.ndarray, baseline: float,
-                               depth_max: float, focal_length: float, window_size: int = 7, num_disparities: int = 32,
-                               min_disparity: int = 0, disparity_filter: bool = True,
-                               depth_completion: bool = True) -> Tuple[np.ndarray, np.ndarray]:
-        """ Semi global matching funciton, for more details on what this function does check the original paper
-        https://elib.dlr.de/73119/1/180Hirschmueller.pdf
+    def create_matchers(window_size: int = 7, num_disparities: int = 32, min_disparity: int = 0,
+                        disparity_filter: bool = True) -> Tuple[Any, Optional[Any], Optional[Any]]:
+        """ Creates the semi global matchers and the WLS filter, which can be reused for all frames.
 
-        :param left_color_image: The left color image.
-        :param right_color_image: The right color image.
-        :param baseline: The baseline that was used for rendering the two images.
-        :param depth_max: The maximum depth value for clipping the resulting depth values.
-        :param focal_length: The focal length that was used for rendering the two images.
         :param window_size: Semi-global matching kernel size. Should be an odd number.
         :param num_disparities: Semi-global matching number of disparities. Should be > 0 and divisible by 16.
         :param min_disparity: Semi-global matching minimum disparity.
-        :param disparity_filter: Applies post-processing of the generated disparity map using WLS filter.
-        :param depth_completion: Applies basic depth completion using image processing techniques.
-        :return: depth, disparity
-         """
+        :param disparity_filter: If True, also the right matcher and the WLS filter are created.
+        :return: The left matcher, the right matcher and the WLS filter, the last two are None without filter.
+        """
         if window_size % 2 == 0:
             raise ValueError("Window size must be an odd number")
 
@@ -101,6 +105,7 @@ def stereo_global_matching(left_color_image: np.ndarray, right_color_image: np.n
             mode=cv2.StereoSGBM_MODE_HH
         )
 
+        right_matcher, wls_filter = None, None
         if disparity_filter:
             right_matcher = cv2.ximgproc.createRightMatcher(left_matcher)
 
@@ -111,6 +116,70 @@ def stereo_global_matching(left_color_image: np.ndarray, right_color_image: np.n
             wls_filter.setLambda(lmbda)
             wls_filter.setSigmaColor(sigma)
 
+        return left_matcher, right_matcher, wls_filter
+
+    @staticmethod
+    def matchers_init(window_size: int, num_disparities: int, min_disparity: int, disparity_filter: bool):
+        """ Initializes a worker process for stereo_global_matching_iteration() by creating its matchers.
+
+        :param window_size: Semi-global matching kernel size. Should be an odd number.
+        :param num_disparities: Semi-global matching number of disparities. Should be > 0 and divisible by 16.
+        :param min_disparity: Semi-global matching minimum disparity.
+        :param disparity_filter: If True, also the right matcher and the WLS filter are created.
+        """
+        global matchers  # pylint: disable=global-statement
+        matchers = _StereoGlobalMatching.create_matchers(window_size, num_disparities, min_disparity,
+                                                         disparity_filter)
+
+    @staticmethod
+    def stereo_global_matching_iteration(baseline: float, depth_max: float, focal_length: float,
+                                         disparity_filter: bool, depth_completion: bool,
+                                         color_image: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """ Does the semi global matching of one stereo frame with the matchers of the current process.
+
+        :param baseline: The baseline that was used for rendering the two images.
+        :param depth_max: The maximum depth value for clipping the resulting depth values.
+        :param focal_length: The focal length that was used for rendering the two images.
+        :param disparity_filter: Applies post-processing of the generated disparity map using WLS filter.
+        :param depth_completion: Applies basic depth completion using image processing techniques.
+        :param color_image: The stereo image with the shape [2, height, width, 3].
+        :return: depth, disparity
+        """
+        global matchers  # pylint: disable=global-variable-not-assigned
+        return _StereoGlobalMatching.stereo_global_matching(color_image[0], color_image[1], baseline, depth_max,
+                                                            focal_length, disparity_filter=disparity_filter,
+                                                            depth_completion=depth_completion,
+                                                            prebuilt_matchers=matchers)
+
+    @staticmethod
+    def stereo_global_matching(left_color_image: np.ndarray, right_color_image: np.ndarray, baseline: float,
+                               depth_max: float, focal_length: float, window_size: int = 7, num_disparities: int = 32,
+                               min_disparity: int = 0, disparity_filter: bool = True,
+                               depth_completion: bool = True,
+                               prebuilt_matchers: Optional[Tuple[Any, Optional[Any], Optional[Any]]] = None) \
+            -> Tuple[np.ndarray, np.ndarray]:
+        """ Semi global matching funciton, for more details on what this function does check the original paper
+        https://elib.dlr.de/73119/1/180Hirschmueller.pdf
+
+        :param left_color_image: The left color image.
+        :param right_color_image: The right color image.
+        :param baseline: The baseline that was used for rendering the two images.
+        :param depth_max: The maximum depth value for clipping the resulting depth values.
+        :param focal_length: The focal length that was used for rendering the two images.
+        :param window_size: Semi-global matching kernel size. Should be an odd number.
+        :param num_disparities: Semi-global matching number of disparities. Should be > 0 and divisible by 16.
+        :param min_disparity: Semi-global matching minimum disparity.
+        :param disparity_filter: Applies post-processing of the generated disparity map using WLS filter.
+        :param depth_completion: Applies basic depth completion using image processing techniques.
+        :param prebuilt_matchers: The matchers created by create_matchers(), if None, they are created for this call.
+        :return: depth, disparity
+         """
+        if prebuilt_matchers is None:
+            prebuilt_matchers = _StereoGlobalMatching.create_matchers(window_size, num_disparities, min_disparity,
+                                                                      disparity_filter)
+        left_matcher, right_matcher, wls_filter = prebuilt_matchers
+
+        if disparity_filter:
             dispr = right_matcher.compute(right_color_image, left_color_image)
 
         displ = left_matcher.compute(left_color_image, right_color_image)
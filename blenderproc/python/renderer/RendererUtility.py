@@ -232,18 +232,12 @@ def enable_distance_output(activate_antialiasing: bool, output_dir: Optional[str
     mapper_node.inputs['To Max'].default_value = antialiasing_distance_max
     final_output = mapper_node.outputs['Value']
 
-    # Build output node
-    output_file = tree.nodes.new("CompositorNodeOutputFile")
-    output_file.base_path = output_dir
-    output_file.format.file_format = "OPEN_EXR"
-    output_file.file_slots.values()[0].path = file_prefix
-
     # Feed the Z-Buffer or Mist output of the render layer to the input of the file IO layer
-    links.new(final_output, output_file.inputs['Image'])
+    output_entry = _link_to_exr_file_output(final_output, output_dir, file_prefix, output_key)
 
     Utility.add_output_entry({
         "key": output_key,
-        "path": os.path.join(output_dir, file_prefix) + "%04d" + ".exr",
+        **output_entry,
         "version": "2.0.0",
         "trim_redundant_channels": True,
         "convert_to_depth": convert_to_depth
@@ -286,25 +280,18 @@ def enable_depth_output(activate_antialiasing: bool, output_dir: Optional[str] =
     bpy.context.scene.use_nodes = True
 
     tree = bpy.context.scene.node_tree
-    links = tree.links
     # Use existing render layer
     render_layer_node = Utility.get_the_one_node_with_type(tree.nodes, 'CompositorNodeRLayers')
 
     # Enable z-buffer pass
     bpy.context.view_layer.use_pass_z = True
 
-    # Build output node
-    output_file = tree.nodes.new("CompositorNodeOutputFile")
-    output_file.base_path = output_dir
-    output_file.format.file_format = "OPEN_EXR"
-    output_file.file_slots.values()[0].path = file_prefix
-
     # Feed the Z-Buffer output of the render layer to the input of the file IO layer
-    links.new(render_layer_node.outputs["Depth"], output_file.inputs['Image'])
+    output_entry = _link_to_exr_file_output(render_layer_node.outputs["Depth"], output_dir, file_prefix, output_key)
 
     Utility.add_output_entry({
         "key": output_key,
-        "path": os.path.join(output_dir, file_prefix) + "%04d" + ".exr",
+        **output_entry,
         "version": "2.0.0",
         "trim_redundant_channels": True,
         "convert_to_distance": convert_to_distance
@@ -410,16 +397,11 @@ def enable_normals_output(output_dir: Optional[str] = None, file_prefix: str = "
             output_channel = "G"
         links.new(add.outputs["Value"], combine_rgba.inputs[output_channel])
 
-    output_file = tree.nodes.new("CompositorNodeOutputFile")
-    output_file.base_path = output_dir
-    output_file.format.file_format = "OPEN_EXR"
-    output_file.file_slots.values()[0].path = file_prefix
-    output_file.location.x = space_between_nodes_x * 15
-    links.new(combine_rgba.outputs["Image"], output_file.inputs["Image"])
+    output_entry = _link_to_exr_file_output(combine_rgba.outputs["Image"], output_dir, file_prefix, output_key)
 
     Utility.add_output_entry({
         "key": output_key,
-        "path": os.path.join(output_dir, file_prefix) + "%04d" + ".exr",
+        **output_entry,
         "version": "2.0.0"
     })
 
@@ -461,20 +443,22 @@ def enable_segmentation_output(map_by: Union[str, List[str]] = "category_id",
     bpy.context.scene.view_layers["ViewLayer"].use_pass_object_index = True
 
     tree = bpy.context.scene.node_tree
-    links = tree.links
-
     render_layer_node = tree.nodes.get('Render Layers')
 
     if output_dir is None:
         output_dir = Utility.get_temporary_directory()
 
-    output_node = tree.nodes.new('CompositorNodeOutputFile')
-    output_node.base_path = output_dir
-    output_node.format.file_format = "OPEN_EXR"
-    output_node.file_slots.values()[0].path = file_prefix
+    if GlobalStorage.is_in_storage("multilayer_exr_output") \
+            and GlobalStorage.get("multilayer_exr_output")["color_depth"] == "16" \
+            and len(get_all_blender_mesh_objects()) > 2048:
+        raise RuntimeError("The multilayer exr output uses half precision, which can only represent the object "
+                           "indices up to 2048 exactly. Use color_depth=\"32\" in enable_multilayer_exr_output.")
+
+    output_entry = _link_to_exr_file_output(render_layer_node.outputs["IndexOB"], output_dir, file_prefix,
+                                            output_key)
     Utility.add_output_entry({
         "key": output_key,
-        "path": os.path.join(output_dir, file_prefix) + "%04d" + ".exr",
+        **output_entry,
         "version": "3.0.0",
         "trim_redundant_channels": True,
         "is_semantic_segmentation": True,
@@ -482,12 +466,82 @@ def enable_segmentation_output(map_by: Union[str, List[str]] = "category_id",
         "semantic_segmentation_default_values": default_values
     })
 
-    links.new(render_layer_node.outputs["IndexOB"], output_node.inputs["Image"])
-
     # set the threshold low to avoid noise in alpha materials
     bpy.context.scene.view_layers["ViewLayer"].pass_alpha_threshold = pass_alpha_threshold
 
 
+def enable_multilayer_exr_output(output_dir: Optional[str] = None, file_prefix: str = "passes_",
+                                 color_depth: str = "32", codec: str = "ZIP"):
+    """ Writes all auxiliary render passes into one multilayer OpenEXR file per frame.
+
+    After calling this function, the passes enabled via enable_distance_output, enable_depth_output,
+    enable_normals_output and enable_segmentation_output are not written into their own files anymore, but into
+    one layer of a shared multilayer .exr file, which is named after the output key of the pass. While loading, only
+    the layers of the requested keys are decoded. Passes which have been enabled before this call are not affected.
+    The diffuse color output is still written as .png file, as it is stored in the display color space.
+
+    :param output_dir: The directory to write the files to, if this is None the temporary directory is used.
+    :param file_prefix: The prefix to use for writing the files.
+    :param color_depth: The precision of the stored values, either "16" (half) or "32" (float). Half precision
+                        represents integers only up to 2048 exactly, which limits the number of objects in the
+                        segmentation output.
+    :param codec: The compression codec of the .exr files, e.g. "NONE", "ZIP", "PIZ", "DWAA" or "PXR24".
+                  Lossy codecs like "DWAA" should not be used for segmentation outputs.
+    """
+    if GlobalStorage.is_in_storage("multilayer_exr_output"):
+        raise RuntimeError("The multilayer exr output has already been enabled.")
+    if color_depth not in ["16", "32"]:
+        raise ValueError(f"The color depth of the multilayer exr output has to be \"16\" or \"32\", not "
+                         f"\"{color_depth}\".")
+    if output_dir is None:
+        output_dir = Utility.get_temporary_directory()
+
+    bpy.context.scene.render.use_compositing = True
+    bpy.context.scene.use_nodes = True
+    tree = bpy.context.scene.node_tree
+
+    output_node = tree.nodes.new("CompositorNodeOutputFile")
+    output_node.base_path = os.path.join(output_dir, file_prefix)
+    output_node.format.file_format = "OPEN_EXR_MULTILAYER"
+    output_node.format.color_depth = color_depth
+    output_node.format.exr_codec = codec
+    # In stereo mode, write each view into its own file, as it is done for all other outputs
+    output_node.format.views_format = "INDIVIDUAL"
+    # Remove the default layer, each pass adds its own layer
+    output_node.layer_slots.remove(output_node.inputs[0])
+
+    GlobalStorage.add("multilayer_exr_output", {
+        "node_name": output_node.name,
+        "path": os.path.join(output_dir, file_prefix) + "%04d" + ".exr",
+        "color_depth": color_depth
+    })
+
+
+def _link_to_exr_file_output(socket: bpy.types.NodeSocket, output_dir: str, file_prefix: str,
+                             output_key: str) -> Dict[str, str]:
+    """ Links the given socket to a new .exr file output node or to a new layer of the multilayer exr output.
+
+    :param socket: The output socket of the compositor node, whose values should be written.
+    :param output_dir: The directory to write the files to, if no multilayer exr output is used.
+    :param file_prefix: The prefix to use for writing the files, if no multilayer exr output is used.
+    :param output_key: The key of the output, it is used as name of the layer.
+    :return: The path and, in the multilayer case, the layer which have to be registered for this output.
+    """
+    tree = bpy.context.scene.node_tree
+    if GlobalStorage.is_in_storage("multilayer_exr_output"):
+        multilayer_exr_output = GlobalStorage.get("multilayer_exr_output")
+        output_node = tree.nodes[multilayer_exr_output["node_name"]]
+        tree.links.new(socket, output_node.layer_slots.new(output_key))
+        return {"path": multilayer_exr_output["path"], "layer": output_key}
+
+    output_node = tree.nodes.new("CompositorNodeOutputFile")
+    output_node.base_path = output_dir
+    output_node.format.file_format = "OPEN_EXR"
+    output_node.file_slots.values()[0].path = file_prefix
+    tree.links.new(socket, output_node.inputs["Image"])
+    return {"path": os.path.join(output_dir, file_prefix) + "%04d" + ".exr"}
+
+
 def enable_diffuse_color_output(output_dir: Optional[str] = None, file_prefix: str = "diffuse_",
                                 output_key: str = "diffuse"):
     """ Enables writing diffuse color (albedo) images.
@@ -634,7 +688,7 @@ def _render_progress_bar(pipe_out: int, pipe_in: int, stdout: IO, total_frames:
 def render(output_dir: Optional[str] = None, file_prefix: str = "rgb_", output_key: Optional[str] = "colors",
            load_keys: Optional[Set[str]] = None, return_data: bool = True,
            keys_with_alpha_channel: Optional[Set[str]] = None,
-           verbose: bool = False) -> Dict[str, Union[np.ndarray, List[np.ndarray]]]:
+           verbose: bool = False, num_loading_threads: int = 0) -> Dict[str, Union[np.ndarray, List[np.ndarray]]]:
     """ Render all frames.
 
     This will go through all frames from scene.frame_start to scene.frame_end and render each of them.
@@ -647,6 +701,8 @@ def render(output_dir: Optional[str] = None, file_prefix: str = "rgb_", output_k
     :param return_data: Whether to load and return generated data.
     :param keys_with_alpha_channel: A set containing all keys whose alpha channels should be loaded.
     :param verbose: If True, more details about the rendering process are printed.
+    :param num_loading_threads: The number of threads used to load the rendered frames. If 0 is given, one thread
+                                per cpu core is used. If 1 is given, the frames are loaded sequentially.
     :return: dict of lists of raw renderer output. Keys can be 'distance', 'colors', 'normals'
     """
     if output_dir is None:
@@ -706,7 +762,8 @@ def render(output_dir: Optional[str] = None, file_prefix: str = "rgb_", output_k
         raise RuntimeError("No camera poses have been registered, therefore nothing can be rendered. A camera "
                            "pose can be registered via bproc.camera.add_camera_pose().")
 
-    return _WriterUtility.load_registered_outputs(load_keys, keys_with_alpha_channel) if return_data else {}
+    return _WriterUtility.load_registered_outputs(load_keys, keys_with_alpha_channel, num_loading_threads) \
+        if return_data else {}
 
 
 def set_output_format(file_format: Optional[str] = None, color_depth: Optional[int] = None,
@@ -128,7 +128,8 @@ def render_segmap(output_dir: Optional[str] = None, temp_dir: Optional[str] = No
                 channels = []
                 for channel_id in range(result_channels):
                     num_default_values = 0
-                    resulting_map = np.zeros((segmap.shape[0], segmap.shape[1]), dtype=optimal_dtype)
+                    # maps each object id to its value, it is applied to the whole segmap at once afterwards
+                    lookup_table = np.zeros(max_id + 1, dtype=optimal_dtype)
                     was_used = False
                     current_attribute = attributes[channel_id]
                     org_attribute = current_attribute
@@ -188,12 +189,13 @@ def render_segmap(output_dir: Optional[str] = None, temp_dir: Optional[str] = No
                             # save everything which is not instance also in the .csv
                             if isinstance(value, (int, float, np.integer, np.floating)):
                                 was_used = True
-                                resulting_map[segmap == object_id] = value
+                                lookup_table[object_id] = value
 
                             if object_id in save_in_csv_attributes:
                                 save_in_csv_attributes[object_id][attribute] = value
                             else:
                                 save_in_csv_attributes[object_id] = {attribute: value}
+                        resulting_map = lookup_table[segmap]
 
                     if was_used and num_default_values < len(object_ids):
                         channels.append(org_attribute)
@@ -1,7 +1,7 @@
 """Allows the sampling 3D Front scenes"""
 
 import random
-from typing import List
+from typing import List, Union
 
 import numpy as np
 
@@ -16,6 +16,8 @@ class Front3DPointInRoomSampler:
     def __init__(self, front3d_objects: List[MeshObject], amount_of_objects_needed_per_room: int = 2):
         """ Collects the floors of all rooms with at least N objects.
 
+        The world space triangles of all floors are computed once, such that points can be sampled directly on them.
+
         :param front3d_objects: The list of front3d objects that should be considered.
         :param amount_of_objects_needed_per_room: The number of objects a rooms needs to have, such that it is
                                                   considered for sampling.
@@ -24,50 +26,117 @@ def __init__(self, front3d_objects: List[MeshObject], amount_of_objects_needed_p
 
         floor_objs = [obj for obj in front3d_objects if obj.get_name().lower().startswith("floor")]
 
-        # count objects per floor -> room
-        floor_obj_counters = {obj.get_name(): 0 for obj in floor_objs}
-        counter = 0
-        for obj in front3d_objects:
-            name = obj.get_name().lower()
-            if "wall" in name or "ceiling" in name:
+        # collect the locations of all objects, which are not part of the room itself
+        object_locations = np.array([obj.get_location() for obj in front3d_objects
+                                     if "wall" not in obj.get_name().lower()
+                                     and "ceiling" not in obj.get_name().lower()]).reshape(-1, 3)
+
+        self.used_floors: List[MeshObject] = []
+        # the world space triangles [T, 3, 3] and their cumulative area of each used floor
+        self._floor_triangles: List[np.ndarray] = []
+        self._floor_cumulative_areas: List[np.ndarray] = []
+        for floor_obj in floor_objs:
+            triangles = floor_obj.get_world_triangles()
+            areas = 0.5 * np.linalg.norm(np.cross(triangles[:, 1] - triangles[:, 0],
+                                                  triangles[:, 2] - triangles[:, 0]), axis=-1)
+            if len(triangles) == 0 or areas.sum() <= 0:
                 continue
-            counter += 1
-
-            for floor_obj in floor_objs:
-                is_above = floor_obj.position_is_above_object(obj.get_location())
-                if is_above:
-                    floor_obj_counters[floor_obj.get_name()] += 1
-        self.used_floors = [obj for obj in floor_objs if
-                            floor_obj_counters[obj.get_name()] > amount_of_objects_needed_per_room]
+            # count objects per floor -> room, an object belongs to the room if it is straight above its floor
+            is_above = Front3DPointInRoomSampler._points_above_triangles(object_locations, triangles)
+            if np.count_nonzero(is_above) > amount_of_objects_needed_per_room:
+                self.used_floors.append(floor_obj)
+                self._floor_triangles.append(triangles)
+                self._floor_cumulative_areas.append(np.cumsum(areas))
+
+    @staticmethod
+    def _points_above_triangles(points: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+        """ Checks for each point if it lies straight above any of the given triangles.
+
+        :param points: The points with shape [N, 3].
+        :param triangles: The triangles with shape [T, 3, 3].
+        :return: A boolean array with shape [N].
+        """
+        if len(points) == 0:
+            return np.zeros(0, dtype=bool)
+        # barycentric coordinates of all points w.r.t. all triangles in the xy-plane, shape [N, T]
+        a, b, c = triangles[:, 0, :2], triangles[:, 1, :2], triangles[:, 2, :2]
+        v0, v1 = b - a, c - a
+        v2 = points[:, np.newaxis, :2] - a
+        denominator = v0[:, 0] * v1[:, 1] - v1[:, 0] * v0[:, 1]
+        # degenerated triangles (e.g. vertical faces) are never hit
+        valid = np.abs(denominator) > 1e-12
+        denominator = np.where(valid, denominator, 1.0)
+        u = (v2[..., 0] * v1[:, 1] - v1[:, 0] * v2[..., 1]) / denominator
+        v = (v0[:, 0] * v2[..., 1] - v2[..., 0] * v0[:, 1]) / denominator
+        inside = valid & (u >= 0) & (v >= 0) & (u + v <= 1)
+        # the point also has to be above the triangle
+        is_above = points[:, np.newaxis, 2] >= triangles[:, :, 2].min(axis=-1) - 1e-4
+        return np.any(inside & is_above, axis=-1)
 
     def sample(self, height: float, max_tries: int = 1000) -> np.ndarray:
         """ Samples a point inside one of the loaded Front3d rooms.
 
-        The points are uniformly sampled along x/y over all rooms.
+        A room is chosen uniformly, inside the room the point is sampled uniformly over the area of its floor.
         The z-coordinate is set based on the given height value.
 
         :param height: The height above the floor to use for the z-component of the point.
-        :param max_tries: The maximum number of times sampling above the floor should be tried.
+        :param max_tries: Not used anymore, as the points are directly sampled on the floor without any rejection.
         :return: The sampled point.
         """
-        for _ in range(max_tries):
-            # Sample room via floor objects
-            floor_obj = random.choice(self.used_floors)
-
-            # Get min/max along x/y-axis from bounding box of room
-            bounding_box = floor_obj.get_bound_box()
-            min_corner = np.min(bounding_box, axis=0)
-            max_corner = np.max(bounding_box, axis=0)
-
-            # Sample uniformly inside bounding box
-            point = np.array([
-                random.uniform(min_corner[0], max_corner[0]),
-                random.uniform(min_corner[1], max_corner[1]),
-                floor_obj.get_location()[2] + height
-            ])
-
-            # Check if sampled pose is above the floor to make sure its really inside the room
-            if floor_obj.position_is_above_object(point):
-                return point
-
-        raise RuntimeError("Cannot sample any point inside the loaded front3d rooms.")
+        # pylint: disable=unused-argument
+        if not self.used_floors:
+            raise RuntimeError("Cannot sample any point inside the loaded front3d rooms.")
+
+        # Sample room via floor objects
+        floor_index = random.randrange(len(self.used_floors))
+        # Sample a triangle proportional to its area
+        cumulative_areas = self._floor_cumulative_areas[floor_index]
+        triangle_index = min(int(np.searchsorted(cumulative_areas, random.uniform(0, cumulative_areas[-1]),
+                                                 side="right")), len(cumulative_areas) - 1)
+        point = self._sample_in_triangles(self._floor_triangles[floor_index][np.newaxis, triangle_index],
+                                          np.array([random.random()]), np.array([random.random()]))[0]
+        point[2] = self.used_floors[floor_index].get_location()[2] + height
+        return point
+
+    def sample_batch(self, n: int, heights: Union[float, np.ndarray]) -> np.ndarray:
+        """ Samples multiple points inside the loaded Front3d rooms at once.
+
+        The points follow the same distribution as the ones returned by sample(), this is useful to evaluate many
+        camera poses at once, see bproc.camera.score_camera_poses_batch.
+
+        :param n: The number of points to sample.
+        :param heights: The height above the floor, either one value for all points or an array of shape [n].
+        :return: The sampled points with shape [n, 3].
+        """
+        if not self.used_floors:
+            raise RuntimeError("Cannot sample any point inside the loaded front3d rooms.")
+
+        points = np.empty((n, 3))
+        heights = np.broadcast_to(np.asarray(heights, dtype=np.float64), (n,))
+        floor_indices = np.random.randint(len(self.used_floors), size=n)
+        for floor_index in np.unique(floor_indices):
+            mask = floor_indices == floor_index
+            num_points = np.count_nonzero(mask)
+            # Sample triangles proportional to their area
+            cumulative_areas = self._floor_cumulative_areas[floor_index]
+            triangle_indices = np.minimum(np.searchsorted(cumulative_areas,
+                                                          np.random.uniform(0, cumulative_areas[-1], num_points),
+                                                          side="right"), len(cumulative_areas) - 1)
+            points[mask] = self._sample_in_triangles(self._floor_triangles[floor_index][triangle_indices],
+                                                     np.random.rand(num_points), np.random.rand(num_points))
+            points[mask, 2] = self.used_floors[floor_index].get_location()[2] + heights[mask]
+        return points
+
+    @staticmethod
+    def _sample_in_triangles(triangles: np.ndarray, r1: np.ndarray, r2: np.ndarray) -> np.ndarray:
+        """ Maps uniform random numbers to uniformly distributed points inside the given triangles.
+
+        :param triangles: One triangle per point with shape [N, 3, 3].
+        :param r1: Uniform random numbers in [0, 1] with shape [N].
+        :param r2: Uniform random numbers in [0, 1] with shape [N].
+        :return: The points with shape [N, 3].
+        """
+        sqrt_r1 = np.sqrt(r1)[:, np.newaxis]
+        r2 = r2[:, np.newaxis]
+        return (1 - sqrt_r1) * triangles[:, 0] + sqrt_r1 * (1 - r2) * triangles[:, 1] + \
+            sqrt_r1 * r2 * triangles[:, 2]
@@ -1,6 +1,7 @@
 """ All mesh objects are captured in this class. """
 
-from typing import List, Union, Tuple, Optional
+from typing import List, Union, Tuple, Optional, Dict, Any
+import sys
 from sys import platform
 
 import warnings
@@ -136,6 +137,22 @@ def get_bound_box(self, local_coords: bool = False) -> np.ndarray:
             return np.array([local2world @ Vector(cord) for cord in self.blender_obj.bound_box])
         return np.array([Vector(cord) for cord in self.blender_obj.bound_box])
 
+    def get_world_triangles(self) -> np.ndarray:
+        """ Returns all faces of the mesh triangulated and in world coordinates.
+
+        :return: The triangles with shape [T, 3, 3].
+        """
+        mesh = self.get_mesh()
+        mesh.calc_loop_triangles()
+        vertices = np.zeros(len(mesh.vertices) * 3, dtype=np.float64)
+        mesh.vertices.foreach_get("co", vertices)
+        triangle_indices = np.zeros(len(mesh.loop_triangles) * 3, dtype=np.int64)
+        mesh.loop_triangles.foreach_get("vertices", triangle_indices)
+
+        local2world = self.get_local2world_mat()
+        vertices = vertices.reshape(-1, 3) @ local2world[:3, :3].T + local2world[:3, 3]
+        return vertices[triangle_indices.reshape(-1, 3)]
+
     def persist_transformation_into_mesh(self, location: bool = True, rotation: bool = True, scale: bool = True):
         """
         Apply the current transformation of the object, which are saved in the location, scale or rotation attributes
@@ -661,16 +678,22 @@ def disable_all_rigid_bodies():
             obj.disable_rigidbody()
 
 
-def create_bvh_tree_multi_objects(mesh_objects: List[MeshObject]) -> mathutils.bvhtree.BVHTree:
+def create_bvh_tree_multi_objects(mesh_objects: List[MeshObject], with_object_lookup: bool = False) \
+        -> Union[mathutils.bvhtree.BVHTree, "MultiObjectBVHTree"]:
     """ Creates a bvh tree which contains multiple mesh objects.
 
     Such a tree is later used for fast raycasting.
 
     :param mesh_objects: The list of mesh objects that should be put into the BVH tree.
+    :param with_object_lookup: If True, a MultiObjectBVHTree is returned, which in addition to the tree also knows
+                               from which mesh object each face came. This allows replacing scene ray casts by the
+                               much faster bvh tree, e.g. in scene_coverage_score.
     :return: The built BVH tree.
     """
     # Create bmesh which will contain the meshes of all objects
     bm = bmesh.new()
+    # Remember the number of faces each object added to the bmesh
+    face_counts = []
     # Go through all mesh objects
     for obj in mesh_objects:
         # Get a copy of the mesh
@@ -678,14 +701,150 @@ def create_bvh_tree_multi_objects(mesh_objects: List[MeshObject]) -> mathutils.b
         # Apply world matrix 
         mesh.transform(Matrix(obj.get_local2world_mat()))
         # Add object mesh to bmesh
+        num_faces_before = len(bm.faces)
         bm.from_mesh(mesh)
+        face_counts.append(len(bm.faces) - num_faces_before)
+        # Remove the copy again
+        bpy.data.meshes.remove(mesh)
 
     # Create tree from bmesh
     bvh_tree = mathutils.bvhtree.BVHTree.FromBMesh(bm)
     bm.free()
+    if with_object_lookup:
+        face_to_object = np.repeat(np.arange(len(mesh_objects)), face_counts)
+        return MultiObjectBVHTree(bvh_tree, mesh_objects, face_to_object)
     return bvh_tree
 
 
+class MultiObjectBVHTree:
+    """
+    A bvh tree containing multiple mesh objects, which remembers from which mesh object each face came.
+
+    It can be used everywhere a normal bvh tree is used for ray casting. In addition, the custom properties of all
+    objects are cached when the tree is built, so they can be used for each hit without accessing blender.
+    """
+
+    def __init__(self, bvh_tree: mathutils.bvhtree.BVHTree, mesh_objects: List[MeshObject],
+                 face_to_object: np.ndarray):
+        """
+        :param bvh_tree: The bvh tree containing the faces of all objects.
+        :param mesh_objects: The mesh objects in the order they have been added to the tree.
+        :param face_to_object: The index of the mesh object for each face of the tree.
+        """
+        self.bvh_tree = bvh_tree
+        self.mesh_objects = mesh_objects
+        self.face_to_object = face_to_object
+        self.object_names = [obj.get_name() for obj in mesh_objects]
+        self.custom_properties: List[Dict[str, Any]] = [{key: obj.blender_obj[key] for key in obj.blender_obj.keys()}
+                                                        for obj in mesh_objects]
+        # Embree ray intersector, which is created on the first batched ray cast
+        self._embree_intersector: Optional[Any] = None
+        self._triangle_to_object: Optional[np.ndarray] = None
+
+    def ray_cast(self, origin: Union[Vector, list, np.ndarray], direction: Union[Vector, list, np.ndarray],
+                 distance: float = sys.float_info.max) -> Tuple[Optional[Vector], Optional[Vector], Optional[int],
+                                                                Optional[float]]:
+        """ Casts a ray into the tree, same as BVHTree.ray_cast.
+
+        :param origin: The origin of the ray.
+        :param direction: The direction of the ray.
+        :param distance: The maximum distance of the ray.
+        :return: The location, the normal, the face index and the distance of the hit or Nones if nothing was hit.
+        """
+        return self.bvh_tree.ray_cast(origin, direction, distance)
+
+    def ray_cast_object(self, origin: Union[Vector, list, np.ndarray], direction: Union[Vector, list, np.ndarray],
+                        distance: float = sys.float_info.max) -> Tuple[Optional[int], Optional[float]]:
+        """ Casts a ray into the tree and returns which object was hit.
+
+        :param origin: The origin of the ray.
+        :param direction: The direction of the ray.
+        :param distance: The maximum distance of the ray.
+        :return: The index of the hit object in mesh_objects and the distance of the hit or Nones if nothing was hit.
+        """
+        _, _, face_index, dist = self.bvh_tree.ray_cast(origin, direction, distance)
+        if face_index is None:
+            return None, None
+        return int(self.face_to_object[face_index]), dist
+
+    def ray_cast_batch(self, origins: np.ndarray, directions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """ Casts many rays at once and returns which object was hit by each ray.
+
+        If embree is available in the python environment (`blenderproc pip install embreex`), all rays are cast at
+        once via trimesh, otherwise the rays are cast one by one into the bvh tree.
+
+        :param origins: The origins of the rays with shape [N, 3].
+        :param directions: The directions of the rays with shape [N, 3].
+        :return: The index of the hit object in mesh_objects with shape [N] (-1 if nothing was hit) and the distance
+                 of each hit with shape [N] (inf if nothing was hit).
+        """
+        origins = np.broadcast_to(np.asarray(origins, dtype=np.float64), np.shape(directions))
+        directions = np.asarray(directions, dtype=np.float64)
+        object_indices = np.full(len(directions), -1, dtype=np.int64)
+        dists = np.full(len(directions), np.inf)
+
+        intersector = self._get_embree_intersector()
+        if intersector is not None:
+            locations, ray_indices, triangle_indices = intersector.intersects_location(origins, directions,
+                                                                                       multiple_hits=False)
+            object_indices[ray_indices] = self._triangle_to_object[triangle_indices]
+            dists[ray_indices] = np.linalg.norm(locations - origins[ray_indices], axis=-1)
+        else:
+            bvh_ray_cast = self.bvh_tree.ray_cast
+            for i, (origin, direction) in enumerate(zip(origins.tolist(), directions.tolist())):
+                _, _, face_index, dist = bvh_ray_cast(origin, direction)
+                if face_index is not None:
+                    object_indices[i] = self.face_to_object[face_index]
+                    dists[i] = dist
+        return object_indices, dists
+
+    def uses_embree(self) -> bool:
+        """ Returns whether ray_cast_batch casts all rays at once via embree.
+
+        :return: True, if embree is available.
+        """
+        return self._get_embree_intersector() is not None
+
+    def _get_embree_intersector(self) -> Optional[Any]:
+        """ Returns an embree ray intersector containing all objects or None if embree is not available.
+
+        :return: The trimesh ray intersector.
+        """
+        if self._embree_intersector is None and self._triangle_to_object is None:
+            try:
+                # pylint: disable=import-outside-toplevel
+                from trimesh.ray.ray_pyembree import RayMeshIntersector
+                # pylint: enable=import-outside-toplevel
+            except ImportError:
+                # Remember that embree is not available by setting an empty triangle table
+                self._triangle_to_object = np.zeros(0, dtype=np.int64)
+                return None
+            triangles = [obj.get_world_triangles() for obj in self.mesh_objects]
+            self._triangle_to_object = np.repeat(np.arange(len(triangles)), [len(tris) for tris in triangles])
+            vertices = np.concatenate(triangles, axis=0).reshape(-1, 3)
+            mesh = Trimesh(vertices=vertices, faces=np.arange(len(vertices)).reshape(-1, 3), process=False)
+            self._embree_intersector = RayMeshIntersector(mesh)
+        return self._embree_intersector
+
+    def get_object_of_face(self, face_index: int) -> MeshObject:
+        """ Returns the mesh object to which the given face of the tree belongs.
+
+        :param face_index: The index of a face of the tree, e.g. returned by ray_cast.
+        :return: The mesh object containing the face.
+        """
+        return self.mesh_objects[self.face_to_object[face_index]]
+
+    def find_nearest(self, origin: Union[Vector, list, np.ndarray], distance: float = sys.float_info.max) \
+            -> Tuple[Optional[Vector], Optional[Vector], Optional[int], Optional[float]]:
+        """ Finds the nearest point on the faces of the tree, same as BVHTree.find_nearest.
+
+        :param origin: The point to search from.
+        :param distance: The maximum distance to search.
+        :return: The location, the normal, the face index and the distance of the nearest point.
+        """
+        return self.bvh_tree.find_nearest(origin, distance)
+
+
 def compute_poi(objects: List[MeshObject]) -> np.ndarray:
     """ Computes a point of interest in the scene. Point is defined as a location of the one of the selected objects
     that is the closest one to the mean location of the bboxes of the selected objects.
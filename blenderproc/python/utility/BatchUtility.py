@@ -0,0 +1,235 @@
+""" Runs one BlenderProc script on many scene files in parallel (`blenderproc batch`).
+
+The scenes are executed as jobs by multiple persistent workers (see `blenderproc serve`), which share one job
+directory. Each worker runs in its own blender process with its own temporary directory and its own subset of cpu
+cores. This module does not depend on bpy, it is used from outside of blender.
+"""
+
+import glob
+from functools import partial
+import json
+import os
+import subprocess
+import time
+from typing import Any, Dict, List, Optional
+
+from blenderproc.python.utility.WorkerUtility import WorkerUtility
+
+
+class BatchRunner:
+    """ Shards scene files across multiple blender workers, retries failed scenes and writes a manifest. """
+
+    def __init__(self, script: str, scenes_pattern: str, script_args: List[str], num_workers: int,
+                 manifest_path: str, temp_dir: str, threads_per_worker: int = 0,
+                 skip_if_exists: Optional[str] = None, max_retries: int = 1, max_jobs_per_process: int = 0,
+                 poll_interval: float = 1.0):
+        """
+        :param script: The path to the BlenderProc script, which is executed for each scene.
+        :param scenes_pattern: A glob pattern matching all scene files, e.g. "3D-FRONT/*.json".
+        :param script_args: The arguments given to the script. The placeholders {scene}, {scene_name} and {index}
+                            are replaced by the path of the scene, its file name without extension and its index.
+        :param num_workers: The number of blender processes, which run in parallel.
+        :param manifest_path: The path of the json manifest, which contains the status, timings and errors of all
+                              scenes. If it already exists, all scenes which succeeded before are skipped.
+        :param temp_dir: The directory in which the job directory and the temporary directories of all workers
+                         are created.
+        :param threads_per_worker: The number of cpu threads each worker uses for rendering. If 0 is given, the
+                                   available cores are split evenly among the workers.
+        :param skip_if_exists: A glob pattern, which can contain the same placeholders as the script args. If any
+                               file matches it, the scene is skipped, e.g. "output/{scene_name}*.png".
+        :param max_retries: How often a failed or crashed scene is retried.
+        :param max_jobs_per_process: Restarts a worker after this many jobs. If 0 is given, workers are not restarted.
+        :param poll_interval: Seconds to wait between two checks of the job status.
+        """
+        self.script = os.path.abspath(script)
+        self.scenes = sorted(os.path.abspath(path) for path in glob.glob(scenes_pattern, recursive=True))
+        self.script_args = script_args
+        self.num_workers = max(1, num_workers)
+        self.manifest_path = os.path.abspath(manifest_path)
+        self.temp_dir = temp_dir
+        self.job_dir = os.path.join(temp_dir, "jobs")
+        self.skip_if_exists = skip_if_exists
+        self.max_retries = max_retries
+        self.max_jobs_per_process = max_jobs_per_process
+        self.poll_interval = poll_interval
+
+        # Split the available cores among the workers
+        if hasattr(os, "sched_getaffinity"):
+            available_cores = sorted(os.sched_getaffinity(0))
+        else:
+            available_cores = list(range(os.cpu_count() or 1))
+        if threads_per_worker <= 0:
+            threads_per_worker = max(1, len(available_cores) // self.num_workers)
+        self.threads_per_worker = threads_per_worker
+        self.worker_cores = []
+        for worker_id in range(self.num_workers):
+            cores = available_cores[worker_id * threads_per_worker:(worker_id + 1) * threads_per_worker]
+            # If there are more threads requested than cores available, do not restrict the worker
+            self.worker_cores.append(cores if len(cores) == threads_per_worker else None)
+
+        self.manifest: Dict[str, Any] = {}
+        self._terminated = False
+
+    @staticmethod
+    def _fill_placeholders(value: str, scene: str, index: int) -> str:
+        """ Replaces the scene placeholders in the given string.
+
+        :param value: The string containing the placeholders.
+        :param scene: The path of the scene.
+        :param index: The index of the scene.
+        :return: The string with all placeholders replaced.
+        """
+        scene_name = os.path.splitext(os.path.basename(scene))[0]
+        return value.replace("{scene}", scene).replace("{scene_name}", scene_name).replace("{index}", str(index))
+
+    def _load_manifest(self):
+        """ Loads an existing manifest or creates a new one. """
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as file:
+                self.manifest = json.load(file)
+        else:
+            self.manifest = {"script": self.script, "scenes": {}}
+        self.manifest["num_workers"] = self.num_workers
+        self.manifest["threads_per_worker"] = self.threads_per_worker
+        for scene in self.scenes:
+            self.manifest["scenes"].setdefault(scene, {"status": "pending", "attempts": []})
+
+    def _write_manifest(self):
+        """ Writes the manifest atomically, so it always contains a valid state, even if the batch is killed. """
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.manifest, file, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _is_scene_done(self, scene: str, index: int) -> bool:
+        """ Checks if the given scene has already been processed in a previous run.
+
+        :param scene: The path of the scene.
+        :param index: The index of the scene.
+        :return: True, if the scene can be skipped.
+        """
+        if self.manifest["scenes"][scene]["status"] in ["success", "skipped"]:
+            return True
+        if self.skip_if_exists is not None:
+            return len(glob.glob(self._fill_placeholders(self.skip_if_exists, scene, index))) > 0
+        return False
+
+    def _submit(self, scene: str, index: int) -> str:
+        """ Submits a job for the given scene.
+
+        :param scene: The path of the scene.
+        :param index: The index of the scene.
+        :return: The id of the submitted job.
+        """
+        args = [self._fill_placeholders(arg, scene, index) for arg in self.script_args]
+        return WorkerUtility.submit_job(self.job_dir, self.script, args)
+
+    def _start_worker(self, worker_id: int, blender_command: List[str],
+                      environment: Dict[str, str]) -> subprocess.Popen:
+        """ Starts a new blender process, which executes jobs from the job directory.
+
+        :param worker_id: The id of the worker, it determines the temp dir and the used cpu cores.
+        :param blender_command: The command to start blender with the serve script, without temp dir and args.
+        :param environment: The environment variables used for the blender process.
+        :return: The started process.
+        """
+        worker_temp_dir = os.path.join(self.temp_dir, f"worker_{worker_id}")
+        worker_environment = dict(environment, BLENDER_PROC_CPU_THREADS=str(self.threads_per_worker))
+        cores = self.worker_cores[worker_id]
+        preexec_fn = None
+        if cores is not None and hasattr(os, "sched_setaffinity"):
+            preexec_fn = partial(os.sched_setaffinity, 0, cores)
+        # pylint: disable=consider-using-with,subprocess-popen-preexec-fn
+        return subprocess.Popen(blender_command + [worker_temp_dir, self.job_dir, "--max-jobs",
+                                                   str(self.max_jobs_per_process)],
+                                env=worker_environment, preexec_fn=preexec_fn)
+        # pylint: enable=consider-using-with,subprocess-popen-preexec-fn
+
+    def terminate(self):
+        """ Stops the batch after the current check, the running workers are terminated. """
+        self._terminated = True
+
+    def run(self, blender_command: List[str], environment: Dict[str, str]) -> int:
+        """ Runs all scenes and returns once every scene succeeded, failed or was skipped.
+
+        :param blender_command: The command to start blender with the serve script, without temp dir and args.
+        :param environment: The environment variables used for the blender processes.
+        :return: 0 if all scenes succeeded or were skipped, otherwise 1.
+        """
+        if not self.scenes:
+            raise RuntimeError("The given scene pattern does not match any file.")
+        self._load_manifest()
+        WorkerUtility.prepare_job_dir(self.job_dir)
+
+        job_to_scene = {}
+        attempts_in_this_run: Dict[str, int] = {}
+        for index, scene in enumerate(self.scenes):
+            if self._is_scene_done(scene, index):
+                if self.manifest["scenes"][scene]["status"] != "success":
+                    self.manifest["scenes"][scene]["status"] = "skipped"
+            else:
+                job_to_scene[self._submit(scene, index)] = (scene, index)
+        print(f"Rendering {len(job_to_scene)} of {len(self.scenes)} scenes with {self.num_workers} workers "
+              f"using {self.threads_per_worker} threads each")
+        self.manifest["started_at"] = time.time()
+        self._write_manifest()
+
+        workers = [self._start_worker(worker_id, blender_command, environment)
+                   for worker_id in range(min(self.num_workers, len(job_to_scene)))]
+        failed_startups = 0
+        try:
+            while job_to_scene and not self._terminated:
+                changed = False
+                for job_id, (scene, index) in list(job_to_scene.items()):
+                    job = WorkerUtility.get_job_status(self.job_dir, job_id)
+                    if job is None:
+                        continue
+                    del job_to_scene[job_id]
+                    changed = True
+                    scene_entry = self.manifest["scenes"][scene]
+                    scene_entry["attempts"].append({"job_id": job_id, "status": job["status"],
+                                                    "duration": job["duration"], "error": job["error"]})
+                    scene_entry["status"] = job["status"]
+                    attempts_in_this_run[scene] = attempts_in_this_run.get(scene, 0) + 1
+                    if job["status"] == "failed" and attempts_in_this_run[scene] <= self.max_retries:
+                        print(f"Scene {scene} failed, retrying it")
+                        job_to_scene[self._submit(scene, index)] = (scene, index)
+                    else:
+                        print(f"Scene {scene} finished with status {job['status']}")
+
+                for worker_id, worker in enumerate(workers):
+                    if worker.poll() is None:
+                        continue
+                    crashed_jobs = WorkerUtility.fail_running_jobs_of_worker(
+                        self.job_dir, worker.pid, f"Blender terminated with exit code {worker.returncode}")
+                    if not crashed_jobs and worker.returncode != 0:
+                        failed_startups += 1
+                        if failed_startups > 2 * self.num_workers:
+                            raise RuntimeError("The workers repeatedly terminated without executing a job, "
+                                               "check the blender output above.")
+                    if job_to_scene:
+                        workers[worker_id] = self._start_worker(worker_id, blender_command, environment)
+
+                if changed:
+                    self._write_manifest()
+                time.sleep(self.poll_interval)
+        finally:
+            WorkerUtility.request_stop(self.job_dir)
+            for worker in workers:
+                if self._terminated or job_to_scene:
+                    worker.terminate()
+                worker.wait()
+
+            self.manifest["finished_at"] = time.time()
+            self.manifest["total_duration"] = self.manifest["finished_at"] - self.manifest["started_at"]
+            self._write_manifest()
+
+        failed_scenes = [scene for scene in self.scenes if self.manifest["scenes"][scene]["status"] == "failed"]
+        if failed_scenes:
+            print(f"{len(failed_scenes)} scenes failed, see {self.manifest_path} for details:")
+            for scene in failed_scenes:
+                print(f"\t{scene}")
+            return 1
+        print(f"All scenes are done, the manifest has been written to {self.manifest_path}")
+        return 0
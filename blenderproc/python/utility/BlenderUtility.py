@@ -190,6 +190,52 @@ def load_image(file_path: str, num_channels: int = 3) -> np.ndarray:
         raise NotImplementedError("File with ending " + file_ending + " cannot be loaded.")
 
 
+def load_exr_layer(file_path: str, layer: str, num_channels: int = 3) -> np.ndarray:
+    """ Loads a single layer of a multilayer .exr file, the channels of all other layers are not decoded.
+
+    Requires the OpenEXR python package (`blenderproc pip install OpenEXR`).
+
+    :param file_path: The path to the multilayer .exr file.
+    :param layer: The name of the layer to load.
+    :param num_channels: The maximum number of channels to return.
+    :return: The layer as float32 array of shape [H, W, C] or [H, W] if the layer only contains a single channel.
+    """
+    try:
+        # pylint: disable=import-outside-toplevel
+        import OpenEXR
+        import Imath
+        # pylint: enable=import-outside-toplevel
+    except ImportError as e:
+        raise ImportError("Loading multilayer .exr files requires the OpenEXR package: "
+                          "`blenderproc pip install OpenEXR`") from e
+
+    exr_file = OpenEXR.InputFile(file_path)
+    try:
+        header = exr_file.header()
+        data_window = header["dataWindow"]
+        width = data_window.max.x - data_window.min.x + 1
+        height = data_window.max.y - data_window.min.y + 1
+
+        # Blender names the channels of a layer after the type of the linked socket (color, vector or value)
+        channel_names = [f"{layer}.{channel}" for channel in ["R", "G", "B", "A", "X", "Y", "Z", "V"]
+                         if f"{layer}.{channel}" in header["channels"]][:num_channels]
+        if not channel_names:
+            raise RuntimeError(f"The file {file_path} does not contain the layer {layer}.")
+
+        channels = []
+        for channel_name in channel_names:
+            pixel_type = header["channels"][channel_name].type
+            dtype = np.float16 if pixel_type.v == Imath.PixelType.HALF else np.float32
+            channels.append(np.frombuffer(exr_file.channel(channel_name, pixel_type), dtype=dtype)
+                            .reshape(height, width).astype(np.float32))
+    finally:
+        exr_file.close()
+
+    if len(channels) == 1:
+        return channels[0]
+    return np.stack(channels, axis=-1)
+
+
 def collect_all_orphan_data_blocks() -> Dict[str, Any]:
     """ Returns all orphan data blocks grouped by their type
 
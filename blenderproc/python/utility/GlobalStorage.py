@@ -142,6 +142,15 @@ def is_in_storage(key: str) -> bool:
         """
         return key in GlobalStorage._storage_dict
 
+    @staticmethod
+    def clear_storage():
+        """
+        Removes all keys from the GlobalStorage, the global config is not touched.
+
+        This is used by the persistent worker to start each job with a fresh storage.
+        """
+        GlobalStorage._storage_dict.clear()
+
     @staticmethod
     def has_param(key: str) -> bool:
         """
@@ -7,7 +7,7 @@
 import bpy
 
 from blenderproc.python.utility.GlobalStorage import GlobalStorage
-from blenderproc.python.utility.Utility import reset_keyframes
+from blenderproc.python.utility.Utility import Utility, reset_keyframes
 from blenderproc.python.camera import CameraUtility
 from blenderproc.python.utility.DefaultConfig import DefaultConfig
 from blenderproc.python.renderer import RendererUtility
@@ -115,8 +115,8 @@ def set_default_parameters():
         RendererUtility.set_noise_threshold(DefaultConfig.sampling_noise_threshold)
 
         # Set number of cpu cores used for rendering (1 thread is always used for coordination => 1
-        # cpu thread means GPU-only rendering)
-        RendererUtility.set_cpu_threads(0)
+        # cpu thread means GPU-only rendering), `blenderproc batch` sets the env var to split the cores among workers
+        RendererUtility.set_cpu_threads(int(os.getenv("BLENDER_PROC_CPU_THREADS", "0")))
         RendererUtility.set_denoiser(DefaultConfig.denoiser)
         # For now disable the light tree per default, as it seems to increase render time for most of our tests
         RendererUtility.toggle_light_tree(False)
@@ -164,3 +164,35 @@ def remove_custom_properties():
         """ Remove all custom properties registered at global entities like the scene. """
         for key in list(bpy.context.scene.keys()):
             del bpy.context.scene[key]
+
+    @staticmethod
+    def reset_for_next_job():
+        """ Brings blender back into a state in which the next BlenderProc script can call bproc.init() again.
+
+        This is used by the persistent worker (`blenderproc serve`) in between two jobs. Next to cleaning up the
+        scene, all compositor nodes added by the enable_*_output functions are removed, the additional render passes
+        are disabled and the GlobalStorage (registered outputs, init flag) is cleared.
+        """
+        clean_up(clean_up_camera=True)
+
+        # Remove all compositor nodes except the render layer and the composite node
+        if bpy.context.scene.node_tree is not None:
+            tree = bpy.context.scene.node_tree
+            for node in list(tree.nodes):
+                if node.bl_idname not in ["CompositorNodeRLayers", "CompositorNodeComposite"]:
+                    tree.nodes.remove(node)
+            render_layer_nodes = Utility.get_nodes_with_type(tree.nodes, "CompositorNodeRLayers")
+            composite_nodes = Utility.get_nodes_with_type(tree.nodes, "CompositorNodeComposite")
+            if render_layer_nodes and composite_nodes:
+                tree.links.new(render_layer_nodes[0].outputs["Image"], composite_nodes[0].inputs["Image"])
+        bpy.context.scene.use_nodes = False
+
+        # Disable all additional render passes
+        view_layer = bpy.context.view_layer
+        view_layer.use_pass_z = False
+        view_layer.use_pass_mist = False
+        view_layer.use_pass_normal = False
+        view_layer.use_pass_diffuse_color = False
+        view_layer.use_pass_object_index = False
+
+        GlobalStorage.clear_storage()
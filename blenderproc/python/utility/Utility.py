@@ -422,10 +422,12 @@ def output_already_registered(output: Dict[str, Any], output_list: List[Dict[str
         :return: bool indicating whether it already exists.
         """
         for _output in output_list:
-            if output["key"] == _output["key"] and output["path"] == _output["path"]:
+            # Outputs stored in different layers of the same multilayer .exr file share their path
+            same_path = output["path"] == _output["path"] and output.get("layer") == _output.get("layer")
+            if output["key"] == _output["key"] and same_path:
                 print("Warning! Detected output entries with duplicate keys and paths")
                 return True
-            if output["key"] == _output["key"] or output["path"] == _output["path"]:
+            if output["key"] == _output["key"] or same_path:
                 raise RuntimeError("Can not have two output entries with the same key/path but not same path/key." +
                                    f"Original entry's data: key:{_output['key']} path:{_output['path']}, Entry to be "
                                    f"registered: key:{output['key']} path:{output['path']}")
@@ -0,0 +1,186 @@
+""" Job directory protocol used by the persistent BlenderProc worker (`blenderproc serve`).
+
+A job directory contains the following sub folders:
+
+- pending/: Jobs which have been submitted, but not yet been claimed by a worker.
+- running/: Jobs which are currently executed. The pid of the worker is appended to the file name.
+- finished/: Jobs which have been executed, together with their status, duration and error message.
+
+Jobs are claimed and moved via `os.replace`, which is atomic on the same file system, so multiple workers can
+share the same job directory without executing a job twice. This module does not depend on bpy, so jobs can be
+submitted from outside of blender.
+"""
+
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class WorkerUtility:
+    """ Functions to submit, claim and finish jobs inside a job directory. """
+
+    pending_folder = "pending"
+    running_folder = "running"
+    finished_folder = "finished"
+    stop_file = "stop"
+
+    @staticmethod
+    def prepare_job_dir(job_dir: str):
+        """ Creates all sub folders of the given job directory, if they do not exist yet.
+
+        :param job_dir: The path to the job directory.
+        """
+        for folder in [WorkerUtility.pending_folder, WorkerUtility.running_folder, WorkerUtility.finished_folder]:
+            os.makedirs(os.path.join(job_dir, folder), exist_ok=True)
+
+    @staticmethod
+    def _write_json_atomically(path: str, data: Dict[str, Any]):
+        """ Writes the given data as json into the given path, readers never see a partially written file.
+
+        :param path: The final path of the json file.
+        :param data: The data to write.
+        """
+        tmp_path = path + f".{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def submit_job(job_dir: str, script: str, args: Optional[List[str]] = None, job_id: Optional[str] = None) -> str:
+        """ Adds a new job to the pending jobs of the given job directory.
+
+        :param job_dir: The path to the job directory.
+        :param script: The path to the BlenderProc script which should be executed.
+        :param args: The arguments which are given to the script via sys.argv.
+        :param job_id: The id of the job. If None is given, a unique id is generated, which keeps the submission order.
+        :return: The id of the submitted job.
+        """
+        WorkerUtility.prepare_job_dir(job_dir)
+        if job_id is None:
+            job_id = f"{time.time_ns()}_{uuid.uuid4().hex[:8]}"
+        job = {
+            "job_id": job_id,
+            "script": os.path.abspath(script),
+            "args": [str(arg) for arg in args] if args is not None else [],
+            "submitted_at": time.time()
+        }
+        WorkerUtility._write_json_atomically(os.path.join(job_dir, WorkerUtility.pending_folder, job_id + ".json"),
+                                             job)
+        return job_id
+
+    @staticmethod
+    def claim_next_job(job_dir: str, worker_pid: int) -> Optional[Tuple[Dict[str, Any], str]]:
+        """ Claims the oldest pending job by moving it into the running folder.
+
+        :param job_dir: The path to the job directory.
+        :param worker_pid: The pid of the worker, which claims the job.
+        :return: The job and the path of its running file or None if there are no pending jobs.
+        """
+        pending_dir = os.path.join(job_dir, WorkerUtility.pending_folder)
+        for file_name in sorted(os.listdir(pending_dir)):
+            if not file_name.endswith(".json"):
+                continue
+            running_path = os.path.join(job_dir, WorkerUtility.running_folder,
+                                        file_name[:-len(".json")] + f"@{worker_pid}.json")
+            try:
+                os.replace(os.path.join(pending_dir, file_name), running_path)
+            except FileNotFoundError:
+                # Another worker was faster
+                continue
+            with open(running_path, "r", encoding="utf-8") as file:
+                job = json.load(file)
+            return job, running_path
+        return None
+
+    @staticmethod
+    def finish_job(job_dir: str, job: Dict[str, Any], running_path: Optional[str], status: str,
+                   duration: Optional[float], error: Optional[str] = None):
+        """ Writes the status of the given job into the finished folder and removes its running file.
+
+        :param job_dir: The path to the job directory.
+        :param job: The job that has been executed.
+        :param running_path: The path of the running file of the job.
+        :param status: The status of the job, either "success" or "failed".
+        :param duration: The time in seconds the job took.
+        :param error: The error message, if the job failed.
+        """
+        result = dict(job, status=status, duration=duration, error=error, finished_at=time.time())
+        WorkerUtility._write_json_atomically(os.path.join(job_dir, WorkerUtility.finished_folder,
+                                                          job["job_id"] + ".json"), result)
+        if running_path is not None and os.path.exists(running_path):
+            os.remove(running_path)
+
+    @staticmethod
+    def fail_running_jobs_of_worker(job_dir: str, worker_pid: int, error: str) -> List[str]:
+        """ Marks all jobs, which are still in the running folder of a terminated worker, as failed.
+
+        This happens if blender crashes during the execution of a job.
+
+        :param job_dir: The path to the job directory.
+        :param worker_pid: The pid of the terminated worker.
+        :param error: The error message which is stored for each of these jobs.
+        :return: The ids of the jobs which were marked as failed.
+        """
+        failed_job_ids = []
+        running_dir = os.path.join(job_dir, WorkerUtility.running_folder)
+        for file_name in os.listdir(running_dir):
+            if file_name.endswith(f"@{worker_pid}.json"):
+                running_path = os.path.join(running_dir, file_name)
+                with open(running_path, "r", encoding="utf-8") as file:
+                    job = json.load(file)
+                WorkerUtility.finish_job(job_dir, job, running_path, "failed", None, error)
+                failed_job_ids.append(job["job_id"])
+        return failed_job_ids
+
+    @staticmethod
+    def get_job_status(job_dir: str, job_id: str) -> Optional[Dict[str, Any]]:
+        """ Returns the status of a finished job.
+
+        :param job_dir: The path to the job directory.
+        :param job_id: The id of the job.
+        :return: The finished job including status, duration and error or None if the job has not finished yet.
+        """
+        path = os.path.join(job_dir, WorkerUtility.finished_folder, job_id + ".json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    @staticmethod
+    def has_pending_jobs(job_dir: str) -> bool:
+        """ Checks if there are jobs, which have not been claimed yet.
+
+        :param job_dir: The path to the job directory.
+        :return: True, if there is at least one pending job.
+        """
+        pending_dir = os.path.join(job_dir, WorkerUtility.pending_folder)
+        return any(file_name.endswith(".json") for file_name in os.listdir(pending_dir))
+
+    @staticmethod
+    def request_stop(job_dir: str):
+        """ Asks all workers of the given job directory to stop after their current job.
+
+        :param job_dir: The path to the job directory.
+        """
+        with open(os.path.join(job_dir, WorkerUtility.stop_file), "w", encoding="utf-8"):
+            pass
+
+    @staticmethod
+    def clear_stop_request(job_dir: str):
+        """ Removes a previous stop request, such that new workers can be started on the given job directory.
+
+        :param job_dir: The path to the job directory.
+        """
+        if WorkerUtility.is_stop_requested(job_dir):
+            os.remove(os.path.join(job_dir, WorkerUtility.stop_file))
+
+    @staticmethod
+    def is_stop_requested(job_dir: str) -> bool:
+        """ Checks if the workers of the given job directory should stop.
+
+        :param job_dir: The path to the job directory.
+        :return: True, if a stop has been requested.
+        """
+        return os.path.exists(os.path.join(job_dir, WorkerUtility.stop_file))
@@ -0,0 +1,182 @@
+""" Writes .hdf5 containers in background threads, while blender continues with the next scene. """
+
+import os
+import queue
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Union
+
+import bpy
+import numpy as np
+
+from blenderproc.python.writer.WriterUtility import _WriterUtility
+
+
+class AsyncHdf5Writer:
+    """ Writes the rendered frames into .hdf5 containers in background threads.
+
+    The containers are the same as the ones written by bproc.writer.write_hdf5. While the frames are compressed and
+    written, the main thread can already load and render the next scene:
+
+    .. code-block:: python
+
+        with bproc.writer.AsyncHdf5Writer() as writer:
+            for scene in scenes:
+                ...
+                data = bproc.renderer.render()
+                writer.write(output_dir, data, append_to_existing_output=True)
+
+    The given data must not be modified after it has been passed to write().
+    """
+
+    def __init__(self, num_workers: int = 1, max_queue_size: int = 0,
+                 storage_options: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        :param num_workers: The number of threads, which write the containers.
+        :param max_queue_size: The maximum number of frames waiting to be written. If the queue is full, write()
+                               blocks until a frame has been written, this limits the used memory. If 0 is given,
+                               the queue size is not limited.
+        :param storage_options: Defines per key how the data is stored, see bproc.writer.write_hdf5.
+        """
+        self.storage_options = storage_options
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._pending_frames = 0
+        self._frames_written = 0
+        self._bytes_written = 0
+        self._errors: List[Exception] = []
+        # The next free container index per output dir, as the queued containers do not exist yet
+        self._next_frame_offsets: Dict[str, int] = {}
+        # The number of the last queued frame and the last written frame per container, such that the frame queued
+        # last wins, if the same container is written multiple times
+        self._num_queued_frames = 0
+        self._written_frame_numbers: Dict[str, int] = {}
+        self._closed = False
+        self._workers = [threading.Thread(target=self._work, name=f"AsyncHdf5Writer-{i}", daemon=True)
+                         for i in range(max(1, num_workers))]
+        for worker in self._workers:
+            worker.start()
+
+    def write(self, output_dir_path: str, output_data_dict: Dict[str, List[Union[np.ndarray, list, dict]]],
+              append_to_existing_output: bool = False, stereo_separate_keys: bool = False) -> List[str]:
+        """ Queues the given frames to be written into .hdf5 containers, one per frame.
+
+        :param output_dir_path: The folder path in which the .hdf5 containers will be generated
+        :param output_data_dict: The container, which keeps the different images, which should be saved to disc.
+                                 Each key will be saved as its own key in the .hdf5 container.
+        :param append_to_existing_output: If this is True, the numbering of the new containers starts after the
+                                          existing and the still queued containers in output_dir_path.
+        :param stereo_separate_keys: If this is True and the rendering was done in stereo mode, the left and the
+                                     right image are saved in separate keys, e.g. colors_0 and colors_1.
+        :return: The paths of the containers, which will be written.
+        """
+        if self._closed:
+            raise RuntimeError("The writer has already been closed.")
+        self._raise_errors()
+
+        output_dir_key = os.path.abspath(output_dir_path)
+        frames = _WriterUtility.prepare_hdf5_frames(output_dir_path, output_data_dict, append_to_existing_output,
+                                                    self._next_frame_offsets.get(output_dir_key, 0))
+        if frames:
+            last_index = int(os.path.basename(frames[-1][0])[:-len(".hdf5")])
+            self._next_frame_offsets[output_dir_key] = max(self._next_frame_offsets.get(output_dir_key, 0),
+                                                           last_index + 1)
+
+        use_multiview = bpy.context.scene.render.use_multiview
+        for hdf5_path, frame_data in frames:
+            with self._lock:
+                self._pending_frames += 1
+                self._num_queued_frames += 1
+                frame_number = self._num_queued_frames
+            self._queue.put((frame_number, hdf5_path, frame_data, stereo_separate_keys, use_multiview))
+        return [hdf5_path for hdf5_path, _ in frames]
+
+    def _work(self):
+        """ Writes the queued frames until None is received. """
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                frame_number, hdf5_path, frame_data, stereo_separate_keys, use_multiview = task
+                # Write into a unique temporary file first, so there is never a partially written container, even
+                # if multiple workers write the same container
+                tmp_file, tmp_path = tempfile.mkstemp(suffix=".tmp", prefix=os.path.basename(hdf5_path) + ".",
+                                                      dir=os.path.dirname(hdf5_path))
+                os.close(tmp_file)
+                try:
+                    num_bytes = _WriterUtility.write_hdf5_frame(tmp_path, frame_data, stereo_separate_keys,
+                                                                use_multiview, self.storage_options,
+                                                                compress_outside_of_h5py=True)
+                    with self._lock:
+                        # Do not overwrite a container, which has already been written by a frame queued later
+                        if frame_number > self._written_frame_numbers.get(hdf5_path, 0):
+                            os.replace(tmp_path, hdf5_path)
+                            self._written_frame_numbers[hdf5_path] = frame_number
+                        self._frames_written += 1
+                        self._bytes_written += num_bytes
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+            except Exception as e:  # pylint: disable=broad-except
+                with self._lock:
+                    self._errors.append(e)
+            finally:
+                if task is not None:
+                    with self._lock:
+                        self._pending_frames -= 1
+                self._queue.task_done()
+
+    def _raise_errors(self):
+        """ Raises the first error, which occurred in one of the worker threads. """
+        with self._lock:
+            errors, self._errors = self._errors, []
+        if errors:
+            raise RuntimeError(f"{len(errors)} frames could not be written.") from errors[0]
+
+    def flush(self):
+        """ Blocks until all queued frames have been written and their containers are closed. """
+        self._queue.join()
+        self._raise_errors()
+
+    def close(self):
+        """ Writes all queued frames and stops the worker threads. """
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._raise_errors()
+
+    @property
+    def queue_depth(self) -> int:
+        """ The number of frames which are queued or currently written. """
+        with self._lock:
+            return self._pending_frames
+
+    @property
+    def frames_written(self) -> int:
+        """ The number of containers which have been written so far. """
+        with self._lock:
+            return self._frames_written
+
+    @property
+    def bytes_written(self) -> int:
+        """ The total size of all containers which have been written so far. """
+        with self._lock:
+            return self._bytes_written
+
+    def __enter__(self) -> "AsyncHdf5Writer":
+        return self
+
+    def __exit__(self, exc_type: Optional[type], exc_value: Optional[BaseException], traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # Do not hide the original exception by errors of the worker threads
+            try:
+                self.close()
+            except RuntimeError:
+                pass
@@ -5,8 +5,9 @@
 from multiprocessing import Pool
 import os
 import glob
+import time
 import trimesh
-from typing import List, Optional, Dict, Tuple
+from typing import Any, List, Optional, Dict, Tuple, Union
 import warnings
 import datetime
 
@@ -34,7 +35,8 @@ def write_bop(output_dir: str, target_objects: Optional[List[MeshObject]] = None
               depth_scale: float = 1.0, jpg_quality: int = 95, save_world2cam: bool = True,
               ignore_dist_thres: float = 100., m2mm: Optional[bool] = None, annotation_unit: str = 'mm',
               frames_per_chunk: int = 1000, calc_mask_info_coco: bool = True, delta: float = 0.015,
-              num_worker: Optional[int] = None):
+              num_worker: Optional[int] = None, instance_segmaps: Optional[List[np.ndarray]] = None,
+              instance_attribute_maps: Optional[List[List[dict]]] = None):
     """Write the BOP data
 
     :param output_dir: Path to the output directory.
@@ -60,7 +62,14 @@ def write_bop(output_dir: str, target_objects: Optional[List[MeshObject]] = None
     :param calc_mask_info_coco: Whether to calculate gt masks, gt info and gt coco annotations.
     :param delta: Tolerance used for estimation of the visibility masks (in [m]).
     :param num_worker: The number of processes to use to calculate gt_masks and gt_info. If None is given, number of cores is used.
+    :param instance_segmaps: List of instance segmentation maps rendered by bproc.renderer.render_segmap with
+                             map_by=["instance", "name"]. If given, the visible masks are taken from the segmaps and
+                             the full masks are computed by projecting the object meshes, so the gt masks and gt info
+                             are calculated without pyrender, OpenGL and the worker processes.
+    :param instance_attribute_maps: The per-frame instance attribute maps belonging to the instance_segmaps.
     """
+    if (instance_segmaps is None) != (instance_attribute_maps is None):
+        raise ValueError("The instance_segmaps and the instance_attribute_maps have to be given together.")
 
     # Output paths.
     dataset_dir = os.path.join(output_dir, dataset)
@@ -129,27 +138,18 @@ def write_bop(output_dir: str, target_objects: Optional[List[MeshObject]] = None
     if m2mm is not None:
         warnings.warn("WARNING: `m2mm` is deprecated, please use `annotation_scale='mm'` instead!")
         annotation_scale = 1000.
-    _BopWriterUtility.write_frames(chunks_dir, dataset_objects=dataset_objects, depths=depths, colors=colors,
-                                   color_file_format=color_file_format, frames_per_chunk=frames_per_chunk,
-                                   annotation_scale=annotation_scale, ignore_dist_thres=ignore_dist_thres,
-                                   save_world2cam=save_world2cam, depth_scale=depth_scale, jpg_quality=jpg_quality)
 
+    trimesh_objects = {}
     if calc_mask_info_coco:
-        # Set up the bop toolkit
-        SetupUtility.setup_pip(["git+https://github.com/thodan/bop_toolkit", "PyOpenGL==3.1.0"])
+        # Set up the bop toolkit, OpenGL is only required to render the masks with pyrender
+        SetupUtility.setup_pip(["git+https://github.com/thodan/bop_toolkit"] +
+                               (["PyOpenGL==3.1.0"] if instance_segmaps is None else []))
 
         # determine which objects to add to the vsipy renderer
         # for numpy>=1.20, np.float is deprecated: https://numpy.org/doc/stable/release/1.20.0-notes.html#deprecations
         np.float = float
 
-        # Determine for which directories mask_info_coco has to be calculated
-        chunk_dirs = sorted(glob.glob(os.path.join(chunks_dir, '*')))
-        chunk_dirs = [d for d in chunk_dirs if os.path.isdir(d)]
-        chunk_dir_ids = [d.split('/')[-1] for d in chunk_dirs]
-        chunk_dirs = chunk_dirs[chunk_dir_ids.index(f"{starting_chunk_id:06d}"):]
-
         # convert all objects to trimesh objects
-        trimesh_objects = {}
         for obj in dataset_objects:
             if obj.get_cp('category_id') in trimesh_objects:
                 continue
@@ -166,23 +166,38 @@ def write_bop(output_dir: str, target_objects: Optional[List[MeshObject]] = None
                       "the bop writer will fail!")
             trimesh_objects[obj.get_cp('category_id')] = trimesh_obj
 
-        # Create pool and init each worker
-        width = bpy.context.scene.render.resolution_x
-        height = bpy.context.scene.render.resolution_y
-        pool = Pool(num_worker, initializer=_BopWriterUtility._pyrender_init, initargs=[width, height, trimesh_objects])
+    _BopWriterUtility.write_frames(chunks_dir, dataset_objects=dataset_objects, depths=depths, colors=colors,
+                                   color_file_format=color_file_format, frames_per_chunk=frames_per_chunk,
+                                   annotation_scale=annotation_scale, ignore_dist_thres=ignore_dist_thres,
+                                   save_world2cam=save_world2cam, depth_scale=depth_scale, jpg_quality=jpg_quality,
+                                   instance_segmaps=instance_segmaps if calc_mask_info_coco else None,
+                                   instance_attribute_maps=instance_attribute_maps, trimesh_objects=trimesh_objects)
+
+    if calc_mask_info_coco:
+        # Determine for which directories mask_info_coco has to be calculated
+        chunk_dirs = sorted(glob.glob(os.path.join(chunks_dir, '*')))
+        chunk_dirs = [d for d in chunk_dirs if os.path.isdir(d)]
+        chunk_dir_ids = [d.split('/')[-1] for d in chunk_dirs]
+        chunk_dirs = chunk_dirs[chunk_dir_ids.index(f"{starting_chunk_id:06d}"):]
+
+        # The gt masks and gt info have already been calculated from the segmaps while writing the frames
+        pool = None
+        if instance_segmaps is None:
+            # Create pool and init each worker
+            width = bpy.context.scene.render.resolution_x
+            height = bpy.context.scene.render.resolution_y
+            pool = Pool(num_worker, initializer=_BopWriterUtility._pyrender_init,
+                        initargs=[width, height, trimesh_objects])
 
-        _BopWriterUtility.calc_gt_masks(chunk_dirs=chunk_dirs, starting_frame_id=starting_frame_id,
-                                        annotation_scale=annotation_scale, delta=delta, pool=pool)
-         
-        _BopWriterUtility.calc_gt_info(chunk_dirs=chunk_dirs, starting_frame_id=starting_frame_id,
-                                       annotation_scale=annotation_scale, delta=delta, pool=pool)
+            _BopWriterUtility.calc_gt_masks_and_info(chunk_dirs=chunk_dirs, starting_frame_id=starting_frame_id,
+                                                     annotation_scale=annotation_scale, delta=delta, pool=pool)
 
         _BopWriterUtility.calc_gt_coco(chunk_dirs=chunk_dirs, dataset_objects=dataset_objects,
                                        starting_frame_id=starting_frame_id)
-        
-        pool.close()
-        pool.join()
 
+        if pool is not None:
+            pool.close()
+            pool.join()
 
 
 def bop_pose_to_pyrender_coordinate_system(cam_R_m2c: np.ndarray, cam_t_m2c: np.ndarray) -> np.ndarray:
@@ -303,7 +318,7 @@ def write_camera(camera_path: str, depth_scale: float = 1.0):
 
     @staticmethod
     def get_frame_gt(dataset_objects: List[bpy.types.Mesh], unit_scaling: float, ignore_dist_thres: float,
-                     destination_frame: Optional[List[str]] = None):
+                     destination_frame: Optional[List[str]] = None, gt_objects: Optional[list] = None):
         """ Returns GT pose annotations between active camera and objects.
         
         :param dataset_objects: Save annotations for these objects.
@@ -311,6 +326,7 @@ def get_frame_gt(dataset_objects: List[bpy.types.Mesh], unit_scaling: float, ign
         :param ignore_dist_thres: Distance between camera and object after which object is ignored.
                                   Mostly due to failed physics.
         :param destination_frame: Transform poses from Blender internal coordinates to OpenCV coordinates
+        :param gt_objects: If a list is given, the object of each returned annotation is appended to it.
         :return: A list of GT camera-object pose annotations for scene_gt.json
         """
         if destination_frame is None:
@@ -344,6 +360,8 @@ def get_frame_gt(dataset_objects: List[bpy.types.Mesh], unit_scaling: float, ign
                     'obj_id': obj.get_cp("category_id") if not isinstance(obj, Link) else obj.visuals[0].get_cp(
                         'category_id')
                 })
+                if gt_objects is not None:
+                    gt_objects.append(obj)
             else:
                 print('ignored obj, ', obj.get_cp("category_id"), 'because either ')
                 print('(1) it is further away than parameter "ignore_dist_thres: ",', ignore_dist_thres)
@@ -392,7 +410,10 @@ def get_frame_camera(save_world2cam: bool, depth_scale: float = 1.0, unit_scalin
     def write_frames(chunks_dir: str, dataset_objects: list, depths: List[np.ndarray],
                      colors: List[np.ndarray], color_file_format: str = "PNG",
                      depth_scale: float = 1.0, frames_per_chunk: int = 1000, annotation_scale: float = 1000.,
-                     ignore_dist_thres: float = 100., save_world2cam: bool = True, jpg_quality: int = 95):
+                     ignore_dist_thres: float = 100., save_world2cam: bool = True, jpg_quality: int = 95,
+                     instance_segmaps: Optional[List[np.ndarray]] = None,
+                     instance_attribute_maps: Optional[List[List[dict]]] = None,
+                     trimesh_objects: Optional[Dict[int, trimesh.Trimesh]] = None):
         """Write each frame's ground truth into chunk directory in BOP format
 
         :param chunks_dir: Path to the output directory of the current chunk.
@@ -409,6 +430,11 @@ def write_frames(chunks_dir: str, dataset_objects: list, depths: List[np.ndarray
         :param annotation_scale: The scale factor applied to the calculated annotations (in [m]) to get them into the
                                  specified format (see `annotation_format` in `write_bop` for further details).
         :param frames_per_chunk: Number of frames saved in each chunk (called scene in BOP)
+        :param instance_segmaps: If given, the gt masks and the gt info are calculated from these instance segmaps,
+                                 see write_bop.
+        :param instance_attribute_maps: The per-frame instance attribute maps belonging to the instance_segmaps.
+        :param trimesh_objects: A dict containing trimesh meshes for each object category, only required if
+                                instance_segmaps are given.
         """
 
         # Format of the depth images.
@@ -418,6 +444,7 @@ def write_frames(chunks_dir: str, dataset_objects: list, depths: List[np.ndarray
         depth_tpath = os.path.join(chunks_dir, '{chunk_id:06d}', 'depth', '{im_id:06d}' + depth_ext)
         chunk_camera_tpath = os.path.join(chunks_dir, '{chunk_id:06d}', 'scene_camera.json')
         chunk_gt_tpath = os.path.join(chunks_dir, '{chunk_id:06d}', 'scene_gt.json')
+        chunk_gt_info_tpath = os.path.join(chunks_dir, '{chunk_id:06d}', 'scene_gt_info.json')
 
         # Paths to the already existing chunk folders (such folders may exist
         # when appending to an existing dataset).
@@ -446,12 +473,16 @@ def write_frames(chunks_dir: str, dataset_objects: list, depths: List[np.ndarray
         # Initialize structures for the GT annotations and camera info.
         chunk_gt = {}
         chunk_camera = {}
+        chunk_gt_info = {}
         if curr_frame_id != 0:
             # Load GT and camera info of the chunk we are appending to.
             chunk_gt = _BopWriterUtility.load_json(
                 chunk_gt_tpath.format(chunk_id=curr_chunk_id), keys_to_int=True)
             chunk_camera = _BopWriterUtility.load_json(
                 chunk_camera_tpath.format(chunk_id=curr_chunk_id), keys_to_int=True)
+            if instance_segmaps is not None:
+                chunk_gt_info = _BopWriterUtility.load_json(
+                    chunk_gt_info_tpath.format(chunk_id=curr_chunk_id), keys_to_int=True)
 
         # Go through all frames.
         num_new_frames = bpy.context.scene.frame_end - bpy.context.scene.frame_start
@@ -468,14 +499,16 @@ def write_frames(chunks_dir: str, dataset_objects: list, depths: List[np.ndarray
             if curr_frame_id == 0:
                 chunk_gt = {}
                 chunk_camera = {}
+                chunk_gt_info = {}
                 os.makedirs(os.path.dirname(
                     rgb_tpath.format(chunk_id=curr_chunk_id, im_id=0, im_type='PNG')))
                 os.makedirs(os.path.dirname(
                     depth_tpath.format(chunk_id=curr_chunk_id, im_id=0)))
 
             # Get GT annotations and camera info for the current frame.
+            gt_objects = []
             chunk_gt[curr_frame_id] = _BopWriterUtility.get_frame_gt(dataset_objects, annotation_scale,
-                                                                     ignore_dist_thres)
+                                                                     ignore_dist_thres, gt_objects=gt_objects)
             chunk_camera[curr_frame_id] = _BopWriterUtility.get_frame_camera(save_world2cam, depth_scale,
                                                                              annotation_scale)
 
@@ -500,6 +533,12 @@ def write_frames(chunks_dir: str, dataset_objects: list, depths: List[np.ndarray
             depth_fpath = depth_tpath.format(chunk_id=curr_chunk_id, im_id=curr_frame_id)
             _BopWriterUtility.save_depth(depth_fpath, depth_mm_scaled)
 
+            if instance_segmaps is not None:
+                chunk_gt_info[curr_frame_id] = _BopWriterUtility.calc_frame_gt_masks_and_info(
+                    os.path.dirname(os.path.dirname(depth_fpath)), curr_frame_id, chunk_gt[curr_frame_id], gt_objects,
+                    np.array(chunk_camera[curr_frame_id]['cam_K']).reshape(3, 3), np.round(depth_mm_scaled) > 0,
+                    instance_segmaps[frame_id], instance_attribute_maps[frame_id], trimesh_objects, annotation_scale)
+
             # Save the chunk info if we are at the end of a chunk or at the last new frame.
             if ((curr_frame_id + 1) % frames_per_chunk == 0) or \
                     (frame_id == num_new_frames - 1):
@@ -510,6 +549,10 @@ def write_frames(chunks_dir: str, dataset_objects: list, depths: List[np.ndarray
                 # Save camera info.
                 _BopWriterUtility.save_json(chunk_camera_tpath.format(chunk_id=curr_chunk_id), chunk_camera)
 
+                # Save GT info.
+                if instance_segmaps is not None:
+                    _BopWriterUtility.save_json(chunk_gt_info_tpath.format(chunk_id=curr_chunk_id), chunk_gt_info)
+
                 # Update ID's.
                 curr_chunk_id += 1
                 curr_frame_id = 0
@@ -518,276 +561,404 @@ def write_frames(chunks_dir: str, dataset_objects: list, depths: List[np.ndarray
         
 
     @staticmethod
-    def _pyrender_init(ren_width: int, ren_height: int, trimesh_objects: Dict[int, trimesh.Trimesh]):
-        """ Initializes a worker process for calc_gt_masks and calc_gt_info
-
-        :param ren_width: The width of the images to render.
-        :param ren_height: The height of the images to render.
-        :param trimesh_objects: A dict containing trimesh meshes for each object in the scene
-        """
-        # pylint: disable=import-outside-toplevel
-        # Import pyrender only inside the multiprocesses, otherwise this leads to an opengl error
-        # https://github.com/mmatl/pyrender/issues/200#issuecomment-1123713055        
-        import pyrender
-        # pylint: enable=import-outside-toplevel
-
-        global renderer, renderer_large, dataset_objects
+    def calc_frame_gt_masks_and_info(chunk_dir: str, im_id: int, frame_gt: List[Dict[str, Any]], gt_objects: list,
+                                     K: np.ndarray, valid_depth: np.ndarray, instance_segmap: np.ndarray,
+                                     instance_attribute_map: List[dict], trimesh_objects: Dict[int, trimesh.Trimesh],
+                                     annotation_scale: float = 1000.) -> List[Dict[str, Any]]:
+        """ Calculates the gt masks and the gt info of one frame from its instance segmentation.
 
-        dataset_objects = {}
-        # Create renderer for calc_gt_masks
-        renderer = pyrender.OffscreenRenderer(viewport_width=ren_width, viewport_height=ren_height)
-        # Create renderer for calc_gt_info
-        renderer_large = pyrender.OffscreenRenderer(viewport_width=ren_width * 3, viewport_height=ren_height * 3)
-        # Create pyrender meshes
-        for key in trimesh_objects.keys():
-            # we need to create a double-sided material to be able to render non-watertight meshes
-            # the other parameters are defaults, see
-            # https://github.com/mmatl/pyrender/blob/master/pyrender/mesh.py#L216-L223
-            material = pyrender.MetallicRoughnessMaterial(alphaMode='BLEND', baseColorFactor=[0.3, 0.3, 0.3, 1.0],
-                                                          metallicFactor=0.2, roughnessFactor=0.8, doubleSided=True)
-            dataset_objects[key] = pyrender.Mesh.from_trimesh(mesh=trimesh_objects[key], material=material)
+        The visible masks are directly taken from the segmap. The full masks, which also contain the occluded and the
+        truncated parts of the objects, are computed by projecting the triangles of the object meshes.
 
-
-    @staticmethod
-    def _calc_gt_masks_iteration(annotation_scale: float, K: np.ndarray, delta: float, dist_im: np.ndarray, chunk_dir: str, im_id: int, gt_data: Tuple[int, Dict[str, int]]):
-        """ One iteration of calc_gt_masks(), executed inside a worker process.
-
-        
-        :param annotation_scale: The scale factor applied to the calculated annotations (in [m]) to get them into the
-                                 specified format (see `annotation_format` in `write_bop` for further details).
-        :param K: The camera instrinsics to use.
-        :param delta: Tolerance used for estimation of the visibility masks.
-        :param dist_im: The distance image of the frame.
         :param chunk_dir: The chunk dir where to store the resulting images.
         :param im_id: The id of the current image/frame.
-        :param gt_data: Containing id of the object whose mask the worker should render
+        :param frame_gt: The gt poses of the frame, see get_frame_gt().
+        :param gt_objects: The object of each gt pose.
+        :param K: The camera instrinsics to use.
+        :param valid_depth: A boolean image, which marks all pixels with a valid depth value.
+        :param instance_segmap: The instance segmentation map of the frame.
+        :param instance_attribute_map: The instance attribute map of the frame, which maps the name of each object to
+                                       its index in the instance segmap.
+        :param trimesh_objects: A dict containing trimesh meshes for each object category.
+        :param annotation_scale: The scale factor applied to the calculated annotations (in [m]) to get them into the
+                                 specified format (see `annotation_format` in `write_bop` for further details).
+        :return: The gt info of all objects in the frame.
         """
-        # pylint: disable=import-outside-toplevel
-        # Import pyrender only inside the multiprocesses, otherwise this leads to an opengl error
-        # https://github.com/mmatl/pyrender/issues/200#issuecomment-1123713055     
-        import pyrender
         # This import is done inside to avoid having the requirement that BlenderProc depends on the bop_toolkit
-        from bop_toolkit_lib import inout, misc, visibility
+        # pylint: disable=import-outside-toplevel
+        from bop_toolkit_lib import misc
         # pylint: enable=import-outside-toplevel
 
-        global renderer, dataset_objects
-
-        gt_id, gt = gt_data
-
-        # Init pyrender camera
-        fx, fy, cx, cy = K[0, 0], K[1, 1], K[0, 2], K[1, 2]
-        camera = pyrender.IntrinsicsCamera(fx=fx, fy=fy, cx=cx, cy=cy, znear=0.1, zfar=100000)
-        
-        # create a new scene
-        scene = pyrender.Scene()
-
-        # add camera and current object
-        scene.add(camera)
-        t = np.array(gt['cam_t_m2c'])
-        # rescale translation depending on initial saving format
-        t /= annotation_scale
+        for mask_type in ['mask', 'mask_visib']:
+            os.makedirs(os.path.join(chunk_dir, mask_type), exist_ok=True)
+
+        im_height, im_width = instance_segmap.shape[:2]
+        im_size = (im_width, im_height)
+        name_to_idx = {attributes["name"]: int(attributes["idx"]) for attributes in instance_attribute_map
+                       if "name" in attributes}
+        if len(name_to_idx) != len(instance_attribute_map):
+            raise ValueError("The instance segmaps have to be rendered with map_by=[\"instance\", \"name\"].")
+
+        frame_gt_info = []
+        for gt_id, (gt, obj) in enumerate(zip(frame_gt, gt_objects)):
+            # Mask of the visible part of the object silhouette.
+            name = obj.visuals[0].get_name() if isinstance(obj, Link) else obj.get_name()
+            if name in name_to_idx:
+                mask_visib = instance_segmap == name_to_idx[name]
+            else:
+                mask_visib = np.zeros((im_height, im_width), dtype=bool)
+
+            # Mask of the full object silhouette, rendered three times larger to include the truncated part.
+            trimesh_obj = trimesh_objects[gt['obj_id']]
+            mask_large = _BopWriterUtility.project_silhouette(
+                trimesh_obj.triangles, np.array(gt['cam_R_m2c']).reshape(3, 3),
+                np.array(gt['cam_t_m2c']) / annotation_scale, K, (im_height * 3, im_width * 3), (im_width, im_height),
+                is_closed=trimesh_obj.is_watertight and trimesh_obj.is_winding_consistent)
+            mask = mask_large[im_height:2 * im_height, im_width:2 * im_width]
+
+            # Save the calculated masks.
+            mask_path = os.path.join(
+                chunk_dir, 'mask', '{im_id:06d}_{gt_id:06d}.png').format(im_id=im_id, gt_id=gt_id)
+            cv2.imwrite(mask_path, 255 * mask.astype(np.uint8))
+
+            mask_visib_path = os.path.join(
+                chunk_dir, 'mask_visib',
+                '{im_id:06d}_{gt_id:06d}.png').format(im_id=im_id, gt_id=gt_id)
+            cv2.imwrite(mask_visib_path, 255 * mask_visib.astype(np.uint8))
+
+            # Number of pixels in the whole object silhouette (even in the truncated part), the ones with a valid
+            # depth measurement and the visible ones.
+            px_count_all = np.count_nonzero(mask_large)
+            px_count_valid = np.count_nonzero(valid_depth[mask])
+            px_count_visib = np.count_nonzero(mask_visib)
+
+            # Visible surface fraction.
+            if px_count_all > 0:
+                visib_fract = px_count_visib / float(px_count_all)
+            else:
+                visib_fract = 0.0
+
+            # Bounding box of the whole object silhouette (including the truncated part) and of the visible part.
+            bbox = [-1, -1, -1, -1]
+            bbox_visib = [-1, -1, -1, -1]
+            if px_count_visib > 0:
+                ys, xs = mask_large.nonzero()
+                bbox = misc.calc_2d_bbox(xs - im_width, ys - im_height, im_size)
+                ys, xs = mask_visib.nonzero()
+                bbox_visib = misc.calc_2d_bbox(xs, ys, im_size)
+
+            frame_gt_info.append({
+                'px_count_all': int(px_count_all),
+                'px_count_valid': int(px_count_valid),
+                'px_count_visib': int(px_count_visib),
+                'visib_fract': float(visib_fract),
+                'bbox_obj': [int(e) for e in bbox],
+                'bbox_visib': [int(e) for e in bbox_visib]
+            })
+        return frame_gt_info
 
-        pose = bop_pose_to_pyrender_coordinate_system(cam_R_m2c=np.array(gt['cam_R_m2c']).reshape(3, 3),
-                                                        cam_t_m2c=t)
-        scene.add(dataset_objects[gt['obj_id']], pose=pose)
+    @staticmethod
+    def project_silhouette(triangles: np.ndarray, cam_R_m2c: np.ndarray, cam_t_m2c: np.ndarray, K: np.ndarray,
+                           im_size: Tuple[int, int], offset: Tuple[int, int] = (0, 0), is_closed: bool = False,
+                           near: float = 0.1) -> np.ndarray:
+        """ Computes the silhouette of a mesh by projecting all its triangles into the image.
+
+        The silhouette is the union of all projected triangles, so no depth test is required. Triangles are clipped
+        at the near plane, as done by the pyrender camera. For closed meshes, which are completely in front of the
+        near plane, the back facing triangles are skipped, as they are covered by the front facing ones.
+
+        All triangles are rasterized at once by testing the pixel centers inside their bounding boxes, so the cost
+        mainly depends on the number of triangles and the covered area and not on the size of the image. For a mesh
+        with 50k faces, this takes a few tens of milliseconds per object and frame in the main process. If this is too
+        slow, simplify the meshes before calling write_bop(), as their silhouettes rarely need the full resolution.
+
+        :param triangles: The triangles of the mesh in meters with shape [T, 3, 3].
+        :param cam_R_m2c: The 3x3 rotation from the model to the camera frame (OpenCV convention).
+        :param cam_t_m2c: The translation from the model to the camera frame in meters.
+        :param K: The camera intrinsics.
+        :param im_size: The size of the silhouette image, given as [H, W].
+        :param offset: The position [x, y] of the principal point is moved by this offset.
+        :param is_closed: Whether the mesh is watertight with consistently oriented faces.
+        :param near: The distance of the near plane in meters.
+        :return: A boolean mask with the given size.
+        """
+        points = (triangles.reshape(-1, 3) @ cam_R_m2c.T + cam_t_m2c).reshape(-1, 3, 3)
 
-        # Render the depth image.
-        _, depth_gt = renderer.render(scene=scene)
+        if not np.all(points[:, :, 2] > near):
+            # Back faces must not be skipped here, as the front faces in front of them might be clipped away
+            points = _BopWriterUtility.clip_triangles_at_near_plane(points, near)
+        elif is_closed:
+            # Each ray through the silhouette enters and leaves the closed mesh, so it always hits a triangle facing
+            # the camera. This holds independent of whether the faces are oriented outwards or inwards.
+            normals = np.cross(points[:, 1] - points[:, 0], points[:, 2] - points[:, 0])
+            points = points[np.einsum("ij,ij->i", normals, points[:, 0]) < 0]
 
-        # Convert depth image to distance image.
-        dist_gt = misc.depth_im_to_dist_im_fast(depth_gt, K)
+        pixels = (points.reshape(-1, 3) @ K.T)[:, :2] / points.reshape(-1, 3)[:, 2:] + offset
+        return _BopWriterUtility.rasterize_triangles(pixels.reshape(-1, 3, 2), im_size)
 
-        # Mask of the full object silhouette.
-        mask = dist_gt > 0
+    @staticmethod
+    def clip_triangles_at_near_plane(points: np.ndarray, near: float) -> np.ndarray:
+        """ Clips the given triangles at the near plane of the camera.
 
-        # Mask of the visible part of the object silhouette.
-        mask_visib = visibility.estimate_visib_mask_gt(
-            dist_im, dist_gt, delta, visib_mode='bop19')
+        Triangles with one vertex behind the near plane are split into two triangles, triangles with two vertices
+        behind the near plane are shortened and triangles completely behind the near plane are removed.
 
-        # Save the calculated masks.
-        mask_path = os.path.join(
-            chunk_dir, 'mask', '{im_id:06d}_{gt_id:06d}.png').format(im_id=im_id, gt_id=gt_id)
-        inout.save_im(mask_path, 255 * mask.astype(np.uint8))
+        :param points: The triangles in the camera frame (OpenCV convention) with shape [T, 3, 3].
+        :param near: The distance of the near plane.
+        :return: The clipped triangles with shape [T', 3, 3].
+        """
+        behind = points[:, :, 2] <= near
+        num_behind = np.count_nonzero(behind, axis=1)
+        clipped = [points[num_behind == 0]]
+        for num in [1, 2]:
+            selected = points[num_behind == num]
+            if len(selected) == 0:
+                continue
+            # Rotate the vertices, such that the single vertex on its side of the near plane comes first, while the
+            # orientation of the triangle is kept
+            single = np.argmax(behind[num_behind == num] == (num == 1), axis=1)
+            order = (single[:, np.newaxis] + np.arange(3)) % 3
+            a, b, c = np.moveaxis(np.take_along_axis(selected, order[:, :, np.newaxis], axis=1), 1, 0)
+            # The intersections of the edges a-b and a-c with the near plane
+            ab = a + (b - a) * ((near - a[:, 2]) / (b[:, 2] - a[:, 2]))[:, np.newaxis]
+            ac = a + (c - a) * ((near - a[:, 2]) / (c[:, 2] - a[:, 2]))[:, np.newaxis]
+            if num == 1:
+                clipped.append(np.stack([ab, b, c], axis=1))
+                clipped.append(np.stack([ab, c, ac], axis=1))
+            else:
+                clipped.append(np.stack([a, ab, ac], axis=1))
+        return np.concatenate(clipped)
 
-        mask_visib_path = os.path.join(
-            chunk_dir, 'mask_visib',
-            '{im_id:06d}_{gt_id:06d}.png').format(im_id=im_id, gt_id=gt_id)
-        inout.save_im(mask_visib_path, 255 * mask_visib.astype(np.uint8))
+    @staticmethod
+    def rasterize_triangles(pixels: np.ndarray, im_size: Tuple[int, int], max_elements: int = 1 << 22) -> np.ndarray:
+        """ Marks all pixels whose center lies inside or on the border of any of the given triangles.
 
+        :param pixels: The image coordinates [x, y] of the triangles with shape [T, 3, 2].
+        :param im_size: The size of the resulting image, given as [H, W].
+        :param max_elements: The maximum number of pixel candidates, which are tested at once.
+        :return: A boolean mask with the given size.
+        """
+        mask = np.zeros(im_size, dtype=bool)
+        # Only the pixel centers inside the bounding box of each triangle are tested
+        x_min = np.maximum(np.ceil(pixels[:, :, 0].min(axis=1)), 0)
+        x_max = np.minimum(np.floor(pixels[:, :, 0].max(axis=1)), im_size[1] - 1)
+        y_min = np.maximum(np.ceil(pixels[:, :, 1].min(axis=1)), 0)
+        y_max = np.minimum(np.floor(pixels[:, :, 1].max(axis=1)), im_size[0] - 1)
+        # Twice the signed area, degenerated triangles do not cover any pixel
+        area = (pixels[:, 1, 0] - pixels[:, 0, 0]) * (pixels[:, 2, 1] - pixels[:, 0, 1]) - \
+            (pixels[:, 1, 1] - pixels[:, 0, 1]) * (pixels[:, 2, 0] - pixels[:, 0, 0])
+        valid = (x_max >= x_min) & (y_max >= y_min) & (area != 0)
+        pixels, sign = pixels[valid], np.sign(area[valid])[:, np.newaxis]
+        x_min, y_min = x_min[valid].astype(np.int64), y_min[valid].astype(np.int64)
+        widths = x_max[valid].astype(np.int64) - x_min + 1
+        counts = widths * (y_max[valid].astype(np.int64) - y_min + 1)
+
+        # The edge functions a * x + b * y + c of all triangles, which are positive inside the triangle, relative to
+        # the upper left pixel center of their bounding box
+        end_points = np.roll(pixels, -1, axis=1)
+        edge_a = (pixels[:, :, 1] - end_points[:, :, 1]) * sign
+        edge_b = (end_points[:, :, 0] - pixels[:, :, 0]) * sign
+        edge_c = edge_a * (x_min[:, np.newaxis] - pixels[:, :, 0]) + edge_b * (y_min[:, np.newaxis] - pixels[:, :, 1])
+
+        # Split the triangles into batches, such that only a limited number of pixel candidates is kept in memory
+        ends = np.cumsum(counts)
+        start = 0
+        while start < len(counts):
+            offset = ends[start - 1] if start > 0 else 0
+            end = max(int(np.searchsorted(ends, offset + max_elements, side="right")), start + 1)
+            batch = np.arange(start, end)
+            start = end
+
+            triangle_ids = np.repeat(batch, counts[batch])
+            local_ids = np.arange(len(triangle_ids)) - np.repeat(ends[batch] - counts[batch] - offset, counts[batch])
+            local_ys, local_xs = np.divmod(local_ids, widths[triangle_ids])
+
+            inside = np.ones(len(triangle_ids), dtype=bool)
+            for i in range(3):
+                inside &= edge_a[triangle_ids, i] * local_xs + edge_b[triangle_ids, i] * local_ys + \
+                    edge_c[triangle_ids, i] >= 0
+            xs, ys = x_min[triangle_ids] + local_xs, y_min[triangle_ids] + local_ys
+            mask[ys[inside], xs[inside]] = True
+        return mask
 
     @staticmethod
-    def calc_gt_masks(pool: Pool, chunk_dirs: List[str], starting_frame_id: int = 0,
-                      annotation_scale: float = 1000., delta: float = 0.015):
-        """ Calculates the ground truth masks.
-        From the BOP toolkit (https://github.com/thodan/bop_toolkit), with the difference of using pyrender for depth
-        rendering.
+    def _pyrender_init(ren_width: int, ren_height: int, trimesh_objects: Dict[int, trimesh.Trimesh]):
+        """ Initializes a worker process for calc_gt_masks_and_info
 
-        :param pool: The pool of worker processes to use for the calculations.
-        :param chunk_dirs: List of directories to calculate the gt masks for.
-        :param starting_frame_id: The first frame id the writer has written during this run.
-        :param annotation_scale: The scale factor applied to the calculated annotations (in [m]) to get them into the
-                                 specified format (see `annotation_format` in `write_bop` for further details).
-        :param delta: Tolerance used for estimation of the visibility masks.
+        Each worker keeps one scene, which contains the camera and one node per object. The nodes are only moved and
+        made visible for rendering, so the scene is never rebuilt.
+
+        :param ren_width: The width of the images to render.
+        :param ren_height: The height of the images to render.
+        :param trimesh_objects: A dict containing trimesh meshes for each object in the scene
         """
-        # This import is done inside to avoid having the requirement that BlenderProc depends on the bop_toolkit
         # pylint: disable=import-outside-toplevel
-        from bop_toolkit_lib import inout, misc
+        # Import pyrender only inside the multiprocesses, otherwise this leads to an opengl error
+        # https://github.com/mmatl/pyrender/issues/200#issuecomment-1123713055
+        import pyrender
         # pylint: enable=import-outside-toplevel
 
-        for dir_counter, chunk_dir in enumerate(chunk_dirs):
-            last_chunk_gt_fpath = os.path.join(chunk_dir, 'scene_gt.json')
-            last_chunk_camera_fpath = os.path.join(chunk_dir, 'scene_camera.json')
-            scene_gt = _BopWriterUtility.load_json(last_chunk_gt_fpath, keys_to_int=True)
-            scene_camera = _BopWriterUtility.load_json(last_chunk_camera_fpath, keys_to_int=True)
-
-            # Create folders for the output masks (if they do not exist yet).
-            mask_dir_path = os.path.dirname(os.path.join(chunk_dir, 'mask', '000000_000000.png'))
-            misc.ensure_dir(mask_dir_path)
-
-            mask_visib_dir_path = os.path.dirname(os.path.join(chunk_dir, 'mask_visib', '000000_000000.png'))
-            misc.ensure_dir(mask_visib_dir_path)
-
-            im_ids = sorted(scene_gt.keys())
-
-            # append to existing output
-            if dir_counter == 0:
-                im_ids = im_ids[starting_frame_id:]
-
-            for im_counter, im_id in enumerate(im_ids):
-                if im_counter % 100 == 0:
-                    misc.log(f'Calculating GT masks - {chunk_dir}, {im_counter}')
+        global renderer, scene, camera_node, object_nodes
 
-                K = np.array(scene_camera[im_id]['cam_K']).reshape(3, 3)
+        # The rendered images are three times larger than the output images, such that also the truncated parts of
+        # the objects are visible for calculating the gt info
+        renderer = pyrender.OffscreenRenderer(viewport_width=ren_width * 3, viewport_height=ren_height * 3)
+        scene = pyrender.Scene()
+        # The intrinsics are set per image
+        camera_node = scene.add(pyrender.IntrinsicsCamera(fx=1, fy=1, cx=0, cy=0, znear=0.1, zfar=100000))
+        # Create pyrender meshes
+        object_nodes = {}
+        for key in trimesh_objects.keys():
+            # we need to create a double-sided material to be able to render non-watertight meshes
+            # the other parameters are defaults, see
+            # https://github.com/mmatl/pyrender/blob/master/pyrender/mesh.py#L216-L223
+            material = pyrender.MetallicRoughnessMaterial(alphaMode='BLEND', baseColorFactor=[0.3, 0.3, 0.3, 1.0],
+                                                          metallicFactor=0.2, roughnessFactor=0.8, doubleSided=True)
+            mesh = pyrender.Mesh.from_trimesh(mesh=trimesh_objects[key], material=material)
+            mesh.is_visible = False
+            object_nodes[key] = scene.add(mesh)
 
-                # Load depth image.
-                depth_path = os.path.join(
-                    chunk_dir, 'depth', '{im_id:06d}.png').format(im_id=im_id)
-                depth_im = inout.load_depth(depth_path)
-                depth_im *= scene_camera[im_id]['depth_scale']  # to [mm]
-                depth_im /= 1000.  # to [m]
-                dist_im = misc.depth_im_to_dist_im_fast(depth_im, K)
+    @staticmethod
+    def _calc_gt_masks_and_info_iteration(annotation_scale: float, delta: float, ren_cy_offset: int,
+                                          ren_cx_offset: int, chunk_dir: str,
+                                          image_data: Tuple[int, List[float], float, List[Dict[str, int]]]) \
+            -> Tuple[int, List[Dict[str, Union[int, float, List[int]]]]]:
+        """ Calculates the masks and the gt info of all objects in one image, executed inside a worker process.
 
-                pool.map(partial(_BopWriterUtility._calc_gt_masks_iteration, annotation_scale, K, delta, dist_im, chunk_dir, im_id), enumerate(scene_gt[im_id]))
-          
-            
+        Each object is rendered once into the persistent scene of the worker, the masks and the gt info are both
+        calculated from this rendering.
 
-    @staticmethod
-    def _calc_gt_info_iteration(annotation_scale: float, ren_cy_offset: int, ren_cx_offset: int, im_height: int, im_width: int, K: np.ndarray, delta: float, depth: np.ndarray, gt: Dict[str, int]):
-        """ One iteration of calc_gt_info(), executed inside a worker process.
-        
         :param annotation_scale: The scale factor applied to the calculated annotations (in [m]) to get them into the
                                  specified format (see `annotation_format` in `write_bop` for further details).
+        :param delta: Tolerance used for estimation of the visibility masks.
         :param ren_cy_offset: The y offset for cropping the rendered image.
         :param ren_cx_offset: The x offset for cropping the rendered image.
-        :param im_height: The image height for cropping the rendered image.
-        :param im_width: The image width for cropping the rendered image.
-        :param K: The camera instrinsics to use.
-        :param delta: Tolerance used for estimation of the visibility masks.
-        :param depth: The depth image of the frame.
-        :param gt: Containing id of the object whose mask the worker should render
-        """         
-        # Import pyrender only inside the multiprocesses, otherwise this leads to an opengl error
-        # https://github.com/mmatl/pyrender/issues/200#issuecomment-1123713055   
+        :param chunk_dir: The chunk dir where to store the resulting images.
+        :param image_data: The id of the image, its camera intrinsics, its depth scale and its gt poses.
+        :return: The id of the image and the gt info of all its objects.
+        """
         # pylint: disable=import-outside-toplevel
+        # Import pyrender only inside the multiprocesses, otherwise this leads to an opengl error
+        # https://github.com/mmatl/pyrender/issues/200#issuecomment-1123713055
         import pyrender
-        from bop_toolkit_lib import misc, visibility
+        # This import is done inside to avoid having the requirement that BlenderProc depends on the bop_toolkit
+        from bop_toolkit_lib import inout, misc, visibility
         # pylint: enable=import-outside-toplevel
 
-        global renderer_large, dataset_objects, renderer
-
-        # Delete renderer of the previous calc_gt_masks() function, otherwise
-        # we cannot make use of the same pyrender Meshes
-        if renderer._renderer is not None:
-            renderer._renderer.delete()
-            renderer._renderer = None
-
-        # Init pyrender camera
-        fx, fy, cx, cy = K[0, 0], K[1, 1], K[0, 2], K[1, 2]
-        im_size = (depth.shape[1], depth.shape[0])
-        camera = pyrender.IntrinsicsCamera(fx=fx, fy=fy, cx=cx+ren_cx_offset, cy=cy+ren_cy_offset, znear=0.1,
-                                            zfar=100000)
-        
-        # create a new scene
-        scene = pyrender.Scene()
-
-        # add camera and current object
-        scene.add(camera)
-        t = np.array(gt['cam_t_m2c'])
-        # rescale translation depending on initial saving format
-        t /= annotation_scale
-        pose = bop_pose_to_pyrender_coordinate_system(cam_R_m2c=np.array(gt['cam_R_m2c']).reshape(3, 3),
-                                                        cam_t_m2c=t)
-        scene.add(dataset_objects[gt['obj_id']], pose=pose)
-
-        # render the depth image
-        _, depth_gt_large = renderer_large.render(scene=scene)
-
-        depth_gt = depth_gt_large[
-                    ren_cy_offset:(ren_cy_offset + im_height),
-                    ren_cx_offset:(ren_cx_offset + im_width)]
-
-        # Convert depth images to distance images.
-        dist_gt = misc.depth_im_to_dist_im_fast(depth_gt, K)
-        dist_im = misc.depth_im_to_dist_im_fast(depth, K)
-
-        # Estimation of the visibility mask.
-        visib_gt = visibility.estimate_visib_mask_gt(
-            dist_im, dist_gt, delta, visib_mode='bop19')
-
-        # Mask of the object in the GT pose.
-        obj_mask_gt_large = depth_gt_large > 0
-        obj_mask_gt = dist_gt > 0
-
-        # Number of pixels in the whole object silhouette
-        # (even in the truncated part).
-        px_count_all = np.sum(obj_mask_gt_large)
-
-        # Number of pixels in the object silhouette with a valid depth measurement
-        # (i.e. with a non-zero value in the depth image).
-        px_count_valid = np.sum(dist_im[obj_mask_gt] > 0)
-
-        # Number of pixels in the visible part of the object silhouette.
-        px_count_visib = visib_gt.sum()
-
-        # Visible surface fraction.
-        if px_count_all > 0:
-            visib_fract = px_count_visib / float(px_count_all)
-        else:
-            visib_fract = 0.0
-
-        # Bounding box of the whole object silhouette
-        # (including the truncated part).
-        bbox = [-1, -1, -1, -1]
-        if px_count_visib > 0:
-            ys, xs = obj_mask_gt_large.nonzero()
-            ys -= ren_cy_offset
-            xs -= ren_cx_offset
-            bbox = misc.calc_2d_bbox(xs, ys, im_size)
-
-        # Bounding box of the visible surface part.
-        bbox_visib = [-1, -1, -1, -1]
-        if px_count_visib > 0:
-            ys, xs = visib_gt.nonzero()
-            bbox_visib = misc.calc_2d_bbox(xs, ys, im_size)
-
-        # Store the calculated info.
-        return {
-            'px_count_all': int(px_count_all),
-            'px_count_valid': int(px_count_valid),
-            'px_count_visib': int(px_count_visib),
-            'visib_fract': float(visib_fract),
-            'bbox_obj': [int(e) for e in bbox],
-            'bbox_visib': [int(e) for e in bbox_visib]
-        }
+        global renderer, scene, camera_node, object_nodes
+
+        im_id, cam_K, depth_scale, gts = image_data
+        K = np.array(cam_K).reshape(3, 3)
+
+        # Load depth image.
+        depth_path = os.path.join(chunk_dir, 'depth', '{im_id:06d}.png').format(im_id=im_id)
+        depth_im = inout.load_depth(depth_path)
+        depth_im *= depth_scale  # to [mm]
+        depth_im /= 1000.  # to [m]
+        dist_im = misc.depth_im_to_dist_im_fast(depth_im, K)
+        im_height, im_width = depth_im.shape
+        im_size = (im_width, im_height)
+
+        # Set the intrinsics of the camera
+        camera = camera_node.camera
+        camera.fx, camera.fy = K[0, 0], K[1, 1]
+        camera.cx, camera.cy = K[0, 2] + ren_cx_offset, K[1, 2] + ren_cy_offset
+
+        gt_infos = []
+        for gt_id, gt in enumerate(gts):
+            t = np.array(gt['cam_t_m2c'])
+            # rescale translation depending on initial saving format
+            t /= annotation_scale
+            pose = bop_pose_to_pyrender_coordinate_system(cam_R_m2c=np.array(gt['cam_R_m2c']).reshape(3, 3),
+                                                          cam_t_m2c=t)
+
+            # Only show the current object
+            object_node = object_nodes[gt['obj_id']]
+            scene.set_pose(object_node, pose=pose)
+            object_node.mesh.is_visible = True
+            depth_gt_large = renderer.render(scene=scene, flags=pyrender.RenderFlags.DEPTH_ONLY)
+            object_node.mesh.is_visible = False
+
+            depth_gt = depth_gt_large[ren_cy_offset:(ren_cy_offset + im_height),
+                                      ren_cx_offset:(ren_cx_offset + im_width)]
+
+            # Convert depth image to distance image.
+            dist_gt = misc.depth_im_to_dist_im_fast(depth_gt, K)
+
+            # Mask of the full object silhouette.
+            mask = dist_gt > 0
+
+            # Mask of the visible part of the object silhouette.
+            mask_visib = visibility.estimate_visib_mask_gt(dist_im, dist_gt, delta, visib_mode='bop19')
+
+            # Save the calculated masks.
+            mask_path = os.path.join(
+                chunk_dir, 'mask', '{im_id:06d}_{gt_id:06d}.png').format(im_id=im_id, gt_id=gt_id)
+            inout.save_im(mask_path, 255 * mask.astype(np.uint8))
+
+            mask_visib_path = os.path.join(
+                chunk_dir, 'mask_visib',
+                '{im_id:06d}_{gt_id:06d}.png').format(im_id=im_id, gt_id=gt_id)
+            inout.save_im(mask_visib_path, 255 * mask_visib.astype(np.uint8))
+
+            # Mask of the object in the GT pose.
+            obj_mask_gt_large = depth_gt_large > 0
+
+            # Number of pixels in the whole object silhouette
+            # (even in the truncated part).
+            px_count_all = np.sum(obj_mask_gt_large)
+
+            # Number of pixels in the object silhouette with a valid depth measurement
+            # (i.e. with a non-zero value in the depth image).
+            px_count_valid = np.sum(dist_im[mask] > 0)
+
+            # Number of pixels in the visible part of the object silhouette.
+            px_count_visib = mask_visib.sum()
+
+            # Visible surface fraction.
+            if px_count_all > 0:
+                visib_fract = px_count_visib / float(px_count_all)
+            else:
+                visib_fract = 0.0
+
+            # Bounding box of the whole object silhouette
+            # (including the truncated part).
+            bbox = [-1, -1, -1, -1]
+            if px_count_visib > 0:
+                ys, xs = obj_mask_gt_large.nonzero()
+                ys -= ren_cy_offset
+                xs -= ren_cx_offset
+                bbox = misc.calc_2d_bbox(xs, ys, im_size)
+
+            # Bounding box of the visible surface part.
+            bbox_visib = [-1, -1, -1, -1]
+            if px_count_visib > 0:
+                ys, xs = mask_visib.nonzero()
+                bbox_visib = misc.calc_2d_bbox(xs, ys, im_size)
+
+            # Store the calculated info.
+            gt_infos.append({
+                'px_count_all': int(px_count_all),
+                'px_count_valid': int(px_count_valid),
+                'px_count_visib': int(px_count_visib),
+                'visib_fract': float(visib_fract),
+                'bbox_obj': [int(e) for e in bbox],
+                'bbox_visib': [int(e) for e in bbox_visib]
+            })
+        return im_id, gt_infos
 
     @staticmethod
-    def calc_gt_info(pool, chunk_dirs: List[str], starting_frame_id: int = 0,
-                     annotation_scale: float = 1000., delta: float = 0.015):
-        """ Calculates the ground truth masks.
+    def calc_gt_masks_and_info(pool: Pool, chunk_dirs: List[str], starting_frame_id: int = 0,
+                               annotation_scale: float = 1000., delta: float = 0.015):
+        """ Calculates the ground truth masks and the ground truth info.
         From the BOP toolkit (https://github.com/thodan/bop_toolkit), with the difference of using pyrender for depth
         rendering.
 
-        :param chunk_dirs: List of directories to calculate the gt info for.
+        The images are distributed among the worker processes, each object is only rendered once for its masks and
+        its gt info.
+
+        :param pool: The pool of worker processes to use for the calculations, see _pyrender_init().
+        :param chunk_dirs: List of directories to calculate the gt masks and the gt info for.
         :param starting_frame_id: The first frame id the writer has written during this run.
         :param annotation_scale: The scale factor applied to the calculated annotations (in [m]) to get them into the
                                  specified format (see `annotation_format` in `write_bop` for further details).
@@ -807,6 +978,10 @@ def calc_gt_info(pool, chunk_dirs: List[str], starting_frame_id: int = 0,
             scene_gt = _BopWriterUtility.load_json(last_chunk_gt_fpath, keys_to_int=True)
             scene_camera = _BopWriterUtility.load_json(last_chunk_camera_fpath, keys_to_int=True)
 
+            # Create folders for the output masks (if they do not exist yet).
+            misc.ensure_dir(os.path.join(chunk_dir, 'mask'))
+            misc.ensure_dir(os.path.join(chunk_dir, 'mask_visib'))
+
             # load existing gt info
             if dir_counter == 0 and starting_frame_id > 0:
                 misc.log(f"Loading gt info from existing chunk dir - {chunk_dir}")
@@ -821,23 +996,21 @@ def calc_gt_info(pool, chunk_dirs: List[str], starting_frame_id: int = 0,
             if dir_counter == 0:
                 im_ids = im_ids[starting_frame_id:]
 
-            for im_counter, im_id in enumerate(im_ids):
+            image_data = [(im_id, scene_camera[im_id]['cam_K'], scene_camera[im_id]['depth_scale'], scene_gt[im_id])
+                          for im_id in im_ids]
+            start_time = time.time()
+            results = pool.imap_unordered(partial(_BopWriterUtility._calc_gt_masks_and_info_iteration,
+                                                  annotation_scale, delta, ren_cy_offset, ren_cx_offset, chunk_dir),
+                                          image_data)
+            for im_counter, (im_id, gt_infos) in enumerate(results):
                 if im_counter % 100 == 0:
-                    misc.log(f'Calculating GT info - {chunk_dir}, {im_counter}')
-
-                # Load depth image.
-                depth_fpath = os.path.join(chunk_dir, 'depth', '{im_id:06d}.png').format(im_id=im_id)
-                assert os.path.isfile(depth_fpath)
-                depth = inout.load_depth(depth_fpath)
-                depth *= scene_camera[im_id]['depth_scale']  # Convert to [mm].
-                depth /= 1000.  # to [m]
-
-                K = np.array(scene_camera[im_id]['cam_K']).reshape(3, 3)
-
-                scene_gt_info[im_id] = pool.map(partial(_BopWriterUtility._calc_gt_info_iteration, annotation_scale, ren_cy_offset, ren_cx_offset, im_height, im_width, K, delta, depth), scene_gt[im_id])
-                    
+                    misc.log(f'Calculating GT masks and info - {chunk_dir}, {im_counter}')
+                scene_gt_info[im_id] = gt_infos
+            misc.log(f'Calculated GT masks and info of {len(im_ids)} images in {time.time() - start_time:.1f}s '
+                     f'- {chunk_dir}')
 
             # Save the info for the current scene.
+            scene_gt_info = {im_id: scene_gt_info[im_id] for im_id in sorted(scene_gt_info.keys())}
             scene_gt_info_path = os.path.join(chunk_dir, 'scene_gt_info.json')
             misc.ensure_dir(os.path.dirname(scene_gt_info_path))
             inout.save_json(scene_gt_info_path, scene_gt_info)
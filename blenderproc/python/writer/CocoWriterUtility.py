@@ -1,12 +1,13 @@
 """Allows rendering the content of the scene in the coco file format."""
 
 import datetime
-from itertools import groupby
 import json
 import os
-from typing import Optional, Dict, Union, Tuple, List
+import shutil
+from typing import Any, Optional, Dict, Union, Tuple, List
 
 import numpy as np
+from scipy import ndimage
 from skimage import measure
 import cv2
 import bpy
@@ -20,7 +21,8 @@ def write_coco_annotations(output_dir: str, instance_segmaps: List[np.ndarray],
                            mask_encoding_format: str = "rle", supercategory: str = "coco_annotations",
                            append_to_existing_output: bool = True,
                            jpg_quality: int = 95, label_mapping: Optional[LabelIdMapping] = None,
-                           file_prefix: str = "", indent: Optional[Union[int, str]] = None):
+                           file_prefix: str = "", indent: Optional[Union[int, str]] = None,
+                           streaming: bool = False):
     """ Writes coco annotations in the following steps:
     1. Locate the seg images
     2. Locate the rgb maps
@@ -49,6 +51,10 @@ def write_coco_annotations(output_dir: str, instance_segmaps: List[np.ndarray],
                    only insert newlines. None (the default) selects the most compact representation.
                    Using a positive integer indent indents that many spaces per level.
                    If indent is a string (such as "\t"), that string is used to indent each level.
+    :param streaming: If true, the annotations are not merged into the coco_annotations.json file. Instead, they are
+                      stored as a new chunk in the coco_chunks directory, so appending frames does not require to
+                      load and rewrite all existing annotations. Call finalize_coco_annotations() once after the
+                      last frame has been written to assemble the coco_annotations.json file.
     """
 
     if len(colors) > 0 and len(colors[0].shape) == 4:
@@ -60,7 +66,12 @@ def write_coco_annotations(output_dir: str, instance_segmaps: List[np.ndarray],
 
     coco_annotations_path = os.path.join(output_dir, "coco_annotations.json")
     # Calculate image numbering offset, if append_to_existing_output is activated and coco data exists
-    if append_to_existing_output and os.path.exists(coco_annotations_path):
+    stream_header = None
+    if streaming:
+        stream_header = _CocoWriterUtility.load_stream_header(output_dir, append_to_existing_output)
+        image_offset = stream_header["next_image_id"]
+        existing_coco_annotations = None
+    elif append_to_existing_output and os.path.exists(coco_annotations_path):
         with open(coco_annotations_path, 'r', encoding="utf-8") as fp:
             existing_coco_annotations = json.load(fp)
         image_offset = max(image["id"] for image in existing_coco_annotations["images"]) + 1
@@ -101,11 +112,67 @@ def write_coco_annotations(output_dir: str, instance_segmaps: List[np.ndarray],
                                                                existing_coco_annotations,
                                                                label_mapping)
 
+    if stream_header is not None:
+        chunk_path = _CocoWriterUtility.append_stream_chunk(output_dir, stream_header, coco_output)
+        print("Writing coco annotations to " + chunk_path)
+        return
+
     print("Writing coco annotations to " + coco_annotations_path)
     with open(coco_annotations_path, 'w', encoding="utf-8") as fp:
         json.dump(coco_output, fp, indent=indent)
 
 
+def finalize_coco_annotations(output_dir: str, indent: Optional[Union[int, str]] = None) -> str:
+    """ Assembles the coco_annotations.json file from the chunks written by write_coco_annotations(streaming=True).
+
+    The chunks are removed afterwards, so the next streaming write starts a new sequence of chunks, which is
+    appended to the assembled file, if append_to_existing_output is set.
+
+    :param output_dir: The output directory, which was given to write_coco_annotations.
+    :param indent: The indent used for the coco_annotations.json file, see write_coco_annotations.
+    :return: The path of the coco_annotations.json file.
+    """
+    chunk_dir = os.path.join(output_dir, "coco_chunks")
+    header_path = os.path.join(chunk_dir, "header.json")
+    if not os.path.exists(header_path):
+        raise FileNotFoundError(f"There are no streamed coco annotations in {output_dir}, the header file "
+                                f"{header_path} does not exist.")
+    with open(header_path, "r", encoding="utf-8") as fp:
+        stream_header = json.load(fp)
+
+    coco_annotations_path = os.path.join(output_dir, "coco_annotations.json")
+    if stream_header["extends_existing_file"]:
+        with open(coco_annotations_path, "r", encoding="utf-8") as fp:
+            coco_output = json.load(fp)
+        for cat_dict in stream_header["categories"]:
+            if cat_dict not in coco_output["categories"]:
+                coco_output["categories"].append(cat_dict)
+    else:
+        coco_output = {
+            "info": stream_header["info"],
+            "licenses": stream_header["licenses"],
+            "categories": stream_header["categories"],
+            "images": [],
+            "annotations": []
+        }
+
+    # Only chunks listed in the header are complete
+    for chunk_index in range(stream_header["num_chunks"]):
+        with open(os.path.join(chunk_dir, f"chunk_{chunk_index:06d}.jsonl"), "r", encoding="utf-8") as fp:
+            for line in fp:
+                if line.strip():
+                    frame = json.loads(line)
+                    coco_output["images"].append(frame["image"])
+                    coco_output["annotations"].extend(frame["annotations"])
+
+    print("Writing coco annotations to " + coco_annotations_path)
+    with open(coco_annotations_path + ".tmp", 'w', encoding="utf-8") as fp:
+        json.dump(coco_output, fp, indent=indent)
+    os.replace(coco_annotations_path + ".tmp", coco_annotations_path)
+    shutil.rmtree(chunk_dir)
+    return coco_annotations_path
+
+
 def binary_mask_to_rle(binary_mask: np.ndarray) -> Dict[str, List[int]]:
     """Converts a binary mask to COCOs run-length encoding (RLE) format. Instead of outputting
     a mask image, you give a list of start pixels and how many pixels after each of those
@@ -113,13 +180,39 @@ def binary_mask_to_rle(binary_mask: np.ndarray) -> Dict[str, List[int]]:
     :param binary_mask: a 2D binary numpy array where '1's represent the object
     :return: Mask in RLE format
     """
-    rle: Dict[str, List[int]] = {'counts': [], 'size': list(binary_mask.shape)}
-    counts = rle.get('counts')
-    for i, (value, elements) in enumerate(groupby(binary_mask.ravel(order='F'))):
-        if i == 0 and value == 1:
-            counts.append(0)
-        counts.append(len(list(elements)))
-    return rle
+    pixels = binary_mask.ravel(order='F')
+    if pixels.size == 0:
+        return {'counts': [], 'size': list(binary_mask.shape)}
+    # A new run starts wherever the value changes
+    run_starts = np.flatnonzero(pixels[1:] != pixels[:-1]) + 1
+    counts = np.diff(np.concatenate(([0], run_starts, [pixels.size])))
+    # The counts always start with the number of zeros
+    if pixels[0] == 1:
+        counts = np.concatenate(([0], counts))
+    return {'counts': counts.tolist(), 'size': list(binary_mask.shape)}
+
+
+def _rle_from_flat_indices(indices: np.ndarray, image_size: Tuple[int, int]) -> Dict[str, List[int]]:
+    """ Computes COCOs run-length encoding (RLE) of a mask given by the column major flat indices of its pixels.
+
+    :param indices: The sorted column major flat indices of all pixels, which belong to the object.
+    :param image_size: The size of the mask, given as [H, W].
+    :return: Mask in RLE format
+    """
+    num_pixels = int(np.prod(image_size))
+    if len(indices) == 0:
+        return {'counts': [num_pixels], 'size': list(image_size)}
+    # Find the runs of consecutive indices
+    breaks = np.flatnonzero(np.diff(indices) != 1)
+    run_starts = np.concatenate(([indices[0]], indices[breaks + 1]))
+    run_ends = np.concatenate((indices[breaks] + 1, [indices[-1] + 1]))
+    # Alternate between the zeros before each run and the length of the run
+    counts = np.empty(2 * len(run_starts), dtype=np.int64)
+    counts[0::2] = run_starts - np.concatenate(([0], run_ends[:-1]))
+    counts[1::2] = run_ends - run_starts
+    if run_ends[-1] < num_pixels:
+        counts = np.concatenate((counts, [num_pixels - run_ends[-1]]))
+    return {'counts': counts.tolist(), 'size': list(image_size)}
 
 
 def rle_to_binary_mask(rle: Dict[str, List[int]]) -> np.ndarray:
@@ -219,20 +312,17 @@ def generate_coco_annotations(inst_segmaps, inst_attribute_maps, image_paths, su
             image_id = len(images)
             images.append(_CocoWriterUtility.create_image_info(image_id, image_path, inst_segmap.shape))
 
-            # Go through all objects visible in this image
-            instances = np.unique(inst_segmap)
-            # Remove background
-            instances = np.delete(instances, np.where(instances == 0))
-            for inst in instances:
-                if inst in instance_2_category_map:
-                    # Calc object mask
-                    binary_inst_mask = np.where(inst_segmap == inst, 1, 0)
+            # Compute the bounding boxes of all objects visible in this image in one pass, index 0 is instance 1
+            inst_segmap = inst_segmap.astype(np.int64)
+            bounding_boxes = ndimage.find_objects(inst_segmap)
+            for inst, bounding_box in enumerate(bounding_boxes, start=1):
+                if bounding_box is not None and inst in instance_2_category_map:
+                    # Calc object mask inside its bounding box
+                    cropped_inst_mask = inst_segmap[bounding_box] == inst
                     # Add coco info for object in this image
-                    annotation = _CocoWriterUtility.create_annotation_info(len(annotations) + 1,
-                                                                           image_id,
-                                                                           instance_2_category_map[inst],
-                                                                           binary_inst_mask,
-                                                                           mask_encoding_format)
+                    annotation = _CocoWriterUtility.create_annotation_info_from_crop(
+                        len(annotations) + 1, image_id, instance_2_category_map[inst], cropped_inst_mask,
+                        (bounding_box[1].start, bounding_box[0].start), inst_segmap.shape, mask_encoding_format)
                     if annotation is not None:
                         annotations.append(annotation)
 
@@ -250,6 +340,96 @@ def generate_coco_annotations(inst_segmaps, inst_attribute_maps, image_paths, su
 
         return new_coco_annotations
 
+    @staticmethod
+    def load_stream_header(output_dir: str, append_to_existing_output: bool) -> Dict[str, Any]:
+        """ Loads the header of the streamed coco annotations or creates a new one.
+
+        The header contains everything except the images and annotations, as well as the next free ids and the
+        number of written chunks.
+
+        :param output_dir: The output directory of the coco annotations.
+        :param append_to_existing_output: If false, all existing chunks are removed and a new header is created.
+        :return: The header.
+        """
+        chunk_dir = os.path.join(output_dir, "coco_chunks")
+        header_path = os.path.join(chunk_dir, "header.json")
+        if append_to_existing_output and os.path.exists(header_path):
+            with open(header_path, "r", encoding="utf-8") as fp:
+                return json.load(fp)
+
+        if os.path.exists(chunk_dir):
+            shutil.rmtree(chunk_dir)
+        os.makedirs(chunk_dir)
+
+        stream_header: Dict[str, Any] = {
+            "info": None,
+            "licenses": [],
+            "categories": [],
+            "next_image_id": 0,
+            "next_annotation_id": 1,
+            "num_chunks": 0,
+            "extends_existing_file": False
+        }
+        # The existing file is only read once here, the chunks are appended to it in finalize_coco_annotations()
+        coco_annotations_path = os.path.join(output_dir, "coco_annotations.json")
+        if append_to_existing_output and os.path.exists(coco_annotations_path):
+            with open(coco_annotations_path, 'r', encoding="utf-8") as fp:
+                existing_coco_annotations = json.load(fp)
+            stream_header["categories"] = existing_coco_annotations["categories"]
+            stream_header["next_image_id"] = max(image["id"] for image in existing_coco_annotations["images"]) + 1
+            if len(existing_coco_annotations["annotations"]) > 0:
+                stream_header["next_annotation_id"] = max(annotation["id"] for annotation
+                                                          in existing_coco_annotations["annotations"]) + 1
+            stream_header["extends_existing_file"] = True
+        return stream_header
+
+    @staticmethod
+    def append_stream_chunk(output_dir: str, stream_header: Dict[str, Any],
+                            new_coco_annotations: Dict[str, Any]) -> str:
+        """ Writes the given coco annotations as a new chunk and updates the header of the streamed annotations.
+
+        Each line of a chunk contains one image together with its annotations. The ids are adjusted in the same way
+        as in merge_coco_annotations().
+
+        :param output_dir: The output directory of the coco annotations.
+        :param stream_header: The header returned by load_stream_header(), it is updated in place.
+        :param new_coco_annotations: A dict describing the new coco annotations.
+        :return: The path of the written chunk.
+        """
+        chunk_dir = os.path.join(output_dir, "coco_chunks")
+        image_id_offset = stream_header["next_image_id"]
+        annotation_id_offset = stream_header["next_annotation_id"] - 1
+
+        annotations_per_image: Dict[int, List[Dict[str, Any]]] = {}
+        for annotation in new_coco_annotations["annotations"]:
+            annotation["id"] += annotation_id_offset
+            annotation["image_id"] += image_id_offset
+            annotations_per_image.setdefault(annotation["image_id"], []).append(annotation)
+            stream_header["next_annotation_id"] = max(stream_header["next_annotation_id"], annotation["id"] + 1)
+
+        chunk_path = os.path.join(chunk_dir, f"chunk_{stream_header['num_chunks']:06d}.jsonl")
+        with open(chunk_path, "w", encoding="utf-8") as fp:
+            for image in new_coco_annotations["images"]:
+                image["id"] += image_id_offset
+                stream_header["next_image_id"] = max(stream_header["next_image_id"], image["id"] + 1)
+                fp.write(json.dumps({"image": image, "annotations": annotations_per_image.get(image["id"], [])}))
+                fp.write("\n")
+
+        for cat_dict in new_coco_annotations["categories"]:
+            if cat_dict not in stream_header["categories"]:
+                stream_header["categories"].append(cat_dict)
+        if stream_header["info"] is None:
+            stream_header["info"] = new_coco_annotations["info"]
+            stream_header["licenses"] = new_coco_annotations["licenses"]
+        stream_header["num_chunks"] += 1
+
+        # The header is replaced atomically after the chunk is complete, so it never lists a partial chunk
+        header_path = os.path.join(chunk_dir, "header.json")
+        with open(header_path + ".tmp", "w", encoding="utf-8") as fp:
+            json.dump(stream_header, fp)
+        os.replace(header_path + ".tmp", header_path)
+        return chunk_path
+
     @staticmethod
     def merge_coco_annotations(existing_coco_annotations, new_coco_annotations):
         """ Merges the two given coco annotation dicts into one.
@@ -318,17 +498,47 @@ def create_annotation_info(annotation_id: int, image_id: int, category_id: int,
         :param mask_encoding_format: Encoding format of the mask. Type: string.
         :param tolerance: The tolerance for fitting polygons to the objects mask.
         """
+        if not np.any(binary_mask):
+            return None
+        x, y, w, h = _CocoWriterUtility.bbox_from_binary_mask(binary_mask)
+        return _CocoWriterUtility.create_annotation_info_from_crop(annotation_id, image_id, category_id,
+                                                                   binary_mask[y:y + h, x:x + w] == 1, (x, y),
+                                                                   binary_mask.shape, mask_encoding_format,
+                                                                   tolerance)
 
-        area = _CocoWriterUtility.calc_binary_mask_area(binary_mask)
+    @staticmethod
+    def create_annotation_info_from_crop(annotation_id: int, image_id: int, category_id: int,
+                                         cropped_mask: np.ndarray, offset: Tuple[int, int],
+                                         image_size: Tuple[int, int], mask_encoding_format: str,
+                                         tolerance: int = 2) -> Optional[Dict[str, Union[str, int]]]:
+        """Creates info section of coco annotation from the mask of the object inside its bounding box.
+
+        Only the cropped mask is processed, so the runtime depends on the size of the object and not on the size of
+        the image.
+
+        :param annotation_id: integer to uniquly identify the annotation
+        :param image_id: integer to uniquly identify image
+        :param category_id: Id of the category
+        :param cropped_mask: A boolean mask of the object inside its bounding box with the shape [h, w].
+        :param offset: The position of the bounding box inside the image, given as [x, y].
+        :param image_size: The size of the image, given as [H, W].
+        :param mask_encoding_format: Encoding format of the mask. Type: string.
+        :param tolerance: The tolerance for fitting polygons to the objects mask.
+        """
+        area = int(np.count_nonzero(cropped_mask))
         if area < 1:
             return None
 
-        bounding_box = _CocoWriterUtility.bbox_from_binary_mask(binary_mask)
+        rows, cols = np.nonzero(cropped_mask)
+        bounding_box = [int(offset[0] + cols.min()), int(offset[1] + rows.min()),
+                        int(cols.max() - cols.min() + 1), int(rows.max() - rows.min() + 1)]
 
         if mask_encoding_format == 'rle':
-            segmentation = binary_mask_to_rle(binary_mask)
+            # np.nonzero of the transposed mask returns the pixels in column major order
+            cols, rows = np.nonzero(cropped_mask.T)
+            segmentation = _rle_from_flat_indices((cols + offset[0]) * image_size[0] + rows + offset[1], image_size)
         elif mask_encoding_format == 'polygon':
-            segmentation = _CocoWriterUtility.binary_mask_to_polygon(binary_mask, tolerance)
+            segmentation = _CocoWriterUtility.binary_mask_to_polygon(cropped_mask.astype(np.uint8), tolerance, offset)
             if not segmentation:
                 return None
         else:
@@ -342,8 +552,8 @@ def create_annotation_info(annotation_id: int, image_id: int, category_id: int,
             "area": area,
             "bbox": bounding_box,
             "segmentation": segmentation,
-            "width": binary_mask.shape[1],
-            "height": binary_mask.shape[0],
+            "width": image_size[1],
+            "height": image_size[0],
         }
         return annotation_info
 
@@ -387,20 +597,22 @@ def close_contour(contour: np.ndarray) -> np.ndarray:
         return contour
 
     @staticmethod
-    def binary_mask_to_polygon(binary_mask: np.ndarray, tolerance: int = 0) -> List[np.ndarray]:
+    def binary_mask_to_polygon(binary_mask: np.ndarray, tolerance: int = 0,
+                               offset: Tuple[int, int] = (0, 0)) -> List[np.ndarray]:
         """Converts a binary mask to COCO polygon representation
 
          :param binary_mask: a 2D binary numpy array where '1's represent the object
          :param tolerance: Maximum distance from original points of polygon to approximated polygonal chain. If
                            tolerance is 0, the original coordinate array is returned.
+         :param offset: The position [x, y] of the given mask inside the image, if the mask is cropped.
         """
         polygons = []
         # pad mask to close contours of shapes which start and end at an edge
         padded_binary_mask = np.pad(binary_mask, pad_width=1, mode='constant', constant_values=0)
-        contours = np.array(measure.find_contours(padded_binary_mask, 0.5))
-        # Reverse padding
-        contours -= 1
+        contours = measure.find_contours(padded_binary_mask, 0.5)
         for contour in contours:
+            # Reverse padding and move the contour from the cropped mask into the image, before it is approximated
+            contour = contour - 1 + (offset[1], offset[0])
             # Make sure contour is closed
             contour = _CocoWriterUtility.close_contour(contour)
             # Approximate contour by polygon
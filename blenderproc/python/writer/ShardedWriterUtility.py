@@ -0,0 +1,186 @@
+""" Writes the frames of many scenes into a few size-capped .hdf5 shards and indexes them. """
+
+import glob
+import json
+import os
+import socket
+from typing import Any, Dict, List, Optional, Union
+
+import bpy
+import h5py
+import numpy as np
+
+from blenderproc.python.utility.Utility import Utility
+from blenderproc.python.writer.WriterUtility import _WriterUtility
+
+
+class HDF5ShardWriter:
+    """ Appends the frames of many scenes to .hdf5 shards, instead of writing one .hdf5 container per frame.
+
+    Each key is stored as one resizable dataset per shard, whose first dimension is the frame. A new shard is started
+    once the current one exceeds the maximum size or if the keys, shapes or types of a frame do not match the
+    datasets of the current shard. For each written frame, one line is appended to the index of the writer:
+
+    .. code-block:: json
+
+        {"scene_id": "scene_0", "frame_id": 0, "shard": "shard-host-1234-00000.hdf5", "offset": 17}
+
+    The shards and the index are named after the writer id, which defaults to the host name and the process id. So
+    multiple processes, e.g. the workers of `blenderproc batch`, can write into the same directory without
+    collisions, while a persistent worker continues its own shard over multiple scenes. Use load_shard_index() to
+    read the index of all writers. A frame can then be read via `file[key][offset]`, json data (e.g. object states)
+    is stored as bytes.
+    """
+
+    def __init__(self, output_dir_path: str, max_shard_size_mb: float = 1024, writer_id: Optional[str] = None,
+                 storage_options: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        :param output_dir_path: The directory in which the shards and the index are written.
+        :param max_shard_size_mb: A new shard is started once the current shard exceeds this size in megabytes.
+        :param writer_id: The id used in the file names of the shards and the index. It has to be unique among all
+                          processes writing into the same directory at the same time.
+        :param storage_options: Defines per key how the data is stored, see bproc.writer.write_hdf5. The chunk shape
+                                option is ignored, each frame is stored as its own chunk.
+        """
+        self.output_dir_path = output_dir_path
+        self.max_shard_size = max_shard_size_mb * 1024 * 1024
+        self.writer_id = writer_id if writer_id is not None else f"{socket.gethostname()}-{os.getpid()}"
+        self.storage_options = storage_options
+        self.index_path = os.path.join(output_dir_path, f"index-{self.writer_id}.jsonl")
+        os.makedirs(output_dir_path, exist_ok=True)
+
+        # Continue with the last shard of this writer, e.g. if a persistent worker runs the next scene
+        shard_pattern = f"shard-{glob.escape(self.writer_id)}-" + "[0-9]" * 5 + ".hdf5"
+        existing_shards = sorted(glob.glob(os.path.join(output_dir_path, shard_pattern)))
+        if existing_shards:
+            self._shard_index = int(existing_shards[-1][:-len(".hdf5")].rsplit("-", 1)[1])
+        else:
+            self._shard_index = 0
+
+    @property
+    def shard_path(self) -> str:
+        """ The path of the shard, to which the next frame is appended. """
+        return os.path.join(self.output_dir_path, f"shard-{self.writer_id}-{self._shard_index:05d}.hdf5")
+
+    def write(self, scene_id: str, output_data_dict: Dict[str, List[Union[np.ndarray, list, dict]]]) \
+            -> List[Dict[str, Any]]:
+        """ Appends all rendered frames of one scene to the shards and adds them to the index.
+
+        :param scene_id: The id of the scene, which is stored in the index, e.g. the name of the scene file.
+        :param output_data_dict: The container, which keeps the different images, e.g. the output of the renderer.
+        :return: The index entries of the written frames.
+        """
+        frames = _WriterUtility.prepare_hdf5_frames(self.output_dir_path, output_data_dict)
+        frame_ids = range(bpy.context.scene.frame_start, bpy.context.scene.frame_end)
+
+        index_entries = []
+        file = None
+        try:
+            for frame_id, (_, frame_data) in zip(frame_ids, frames):
+                frame_arrays = {key: self._to_array(key, data) for key, data in frame_data.items()}
+                if file is None:
+                    file = h5py.File(self.shard_path, "a")
+                if not self._is_compatible(file, frame_arrays):
+                    file.close()
+                    self._shard_index += 1
+                    file = h5py.File(self.shard_path, "a")
+
+                offset = self._append_frame(file, frame_arrays)
+                index_entries.append({"scene_id": scene_id, "frame_id": frame_id,
+                                      "shard": os.path.basename(self.shard_path), "offset": offset})
+
+                file.flush()
+                if os.path.getsize(self.shard_path) >= self.max_shard_size:
+                    file.close()
+                    file = None
+                    self._shard_index += 1
+        finally:
+            if file is not None:
+                file.close()
+
+        # The index is only extended after the frames have been written, so it never points to missing data
+        with open(self.index_path, "a", encoding="utf-8") as index_file:
+            for entry in index_entries:
+                index_file.write(json.dumps(entry) + "\n")
+        return index_entries
+
+    def _to_array(self, key: str, data: Union[np.ndarray, list, dict]) -> np.ndarray:
+        """ Converts the given data into the array, which is stored in the shard.
+
+        :param key: The key of the data.
+        :param data: The data of one frame.
+        :return: The array.
+        """
+        array = _WriterUtility.to_hdf5_array(key, data)
+        if array.dtype.char != 'S' and _WriterUtility.get_hdf5_storage_options(key, self.storage_options)["float16"] \
+                and array.dtype.kind == "f":
+            array = array.astype(np.float16)
+        return array
+
+    @staticmethod
+    def _is_compatible(file: h5py.File, frame_arrays: Dict[str, np.ndarray]) -> bool:
+        """ Checks whether the given frame can be appended to the datasets of the given shard.
+
+        :param file: The shard.
+        :param frame_arrays: The arrays of the frame.
+        :return: True, if the shard is empty or contains the same keys with the same shapes and types.
+        """
+        if "num_frames" not in file.attrs:
+            return True
+        if set(file.keys()) != set(frame_arrays.keys()):
+            return False
+        for key, array in frame_arrays.items():
+            dataset = file[key]
+            if array.dtype.char == 'S':
+                if dataset.dtype.kind != "O":
+                    return False
+            elif dataset.shape[1:] != array.shape or dataset.dtype != array.dtype:
+                return False
+        return True
+
+    def _append_frame(self, file: h5py.File, frame_arrays: Dict[str, np.ndarray]) -> int:
+        """ Appends the given frame to the datasets of the given shard.
+
+        :param file: The shard.
+        :param frame_arrays: The arrays of the frame.
+        :return: The offset of the frame inside the datasets.
+        """
+        if "num_frames" not in file.attrs:
+            for key, array in frame_arrays.items():
+                if array.dtype.char == 'S':
+                    file.create_dataset(key, shape=(0,), maxshape=(None,), dtype=h5py.special_dtype(vlen=bytes))
+                else:
+                    options = _WriterUtility.get_hdf5_storage_options(key, self.storage_options)
+                    file.create_dataset(key, shape=(0,) + array.shape, maxshape=(None,) + array.shape,
+                                        dtype=array.dtype, chunks=(1,) + array.shape,
+                                        compression=options["compression"], shuffle=options["shuffle"],
+                                        compression_opts=options["compression_level"]
+                                        if options["compression"] == "gzip" else None)
+            file.attrs["num_frames"] = 0
+            blender_proc_version = Utility.get_current_version()
+            if blender_proc_version is not None:
+                file.attrs["blender_proc_version"] = blender_proc_version
+
+        offset = int(file.attrs["num_frames"])
+        for key, array in frame_arrays.items():
+            dataset = file[key]
+            dataset.resize(offset + 1, axis=0)
+            dataset[offset] = array.tobytes() if array.dtype.char == 'S' else array
+        file.attrs["num_frames"] = offset + 1
+        return offset
+
+
+def load_shard_index(output_dir_path: str) -> List[Dict[str, Any]]:
+    """ Loads the index entries of all writers, which wrote shards into the given directory.
+
+    :param output_dir_path: The directory containing the shards and the index files.
+    :return: The index entries sorted by scene id and frame id, each containing scene_id, frame_id, shard and offset.
+    """
+    entries = []
+    for index_path in sorted(glob.glob(os.path.join(output_dir_path, "index-*.jsonl"))):
+        with open(index_path, "r", encoding="utf-8") as index_file:
+            for line in index_file:
+                if line.strip():
+                    entries.append(json.loads(line))
+    entries.sort(key=lambda entry: (str(entry["scene_id"]), entry["frame_id"]))
+    return entries
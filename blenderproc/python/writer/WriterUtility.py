@@ -2,8 +2,12 @@
 
 
 import os
-from typing import List, Dict, Union, Any, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from typing import List, Dict, Union, Any, Set, Tuple, Optional
 import json
+import zlib
 
 import csv
 import numpy as np
@@ -15,15 +19,25 @@
     segmentation_mapping
 from blenderproc.python.postprocessing.PostProcessingUtility import dist2depth, depth2dist
 from blenderproc.python.types.EntityUtility import Entity
-from blenderproc.python.utility.BlenderUtility import load_image
+from blenderproc.python.utility.BlenderUtility import load_image, load_exr_layer
+from blenderproc.python.utility.SetupUtility import SetupUtility
 from blenderproc.python.utility.Utility import resolve_path, Utility, NumpyEncoder
 from blenderproc.python.utility.MathUtility import change_coordinate_frame_of_point, \
     change_source_coordinate_frame_of_transformation_matrix, change_target_coordinate_frame_of_transformation_matrix
 from blenderproc.python.camera import CameraUtility
 
+# The storage options used by write_hdf5 for every key, for which no other options are given
+DEFAULT_HDF5_STORAGE_OPTIONS: Dict[str, Any] = {
+    "compression": "gzip",
+    "compression_level": 4,
+    "shuffle": False,
+    "chunks": None,
+    "float16": False
+}
 
 def write_hdf5(output_dir_path: str, output_data_dict: Dict[str, List[Union[np.ndarray, list, dict]]],
-               append_to_existing_output: bool = False, stereo_separate_keys: bool = False):
+               append_to_existing_output: bool = False, stereo_separate_keys: bool = False,
+               storage_options: Optional[Dict[str, Dict[str, Any]]] = None):
     """
     Saves the information provided inside of the output_data_dict into a .hdf5 container
 
@@ -37,119 +51,254 @@ def write_hdf5(output_dir_path: str, output_data_dict: Dict[str, List[Union[np.n
                                  won't be saved in one tensor [2, img_x, img_y, channels], where the img[0] is the
                                  left image and img[1] the right. They will be saved in separate keys: for example
                                  for colors in colors_0 and colors_1.
+    :param storage_options: Defines per key how the data is stored, the options given for the key "default" are
+                            used for all other keys. Each entry is a dict which can contain "compression" (None,
+                            "lzf" or "gzip"), "compression_level" (0-9, only for gzip), "shuffle" (apply the
+                            shuffle filter before the compression), "chunks" (None for automatic chunking, "image"
+                            for one chunk per array or an explicit chunk shape) and "float16" (store float arrays
+                            with half precision). Missing options are taken from DEFAULT_HDF5_STORAGE_OPTIONS, which
+                            corresponds to gzip compression with automatic chunking. For example:
+                            {"depth": {"compression": "lzf", "shuffle": True, "chunks": "image", "float16": True}}
     """
 
-    if not os.path.exists(output_dir_path):
-        os.makedirs(output_dir_path)
+    use_multiview = bpy.context.scene.render.use_multiview
+    for hdf5_path, frame_data in _WriterUtility.prepare_hdf5_frames(output_dir_path, output_data_dict,
+                                                                    append_to_existing_output):
+        print(f"Merging data into {hdf5_path}")
+        _WriterUtility.write_hdf5_frame(hdf5_path, frame_data, stereo_separate_keys, use_multiview, storage_options)
 
-    amount_of_frames = 0
-    for data_block in output_data_dict.values():
-        if isinstance(data_block, list):
-            amount_of_frames = max([amount_of_frames, len(data_block)])
 
-    # if append to existing output is turned on the existing folder is searched for the highest occurring
-    # index, which is then used as starting point for this run
-    if append_to_existing_output:
-        frame_offset = 0
-        # Look for hdf5 file with highest index
-        for path in os.listdir(output_dir_path):
-            if path.endswith(".hdf5"):
-                index = path[:-len(".hdf5")]
-                if index.isdigit():
-                    frame_offset = max(frame_offset, int(index) + 1)
-    else:
-        frame_offset = 0
+class _WriterUtility:
 
-    if amount_of_frames != bpy.context.scene.frame_end - bpy.context.scene.frame_start:
-        raise Exception("The amount of images stored in the output_data_dict does not correspond with the amount"
-                        "of images specified by frame_start to frame_end.")
+    @staticmethod
+    def prepare_hdf5_frames(output_dir_path: str, output_data_dict: Dict[str, List[Union[np.ndarray, list, dict]]],
+                            append_to_existing_output: bool = False, min_frame_offset: int = 0) \
+            -> List[Tuple[str, Dict[str, Union[np.ndarray, list, dict]]]]:
+        """ Splits the output data into the data of the single frames and determines the path of their containers.
+
+        :param output_dir_path: The folder path in which the .hdf5 containers will be generated
+        :param output_data_dict: The container, which keeps the different images, which should be saved to disc.
+        :param append_to_existing_output: If this is True, the numbering of the containers starts after the highest
+                                          index of the containers, which already exist in output_dir_path.
+        :param min_frame_offset: The minimal index of the first container, this is used to skip containers which
+                                 are not written yet.
+        :return: A list of tuples containing the path of the container and the data of the frame.
+        """
+        if not os.path.exists(output_dir_path):
+            os.makedirs(output_dir_path)
 
-    for frame in range(bpy.context.scene.frame_start, bpy.context.scene.frame_end):
-        # for each frame a new .hdf5 file is generated
-        hdf5_path = os.path.join(output_dir_path, str(frame + frame_offset) + ".hdf5")
-        with h5py.File(hdf5_path, "w") as file:
-            # Go through all the output types
-            print(f"Merging data for frame {frame} into {hdf5_path}")
+        amount_of_frames = 0
+        for data_block in output_data_dict.values():
+            if isinstance(data_block, list):
+                amount_of_frames = max([amount_of_frames, len(data_block)])
 
+        # if append to existing output is turned on the existing folder is searched for the highest occurring
+        # index, which is then used as starting point for this run
+        frame_offset = 0
+        if append_to_existing_output:
+            frame_offset = min_frame_offset
+            # Look for hdf5 file with highest index
+            for path in os.listdir(output_dir_path):
+                if path.endswith(".hdf5"):
+                    index = path[:-len(".hdf5")]
+                    if index.isdigit():
+                        frame_offset = max(frame_offset, int(index) + 1)
+
+        if amount_of_frames != bpy.context.scene.frame_end - bpy.context.scene.frame_start:
+            raise Exception("The amount of images stored in the output_data_dict does not correspond with the amount"
+                            "of images specified by frame_start to frame_end.")
+
+        frames = []
+        for frame in range(bpy.context.scene.frame_start, bpy.context.scene.frame_end):
+            # for each frame a new .hdf5 file is generated
+            hdf5_path = os.path.join(output_dir_path, str(frame + frame_offset) + ".hdf5")
             adjusted_frame = frame - bpy.context.scene.frame_start
+            frame_data = {}
             for key, data_block in output_data_dict.items():
                 if adjusted_frame < len(data_block):
                     # get the current data block for the current frame
-                    used_data_block = data_block[adjusted_frame]
-                    if stereo_separate_keys and (bpy.context.scene.render.use_multiview or
-                                                 used_data_block.shape[0] == 2):
-                        # stereo mode was activated
-                        _WriterUtility.write_to_hdf_file(file, key + "_0", data_block[adjusted_frame][0])
-                        _WriterUtility.write_to_hdf_file(file, key + "_1", data_block[adjusted_frame][1])
-                    else:
-                        _WriterUtility.write_to_hdf_file(file, key, data_block[adjusted_frame])
+                    frame_data[key] = data_block[adjusted_frame]
                 else:
                     raise Exception(f"There are more frames {adjusted_frame} then there are blocks of information "
                                     f" {len(data_block)} in the given list for key {key}.")
+            frames.append((hdf5_path, frame_data))
+        return frames
+
+    @staticmethod
+    def write_hdf5_frame(hdf5_path: str, frame_data: Dict[str, Union[np.ndarray, list, dict]],
+                         stereo_separate_keys: bool = False, use_multiview: bool = False,
+                         storage_options: Optional[Dict[str, Dict[str, Any]]] = None,
+                         compress_outside_of_h5py: bool = False) -> int:
+        """ Writes the data of one frame into a new .hdf5 container.
+
+        This function does not access the blender scene, so it can be called from background threads.
+
+        :param hdf5_path: The path of the .hdf5 container.
+        :param frame_data: The data of the frame, each key is stored as its own key in the container.
+        :param stereo_separate_keys: If this is True and the frame was rendered in stereo mode, the left and the
+                                     right image are stored in separate keys, e.g. colors_0 and colors_1.
+        :param use_multiview: Whether the frame was rendered in stereo mode.
+        :param storage_options: Defines per key how the data is stored, see write_hdf5.
+        :param compress_outside_of_h5py: If True, gzip compressed arrays are compressed via zlib outside of h5py,
+                                         which does not block other python threads during the compression.
+        :return: The size of the written container in bytes.
+        """
+        if compress_outside_of_h5py:
+            write_to_hdf_file = _WriterUtility.write_precompressed_to_hdf_file
+        else:
+            write_to_hdf_file = _WriterUtility.write_to_hdf_file
+
+        with h5py.File(hdf5_path, "w") as file:
+            # Go through all the output types
+            for key, data_block in frame_data.items():
+                options = _WriterUtility.get_hdf5_storage_options(key, storage_options)
+                if stereo_separate_keys and (use_multiview or data_block.shape[0] == 2):
+                    # stereo mode was activated
+                    write_to_hdf_file(file, key + "_0", data_block[0], **options)
+                    write_to_hdf_file(file, key + "_1", data_block[1], **options)
+                else:
+                    write_to_hdf_file(file, key, data_block, **options)
             blender_proc_version = Utility.get_current_version()
             if blender_proc_version is not None:
-                _WriterUtility.write_to_hdf_file(file, "blender_proc_version", np.string_(blender_proc_version))
+                write_to_hdf_file(file, "blender_proc_version", np.string_(blender_proc_version))
+        return os.path.getsize(hdf5_path)
 
+    @staticmethod
+    def get_hdf5_storage_options(key: str, storage_options: Optional[Dict[str, Dict[str, Any]]] = None) \
+            -> Dict[str, Any]:
+        """ Returns the complete storage options for the given key.
 
-class _WriterUtility:
+        :param key: The key of the data.
+        :param storage_options: The storage options per key, the options of "default" are used for all other keys.
+        :return: A dict containing all options of DEFAULT_HDF5_STORAGE_OPTIONS.
+        """
+        options = dict(DEFAULT_HDF5_STORAGE_OPTIONS)
+        if storage_options is not None:
+            options.update(storage_options.get(key, storage_options.get("default", {})))
+        unknown_options = set(options.keys()) - set(DEFAULT_HDF5_STORAGE_OPTIONS.keys())
+        if unknown_options:
+            raise ValueError(f"Unknown hdf5 storage options for key {key}: {unknown_options}")
+        if options["compression"] not in [None, "gzip", "lzf"]:
+            raise ValueError(f"Unknown hdf5 compression for key {key}: {options['compression']}")
+        return options
 
     @staticmethod
-    def load_registered_outputs(keys: Set[str], keys_with_alpha_channel: Set[str] = None) -> \
+    def load_registered_outputs(keys: Set[str], keys_with_alpha_channel: Set[str] = None, num_threads: int = 0) -> \
             Dict[str, Union[np.ndarray, List[np.ndarray]]]:
         """
         Loads registered outputs with specified keys
 
+        The frames of per frame outputs are decoded and trimmed by a pool of threads. The conversions which access
+        the blender scene (dist2depth, depth2dist and segmentation_mapping) are applied in the main thread, while the
+        following frames are still decoded. The order of the frames is preserved.
+
+        Outputs stored as layer of a multilayer .exr file (see enable_multilayer_exr_output) only decode their own
+        layer, the shared files are removed after all requested layers have been loaded.
+
         :param keys: set of output_key types to load
         :param keys_with_alpha_channel: A set containing all keys whose alpha channels should be loaded.
+        :param num_threads: The number of threads used to decode the frames. If 0 is given, one thread per cpu core
+                            is used. If 1 is given, all frames are loaded sequentially in the main thread.
         :return: dict of lists of raw loaded outputs. Keys are e.g. 'distance', 'colors', 'normals', 'segmap'
         """
         output_data_dict: Dict[str, Union[np.ndarray, List[np.ndarray]]] = {}
         reg_outputs = Utility.get_registered_outputs()
-        for reg_out in reg_outputs:
-            if reg_out['key'] in keys:
-                key_has_alpha_channel = keys_with_alpha_channel is not None and reg_out[
-                    'key'] in keys_with_alpha_channel
-                if '%' in reg_out['path']:
-                    # per frame outputs
-                    for frame_id in range(bpy.context.scene.frame_start, bpy.context.scene.frame_end):
-                        output_path = resolve_path(reg_out['path'] % frame_id)
-                        if os.path.exists(output_path):
-                            output_file = _WriterUtility.load_output_file(output_path, key_has_alpha_channel)
+        frame_ids = list(range(bpy.context.scene.frame_start, bpy.context.scene.frame_end))
+        if num_threads <= 0:
+            num_threads = os.cpu_count() or 1
+        num_threads = min(num_threads, len(frame_ids))
+        multilayer_outputs = [reg_out for reg_out in reg_outputs if reg_out['key'] in keys and "layer" in reg_out]
+        if multilayer_outputs:
+            # Install the package in the main thread, before the frames are loaded in parallel
+            SetupUtility.setup_pip(["OpenEXR==3.2.4"])
+
+        with ThreadPoolExecutor(max_workers=num_threads) if num_threads > 1 else nullcontext() as executor:
+            for reg_out in reg_outputs:
+                if reg_out['key'] in keys:
+                    key_has_alpha_channel = keys_with_alpha_channel is not None and reg_out[
+                        'key'] in keys_with_alpha_channel
+                    if '%' in reg_out['path']:
+                        # per frame outputs
+                        load_frame = partial(_WriterUtility.load_output_frame, reg_out,
+                                             load_alpha_channel=key_has_alpha_channel)
+                        if executor is not None:
+                            loaded_frames = executor.map(load_frame, frame_ids)
                         else:
-                            # check for stereo files
-                            output_paths = _WriterUtility.get_stereo_path_pair(output_path)
-                            # convert to a tensor of shape [2, img_x, img_y, channels]
-                            # output_file[0] is the left image and output_file[1] the right image
-                            output_file = np.array(
-                                [_WriterUtility.load_output_file(path, key_has_alpha_channel) for path in
-                                 output_paths])
-                        # For outputs like distance or depth, we automatically trim the last channel here
-                        if "trim_redundant_channels" in reg_out and reg_out["trim_redundant_channels"]:
-                            output_file = trim_redundant_channels(output_file)
-                        if "convert_to_depth" in reg_out and reg_out["convert_to_depth"]:
-                            output_file = dist2depth(output_file)
-                        if "convert_to_distance" in reg_out and reg_out["convert_to_distance"]:
-                            output_file = depth2dist(output_file)
-
-                        # semantic seg must be last
-                        if "is_semantic_segmentation" in reg_out and reg_out["is_semantic_segmentation"]\
-                                and "semantic_segmentation_mapping" in reg_out \
-                                and "semantic_segmentation_default_values" in reg_out:
-                            output_file = segmentation_mapping(output_file,
-                                                               reg_out["semantic_segmentation_mapping"],
-                                                               reg_out["semantic_segmentation_default_values"])
-                            for key, output_info in output_file.items():
-                                output_data_dict.setdefault(key, []).append(output_info)
-                        else:
-                            output_data_dict.setdefault(reg_out['key'], []).append(output_file)
-                else:
-                    # per run outputs
-                    output_path = resolve_path(reg_out['path'])
-                    output_file = _WriterUtility.load_output_file(output_path, key_has_alpha_channel)
-                    output_data_dict[reg_out['key']] = output_file
+                            loaded_frames = map(load_frame, frame_ids)
+
+                        for output_file in loaded_frames:
+                            if "convert_to_depth" in reg_out and reg_out["convert_to_depth"]:
+                                output_file = dist2depth(output_file)
+                            if "convert_to_distance" in reg_out and reg_out["convert_to_distance"]:
+                                output_file = depth2dist(output_file)
+
+                            # semantic seg must be last
+                            if "is_semantic_segmentation" in reg_out and reg_out["is_semantic_segmentation"]\
+                                    and "semantic_segmentation_mapping" in reg_out \
+                                    and "semantic_segmentation_default_values" in reg_out:
+                                output_file = segmentation_mapping(output_file,
+                                                                   reg_out["semantic_segmentation_mapping"],
+                                                                   reg_out["semantic_segmentation_default_values"])
+                                for key, output_info in output_file.items():
+                                    output_data_dict.setdefault(key, []).append(output_info)
+                            else:
+                                output_data_dict.setdefault(reg_out['key'], []).append(output_file)
+                    else:
+                        # per run outputs
+                        output_path = resolve_path(reg_out['path'])
+                        output_file = _WriterUtility.load_output_file(output_path, key_has_alpha_channel)
+                        output_data_dict[reg_out['key']] = output_file
+
+        # The multilayer files are shared by multiple outputs, so they are only removed after all have been loaded
+        multilayer_paths = {output_path for reg_out in multilayer_outputs for frame_id in frame_ids
+                            for output_path in _WriterUtility.get_frame_paths(reg_out, frame_id)}
+        for output_path in multilayer_paths:
+            if os.path.exists(output_path):
+                os.remove(output_path)
 
         return output_data_dict
 
+    @staticmethod
+    def load_output_frame(reg_out: Dict[str, Any], frame_id: int, load_alpha_channel: bool = False) \
+            -> Union[np.ndarray, List[Any]]:
+        """ Loads the output of a single frame of the given registered output and trims its redundant channels.
+
+        This function does not access the blender scene, so it can be called from multiple threads at once.
+
+        :param reg_out: The registered output, its path has to contain a placeholder for the frame id.
+        :param frame_id: The id of the frame to load.
+        :param load_alpha_channel: Whether to load the alpha channel as well.
+        :return: The loaded data, in the stereo case a tensor of shape [2, img_x, img_y, channels].
+        """
+        output_paths = _WriterUtility.get_frame_paths(reg_out, frame_id)
+        # the shared multilayer files are removed after all outputs have been loaded
+        load_kwargs = {"layer": reg_out["layer"], "remove": False} if "layer" in reg_out else {}
+        if len(output_paths) == 1:
+            output_file = _WriterUtility.load_output_file(output_paths[0], load_alpha_channel, **load_kwargs)
+        else:
+            # convert to a tensor of shape [2, img_x, img_y, channels]
+            # output_file[0] is the left image and output_file[1] the right image
+            output_file = np.array([_WriterUtility.load_output_file(path, load_alpha_channel, **load_kwargs)
+                                    for path in output_paths])
+        # For outputs like distance or depth, we automatically trim the last channel here
+        if "trim_redundant_channels" in reg_out and reg_out["trim_redundant_channels"]:
+            output_file = trim_redundant_channels(output_file)
+        return output_file
+
+    @staticmethod
+    def get_frame_paths(reg_out: Dict[str, Any], frame_id: int) -> List[str]:
+        """ Returns the path of the file written for the given frame, or the two paths if it was rendered in stereo.
+
+        :param reg_out: The registered output, its path has to contain a placeholder for the frame id.
+        :param frame_id: The id of the frame.
+        :return: A list containing the one path or the path of the left and the right image.
+        """
+        output_path = resolve_path(reg_out['path'] % frame_id)
+        if os.path.exists(output_path):
+            return [output_path]
+        # check for stereo files
+        return list(_WriterUtility.get_stereo_path_pair(output_path))
+
     @staticmethod
     def get_stereo_path_pair(file_path: str) -> Tuple[str, str]:
         """
@@ -166,12 +315,13 @@ def get_stereo_path_pair(file_path: str) -> Tuple[str, str]:
 
     @staticmethod
     def load_output_file(file_path: str, load_alpha_channel: bool = False,
-                         remove: bool = True) -> Union[np.ndarray, List[Any]]:
+                         remove: bool = True, layer: Optional[str] = None) -> Union[np.ndarray, List[Any]]:
         """ Tries to read in the file with the given path into a numpy array.
 
         :param file_path: The file path. Type: string.
         :param load_alpha_channel: Whether to load the alpha channel as well. Type: bool. Default: False
         :param remove: Whether to delete file after loading.
+        :param layer: The layer to load, if the file is a multilayer .exr file.
         :return: Loaded data from the file as numpy array if possible.
         """
         if not os.path.exists(file_path):
@@ -179,7 +329,9 @@ def load_output_file(file_path: str, load_alpha_channel: bool = False,
 
         file_ending = file_path[file_path.rfind(".") + 1:].lower()
 
-        if file_ending in ["exr", "png", "jpg"]:
+        if layer is not None:
+            output = load_exr_layer(file_path, layer, num_channels=3 + (1 if load_alpha_channel else 0))
+        elif file_ending in ["exr", "png", "jpg"]:
             # num_channels is 4 if transparent_background is true in config
             output = load_image(file_path, num_channels=3 + (1 if load_alpha_channel else 0))
         elif file_ending in ["npy", "npz"]:
@@ -341,12 +493,82 @@ def _get_shapenet_attribute(shapenet_obj: bpy.types.Object, attribute_name: str,
                                                    world_frame_change)
 
     @staticmethod
-    def write_to_hdf_file(file, key: str, data: Union[np.ndarray, list, dict], compression: str = "gzip"):
+    def write_to_hdf_file(file, key: str, data: Union[np.ndarray, list, dict], compression: Optional[str] = "gzip",
+                          compression_level: Optional[int] = None, shuffle: bool = False,
+                          chunks: Optional[Union[str, Tuple[int, ...]]] = None, float16: bool = False):
         """ Adds the given data as a new entry to the given hdf5 file.
 
         :param file: The hdf5 file handle. Type: hdf5.File
         :param key: The key at which the data should be stored in the hdf5 file.
         :param data: The data to store.
+        :param compression: The used compression filter: None, "lzf" or "gzip".
+        :param compression_level: The compression level between 0 and 9, only used for gzip.
+        :param shuffle: If True, the shuffle filter is applied before the compression, which usually improves the
+                        compression of float data.
+        :param chunks: The chunk shape, "image" for one chunk per array or None for automatic chunking.
+        :param float16: If True, float arrays are stored with half precision.
+        """
+        data = _WriterUtility.to_hdf5_array(key, data)
+
+        if data.dtype.char == 'S':
+            file.create_dataset(key, data=data, dtype=data.dtype)
+        else:
+            if float16 and data.dtype.kind == "f":
+                data = data.astype(np.float16)
+            if chunks == "image":
+                chunks = data.shape
+            file.create_dataset(key, data=data, compression=compression, shuffle=shuffle, chunks=chunks,
+                                compression_opts=compression_level if compression == "gzip" else None)
+
+    @staticmethod
+    def write_precompressed_to_hdf_file(file, key: str, data: Union[np.ndarray, list, dict],
+                                        compression: Optional[str] = "gzip", compression_level: Optional[int] = None,
+                                        shuffle: bool = False, chunks: Optional[Union[str, Tuple[int, ...]]] = None,
+                                        float16: bool = False):
+        """ Adds the given data as a new entry to the given hdf5 file, gzip compressed arrays are compressed via zlib.
+
+        In contrast to write_to_hdf_file, numeric arrays, which are gzip compressed, are compressed via zlib and
+        written as one chunk. zlib releases the GIL during the compression, while h5py keeps it, so other python
+        threads can continue meanwhile. All other data is written via write_to_hdf_file.
+
+        :param file: The hdf5 file handle. Type: hdf5.File
+        :param key: The key at which the data should be stored in the hdf5 file.
+        :param data: The data to store.
+        :param compression: The used compression filter: None, "lzf" or "gzip".
+        :param compression_level: The compression level between 0 and 9, only used for gzip.
+        :param shuffle: If True, the shuffle filter is applied before the compression.
+        :param chunks: The chunk shape, "image" for one chunk per array or None for automatic chunking.
+        :param float16: If True, float arrays are stored with half precision.
+        """
+        data = _WriterUtility.to_hdf5_array(key, data)
+        if float16 and data.dtype.kind == "f":
+            data = data.astype(np.float16)
+
+        # hdf5 chunks have to be smaller than 4GB
+        if compression != "gzip" or chunks not in [None, "image", data.shape] or data.dtype.kind not in "biuf" \
+                or data.ndim == 0 or data.size == 0 or data.nbytes >= 2 ** 32 - 1:
+            _WriterUtility.write_to_hdf_file(file, key, data, compression, compression_level, shuffle, chunks)
+            return
+
+        if compression_level is None:
+            compression_level = DEFAULT_HDF5_STORAGE_OPTIONS["compression_level"]
+        data = np.ascontiguousarray(data)
+        dataset = file.create_dataset(key, shape=data.shape, dtype=data.dtype, chunks=data.shape,
+                                      compression="gzip", compression_opts=compression_level, shuffle=shuffle)
+        chunk = data.data
+        if shuffle:
+            # The shuffle filter stores the first byte of all values, then the second byte of all values and so on
+            chunk = data.view(np.uint8).reshape(-1, data.dtype.itemsize).T.tobytes()
+        # The gzip filter of hdf5 stores zlib streams, so the compressed chunk can be written directly
+        dataset.id.write_direct_chunk((0,) * data.ndim, zlib.compress(chunk, compression_level))
+
+    @staticmethod
+    def to_hdf5_array(key: str, data: Union[np.ndarray, list, dict]) -> np.ndarray:
+        """ Converts the given data into a numpy array, which can be stored in a hdf5 file.
+
+        :param key: The key at which the data should be stored in the hdf5 file.
+        :param data: The data to store.
+        :return: The data as numpy array, dicts are serialized into json strings.
         """
         if not isinstance(data, np.ndarray) and not isinstance(data, np.bytes_):
             if isinstance(data, (list, dict)):
@@ -358,8 +580,4 @@ def write_to_hdf_file(file, key: str, data: Union[np.ndarray, list, dict], compr
             else:
                 raise Exception(
                     f"This fct. expects the data for key {key} to be a np.ndarray, list or dict not a {type(data)}!")
-
-        if data.dtype.char == 'S':
-            file.create_dataset(key, data=data, dtype=data.dtype)
-        else:
-            file.create_dataset(key, data=data, compression=compression)
+        return data
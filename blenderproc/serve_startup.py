@@ -0,0 +1,96 @@
+import blenderproc as bproc  # pylint: disable=unused-import
+""" This script runs inside of blender and executes the jobs of a job directory (`blenderproc serve`).
+
+Blender, the pip environment and the BlenderProc modules are only set up once, afterwards every job is executed
+in the same blender process. In between two jobs the scene, the compositor and the GlobalStorage are reset, such
+that each job script can call bproc.init() as usual.
+"""
+
+import argparse
+import os
+import runpy
+import shutil
+import sys
+import time
+import traceback
+from typing import Any, Dict, Optional, Tuple
+
+from blenderproc.python.utility.Initializer import _Initializer
+from blenderproc.python.utility.Utility import Utility
+from blenderproc.python.utility.WorkerUtility import WorkerUtility
+
+parser = argparse.ArgumentParser()
+parser.add_argument("job_dir", help="The directory from which the jobs are taken.")
+parser.add_argument("--idle-timeout", dest="idle_timeout", type=float, default=0,
+                    help="Stop the worker after this many seconds without a pending job. 0 means never.")
+parser.add_argument("--max-jobs", dest="max_jobs", type=int, default=0,
+                    help="Stop the worker after this many jobs. 0 means no limit.")
+parser.add_argument("--poll-interval", dest="poll_interval", type=float, default=0.5,
+                    help="Seconds to wait before checking for new jobs again.")
+args = parser.parse_args()
+
+
+def run_job(job: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+    """ Executes the script of the given job in the current blender process.
+
+    :param job: The job containing the script path and its arguments.
+    :return: The status of the job and the error message, if it failed.
+    """
+    sys.argv = [job["script"]] + job["args"]
+    try:
+        runpy.run_path(job["script"], run_name="__main__")
+    except SystemExit as e:
+        if e.code not in [None, 0]:
+            return "failed", f"The script exited with code {e.code}"
+    except Exception:  # pylint: disable=broad-except
+        return "failed", traceback.format_exc()
+    return "success", None
+
+
+def clean_temp_dir():
+    """ Removes all files written by the last job into the temporary directory. """
+    for file_name in os.listdir(Utility.get_temporary_directory()):
+        path = os.path.join(Utility.get_temporary_directory(), file_name)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            os.remove(path)
+
+
+worker_pid = os.getpid()
+WorkerUtility.prepare_job_dir(args.job_dir)
+print(f"BlenderProc worker {worker_pid} is waiting for jobs in {args.job_dir}")
+
+jobs_done = 0
+last_activity = time.time()
+while not WorkerUtility.is_stop_requested(args.job_dir):
+    claimed = WorkerUtility.claim_next_job(args.job_dir, worker_pid)
+    if claimed is None:
+        if 0 < args.idle_timeout < time.time() - last_activity:
+            print(f"No new jobs for {args.idle_timeout} seconds, stopping worker {worker_pid}")
+            break
+        time.sleep(args.poll_interval)
+        continue
+
+    current_job, running_path = claimed
+    print(f"Starting job {current_job['job_id']}: {current_job['script']} {' '.join(current_job['args'])}")
+    begin = time.time()
+    status, error = run_job(current_job)
+    duration = time.time() - begin
+    print(f"Finished job {current_job['job_id']} with status {status} after {duration:.3f} seconds")
+
+    try:
+        _Initializer.reset_for_next_job()
+        clean_temp_dir()
+    except Exception:  # pylint: disable=broad-except
+        # The state of blender is unknown, so stop this worker, the job itself is still reported
+        WorkerUtility.finish_job(args.job_dir, current_job, running_path, status, duration, error)
+        print(f"Could not reset blender after job {current_job['job_id']}:\n{traceback.format_exc()}")
+        sys.exit(1)
+
+    WorkerUtility.finish_job(args.job_dir, current_job, running_path, status, duration, error)
+    jobs_done += 1
+    last_activity = time.time()
+    if 0 < args.max_jobs <= jobs_done:
+        print(f"Worker {worker_pid} reached the maximum number of {args.max_jobs} jobs")
+        break
@@ -0,0 +1,60 @@
+import blenderproc as bproc
+import argparse
+import time
+
+import numpy as np
+
+parser = argparse.ArgumentParser()
+parser.add_argument('scene', nargs='?', default="examples/resources/scene.obj", help="Path to the scene.obj file")
+parser.add_argument('--resolutions', nargs='+', type=int, default=[64, 128, 256, 512],
+                    help="The image widths to benchmark, the height is set to 3/4 of the width")
+parser.add_argument('--render', action='store_true', help="Also measure the time of rendering the depth image")
+args = parser.parse_args()
+
+bproc.init()
+objs = bproc.loader.load_obj(args.scene)
+
+cam2world_matrix = np.array([
+    [1.0, 0.0, 0.0, 0.0],
+    [0.0, 0.2674988806247711, -0.9635581970214844, -13.741],
+    [-0.0, 0.9635581970214844, 0.2674988806247711, 4.1242],
+    [0.0, 0.0, 0.0, 1.0]
+])
+bproc.camera.add_camera_pose(cam2world_matrix)
+
+begin = time.time()
+bvh_tree = bproc.object.create_bvh_tree_multi_objects(objs)
+print(f"Building the bvh tree took {time.time() - begin:.3f}s")
+begin = time.time()
+object_bvh_tree = bproc.object.create_bvh_tree_multi_objects(objs, with_object_lookup=True)
+print(f"Building the bvh tree with object lookup took {time.time() - begin:.3f}s")
+# This also builds the embree intersector, which would otherwise be built during the first measurement
+if object_bvh_tree.uses_embree():
+    print("Embree is available, the bvh tree with object lookup casts all rays at once")
+else:
+    print("Embree is not available (blenderproc pip install embreex), all rays are cast one by one")
+if args.render:
+    bproc.renderer.enable_depth_output(activate_antialiasing=False)
+
+for width in args.resolutions:
+    height = width * 3 // 4
+    bproc.camera.set_resolution(width, height)
+
+    begin = time.time()
+    depth = bproc.camera.depth_via_raytracing(bvh_tree)
+    bvh_duration = time.time() - begin
+
+    begin = time.time()
+    depth_object_bvh = bproc.camera.depth_via_raytracing(object_bvh_tree)
+    object_bvh_duration = time.time() - begin
+
+    finite = np.isfinite(depth) & np.isfinite(depth_object_bvh)
+    max_diff = np.abs(depth[finite] - depth_object_bvh[finite]).max() if finite.any() else 0.0
+    line = f"{width}x{height} ({width * height} rays): bvh {bvh_duration:.3f}s, " \
+           f"bvh with object lookup {object_bvh_duration:.3f}s, max depth difference {max_diff:.2e}"
+
+    if args.render:
+        begin = time.time()
+        bproc.renderer.render()
+        line += f", render {time.time() - begin:.3f}s"
+    print(line)
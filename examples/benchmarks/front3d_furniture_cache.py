@@ -0,0 +1,56 @@
+import blenderproc as bproc
+import argparse
+import glob
+import os
+import tempfile
+import time
+
+import numpy as np
+
+parser = argparse.ArgumentParser()
+parser.add_argument("front", help="Path to a 3D front file or a glob pattern matching multiple files")
+parser.add_argument("future_folder", help="Path to the 3D Future Model folder.")
+parser.add_argument("front_3D_texture_path", help="Path to the 3D FRONT texture folder.")
+parser.add_argument("--furniture_cache_dir", default=None,
+                    help="The folder used as furniture cache, per default a new temporary folder is used.")
+parser.add_argument("--lamp_light_strength", type=float, default=5, help="Strength of the lamp light")
+parser.add_argument("--ceiling_light_strength", type=float, default=0.5, help="Strength of the ceiling light")
+args = parser.parse_args()
+
+bproc.init()
+mapping_file = bproc.utility.resolve_resource(os.path.join("front_3D", "3D_front_mapping.csv"))
+mapping = bproc.utility.LabelIdMapping.from_csv(mapping_file)
+
+houses = sorted(glob.glob(args.front))
+if not houses:
+    raise Exception(f"No 3D front file matches: {args.front}")
+cache_dir = args.furniture_cache_dir if args.furniture_cache_dir is not None else tempfile.mkdtemp()
+
+
+def load_house(house: str, furniture_cache_dir: str) -> float:
+    """ Loads the given house and returns the time it took in seconds. """
+    bproc.clean_up()
+    begin = time.time()
+    bproc.loader.load_front3d(
+        json_path=house,
+        future_model_path=args.future_folder,
+        front_3D_texture_path=args.front_3D_texture_path,
+        label_mapping=mapping,
+        ceiling_light_strength=args.ceiling_light_strength,
+        lamp_light_strength=args.lamp_light_strength,
+        furniture_cache_dir=furniture_cache_dir
+    )
+    return time.time() - begin
+
+
+timings = {"no cache": [], "cold cache": [], "warm cache": []}
+for house in houses:
+    timings["no cache"].append(load_house(house, None))
+    # The first load with the cache converts all furniture models, which have not been used before
+    timings["cold cache"].append(load_house(house, cache_dir))
+    timings["warm cache"].append(load_house(house, cache_dir))
+    print(f"{os.path.basename(house)}: " + ", ".join(f"{name}: {values[-1]:.3f}s" for name, values in timings.items()))
+
+print(f"Loaded {len(houses)} houses, furniture cache: {cache_dir}")
+for name, values in timings.items():
+    print(f"{name:>10}: mean {np.mean(values):.3f}s, median {np.median(values):.3f}s per house")
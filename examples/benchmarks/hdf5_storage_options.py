@@ -0,0 +1,59 @@
+import blenderproc as bproc
+import argparse
+import os
+import tempfile
+import time
+
+import h5py
+import numpy as np
+
+from blenderproc.python.writer.WriterUtility import _WriterUtility
+
+parser = argparse.ArgumentParser()
+parser.add_argument('hdf5_files', nargs='+', help="Paths to .hdf5 containers, e.g. written by the front_3d example")
+parser.add_argument('--keys', nargs='+', default=["colors", "depth", "normals"], help="The keys to benchmark")
+parser.add_argument('--repetitions', type=int, default=3, help="How often each file is written and read")
+args = parser.parse_args()
+
+policies = {
+    "gzip (default)": {},
+    "none": {"compression": None},
+    "gzip 1, shuffle, image chunks": {"compression_level": 1, "shuffle": True, "chunks": "image"},
+    "lzf, image chunks": {"compression": "lzf", "chunks": "image"},
+    "lzf, shuffle, image chunks": {"compression": "lzf", "shuffle": True, "chunks": "image"},
+    "lzf, shuffle, image chunks, float16": {"compression": "lzf", "shuffle": True, "chunks": "image",
+                                            "float16": True},
+}
+
+# Load the data of all given containers
+data = {key: [] for key in args.keys}
+for path in args.hdf5_files:
+    with h5py.File(path, "r") as file:
+        for key in args.keys:
+            if key in file:
+                data[key].append(np.array(file[key]))
+
+print(f"{'key':<10} {'storage options':<38} {'write [ms]':>10} {'read [ms]':>10} {'size [KB]':>10}")
+with tempfile.TemporaryDirectory() as temp_dir:
+    temp_path = os.path.join(temp_dir, "benchmark.hdf5")
+    for key, arrays in data.items():
+        if not arrays:
+            continue
+        for name, policy in policies.items():
+            options = _WriterUtility.get_hdf5_storage_options(key, {key: policy})
+            write_time, read_time, size = 0.0, 0.0, 0
+            for _ in range(args.repetitions):
+                for array in arrays:
+                    begin = time.time()
+                    with h5py.File(temp_path, "w") as file:
+                        _WriterUtility.write_to_hdf_file(file, key, array, **options)
+                    write_time += time.time() - begin
+                    size += os.path.getsize(temp_path)
+
+                    begin = time.time()
+                    with h5py.File(temp_path, "r") as file:
+                        np.array(file[key])
+                    read_time += time.time() - begin
+            num_writes = args.repetitions * len(arrays)
+            print(f"{key:<10} {name:<38} {write_time / num_writes * 1000:>10.2f} "
+                  f"{read_time / num_writes * 1000:>10.2f} {size / num_writes / 1024:>10.1f}")
@@ -0,0 +1,73 @@
+import blenderproc as bproc
+import argparse
+import time
+
+import bpy
+import cv2
+import numpy as np
+from scipy.ndimage import map_coordinates
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--frames', type=int, default=25, help="The number of frames to distort")
+parser.add_argument('--repetitions', type=int, default=3, help="How often each variant is timed")
+args = parser.parse_args()
+
+bproc.init()
+
+# Use the same camera as the lens_distortion example
+orig_res_x, orig_res_y = 640, 480
+cam_K = np.array([[349.554, 0.0, 336.84], [0.0, 349.554, 189.185], [0.0, 0.0, 1.0]])
+bproc.camera.set_intrinsics_from_K_matrix(cam_K, orig_res_x, orig_res_y, bpy.context.scene.camera.data.clip_start,
+                                          bpy.context.scene.camera.data.clip_end)
+mapping_coords = bproc.camera.set_lens_distortion(-0.172992, 0.0248708, 0.00149384, 0.000311976, -9.62967e-5)
+res_x, res_y = bpy.context.scene.render.resolution_x, bpy.context.scene.render.resolution_y
+
+
+def map_coordinates_distortion(image: np.ndarray, use_interpolation: bool) -> np.ndarray:
+    """ The previous approach: one scipy spline interpolation per frame and channel. """
+    data = image.astype(np.float64).reshape(image.shape[0], image.shape[1], -1)
+    distorted = np.stack([map_coordinates(data[:, :, i], mapping_coords, order=2 if use_interpolation else 0,
+                                          mode='nearest').reshape(orig_res_y, orig_res_x)
+                          for i in range(data.shape[2])], axis=2)
+    if image.dtype == np.uint8:
+        distorted = np.clip(distorted, 0, 255)
+    distorted = distorted.astype(image.dtype)
+    return distorted[:, :, 0] if image.ndim == 2 else distorted
+
+
+# The float maps of cv2.remap, which are converted once, as a per frame baseline without any overhead
+map_x = mapping_coords[1].reshape(orig_res_y, orig_res_x).astype(np.float32)
+map_y = mapping_coords[0].reshape(orig_res_y, orig_res_x).astype(np.float32)
+
+
+def remap_distortion(image: np.ndarray, use_interpolation: bool) -> np.ndarray:
+    """ One plain cv2.remap call per frame. """
+    return cv2.remap(image, map_x, map_y, cv2.INTER_CUBIC if use_interpolation else cv2.INTER_NEAREST,
+                     borderMode=cv2.BORDER_REPLICATE)
+
+
+# Random images with the increased resolution set by set_lens_distortion()
+colors = [np.random.randint(0, 256, (res_y, res_x, 3)).astype(np.uint8) for _ in range(args.frames)]
+depths = [np.random.uniform(1, 10, (res_y, res_x)).astype(np.float32) for _ in range(args.frames)]
+
+for name, images in [("colors", colors), ("depth", depths)]:
+    for use_interpolation in [True, False]:
+        remap_durations, baseline_durations, reference_durations = [], [], []
+        for _ in range(args.repetitions):
+            begin = time.time()
+            result = bproc.postprocessing.apply_lens_distortion(images, mapping_coords, orig_res_x, orig_res_y,
+                                                                use_interpolation=use_interpolation)
+            remap_durations.append(time.time() - begin)
+
+            begin = time.time()
+            baseline = [remap_distortion(image, use_interpolation) for image in images]
+            baseline_durations.append(time.time() - begin)
+
+            begin = time.time()
+            reference = [map_coordinates_distortion(image, use_interpolation) for image in images]
+            reference_durations.append(time.time() - begin)
+
+        difference = np.mean([np.abs(a.astype(np.float64) - b).mean() for a, b in zip(result, reference)])
+        print(f"{name}, {args.frames} frames {res_x}x{res_y}, interpolation={use_interpolation}: "
+              f"apply_lens_distortion {min(remap_durations):.3f}s, cv2.remap per frame {min(baseline_durations):.3f}s, "
+              f"map_coordinates {min(reference_durations):.3f}s, mean abs difference {difference:.4f}")
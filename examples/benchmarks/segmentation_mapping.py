@@ -0,0 +1,54 @@
+import blenderproc as bproc
+import argparse
+import time
+
+import numpy as np
+
+from blenderproc.python.postprocessing.PostProcessingUtility import segmentation_mapping
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--instances', nargs='+', type=int, default=[10, 100, 500, 2000],
+                    help="The numbers of object instances to benchmark")
+parser.add_argument('--megapixels', nargs='+', type=float, default=[1, 2, 4],
+                    help="The image sizes in megapixels to benchmark")
+args = parser.parse_args()
+
+bproc.init()
+
+
+def masked_mapping(instance_image: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """ The previous approach: one boolean mask over the whole image per object. """
+    resulting_map = np.zeros(instance_image.shape, dtype=np.float64)
+    for object_id in np.unique(instance_image):
+        resulting_map[instance_image == object_id] = values[object_id]
+    return resulting_map
+
+
+for num_instances in args.instances:
+    bproc.clean_up()
+    # Create the objects and give each of them a pass index and a category id
+    category_ids = np.zeros(num_instances + 1, dtype=np.int64)
+    for i in range(num_instances):
+        obj = bproc.object.create_primitive("CUBE")
+        obj.blender_obj.pass_index = i + 1
+        obj.set_cp("category_id", i % 40 + 1)
+        category_ids[i + 1] = i % 40 + 1
+
+    for megapixels in args.megapixels:
+        width = int(np.sqrt(megapixels * 1e6 * 4 / 3))
+        height = width * 3 // 4
+        # Each object covers a random block of pixels, the background has id zero
+        blocks = np.random.randint(0, num_instances + 1, (height // 8 + 1, width // 8 + 1))
+        instance_image = np.kron(blocks, np.ones((8, 8), dtype=np.int64))[:height, :width]
+
+        begin = time.time()
+        result = segmentation_mapping(instance_image, ["instance", "class"], default_values={"category_id": 0})
+        lookup_duration = time.time() - begin
+
+        begin = time.time()
+        reference = masked_mapping(instance_image, category_ids)
+        masked_duration = time.time() - begin
+
+        assert np.array_equal(result["class_segmaps"], reference)
+        print(f"{num_instances} instances, {width}x{height}: segmentation_mapping {lookup_duration:.3f}s, "
+              f"per object masks {masked_duration:.3f}s")
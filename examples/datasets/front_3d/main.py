@@ -34,7 +34,8 @@
 point_sampler = bproc.sampler.Front3DPointInRoomSampler(loaded_objects)
 
 # Init bvh tree containing all mesh objects
-bvh_tree = bproc.object.create_bvh_tree_multi_objects([o for o in loaded_objects if isinstance(o, bproc.types.MeshObject)])
+bvh_tree = bproc.object.create_bvh_tree_multi_objects([o for o in loaded_objects if isinstance(o, bproc.types.MeshObject)],
+                                                      with_object_lookup=True)
 
 poses = 0
 tries = 0
@@ -51,21 +52,25 @@ def check_name(name):
 special_objects = [obj.get_cp("category_id") for obj in loaded_objects if check_name(obj.get_name())]
 
 proximity_checks = {"min": 1.0, "avg": {"min": 2.5, "max": 3.5}, "no_background": True}
+batch_size = 100
 while tries < 10000 and poses < 10:
-    # Sample point inside house
-    height = np.random.uniform(1.4, 1.8)
-    location = point_sampler.sample(height)
-    # Sample rotation (fix around X and Y axis)
-    rotation = np.random.uniform([1.2217, 0, 0], [1.338, 0, np.pi * 2])
-    cam2world_matrix = bproc.math.build_transformation_mat(location, rotation)
+    # Sample a batch of points inside house
+    heights = np.random.uniform(1.4, 1.8, batch_size)
+    locations = point_sampler.sample_batch(batch_size, heights)
+    # Sample rotations (fix around X and Y axis)
+    rotations = np.random.uniform([1.2217, 0, 0], [1.338, 0, np.pi * 2], (batch_size, 3))
+    cam2world_matrices = [bproc.math.build_transformation_mat(location, rotation)
+                          for location, rotation in zip(locations, rotations)]
 
     # Check that obstacles are at least 1 meter away from the camera and have an average distance between 2.5 and 3.5
     # meters and make sure that no background is visible, finally make sure the view is interesting enough
-    if bproc.camera.scene_coverage_score(cam2world_matrix, special_objects, special_objects_weight=10.0) > 0.8 \
-            and bproc.camera.perform_obstacle_in_view_check(cam2world_matrix, proximity_checks, bvh_tree):
-        bproc.camera.add_camera_pose(cam2world_matrix)
-        poses += 1
-    tries += 1
+    scores = bproc.camera.score_camera_poses_batch(cam2world_matrices, proximity_checks, bvh_tree,
+                                                   special_objects, special_objects_weight=10.0)
+    for i, cam2world_matrix in enumerate(cam2world_matrices):
+        if poses < 10 and scores["coverage_score"][i] > 0.8 and scores["proximity_check"][i]:
+            bproc.camera.add_camera_pose(cam2world_matrix)
+            poses += 1
+    tries += batch_size
 
 # Also render normals
 bproc.renderer.enable_normals_output()
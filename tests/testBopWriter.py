@@ -0,0 +1,51 @@
+import blenderproc as bproc
+
+import unittest
+
+import numpy as np
+from scipy.spatial import ConvexHull
+
+from blenderproc.python.writer.BopWriterUtility import _BopWriterUtility
+
+
+def create_convex_mesh(rng: np.random.Generator, center: np.ndarray, radius: float) -> np.ndarray:
+    """ Creates the triangles of a random closed convex mesh, whose faces are oriented outwards. """
+    vertices = center + rng.normal(size=(30, 3)) * radius
+    triangles = vertices[ConvexHull(vertices).simplices]
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    inwards = np.einsum("ij,ij->i", normals, triangles[:, 0] - vertices.mean(axis=0)) < 0
+    triangles[inwards] = triangles[inwards][:, ::-1]
+    return triangles
+
+
+class UnitTestCheckBopWriter(unittest.TestCase):
+
+    def test_project_silhouette_near_plane(self):
+        """ Test if skipping the back faces of closed meshes does not change their silhouette, also if the meshes
+        cross the near plane.
+        """
+        rng = np.random.default_rng(0)
+        K = np.array([[500, 0, 160], [0, 500, 120], [0, 0, 1]], dtype=np.float64)
+        for _ in range(100):
+            center = np.array([rng.uniform(-0.05, 0.05), rng.uniform(-0.05, 0.05), rng.uniform(0.05, 0.3)])
+            triangles = create_convex_mesh(rng, center, rng.uniform(0.02, 0.1))
+            closed_mask = _BopWriterUtility.project_silhouette(triangles, np.eye(3), np.zeros(3), K, (240, 320),
+                                                               is_closed=True)
+            open_mask = _BopWriterUtility.project_silhouette(triangles, np.eye(3), np.zeros(3), K, (240, 320),
+                                                             is_closed=False)
+            np.testing.assert_array_equal(closed_mask, open_mask)
+
+    def test_project_silhouette_clipped_triangle(self):
+        """ Test if triangles crossing the near plane are clipped instead of skipped.
+        """
+        K = np.array([[500, 0, 160], [0, 500, 120], [0, 0, 1]], dtype=np.float64)
+        a, b, c = np.array([-0.1013, -0.0987, 0.05]), np.array([0.1021, -0.0979, 1.0]), np.array([0.0037, 0.1009, 1.0])
+        mask = _BopWriterUtility.project_silhouette(np.array([[a, b, c]]), np.eye(3), np.zeros(3), K, (240, 320))
+
+        # The part in front of the near plane at 0.1 is a quad
+        ab = a + (b - a) * (0.1 - a[2]) / (b[2] - a[2])
+        ac = a + (c - a) * (0.1 - a[2]) / (c[2] - a[2])
+        expected_mask = _BopWriterUtility.project_silhouette(np.array([[ab, b, c], [ab, c, ac]]), np.eye(3),
+                                                             np.zeros(3), K, (240, 320))
+        self.assertGreater(np.count_nonzero(expected_mask), 0)
+        np.testing.assert_array_equal(mask, expected_mask)
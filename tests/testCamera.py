@@ -47,3 +47,41 @@ def test_camera_rotation_from_forward_vec(self):
         for x, y in zip(np.reshape(correct_roation_matrix, -1).tolist(), np.reshape(calc_rotation_matrix, -1).tolist()):
             self.assertAlmostEqual(x, y, places=6)
 
+
+    def test_score_camera_poses_batch(self):
+        """ Tests if the batched pose scoring leads to the same results as the single pose functions.
+        """
+        bproc.clean_up(True)
+        objs = bproc.loader.load_obj(os.path.join(resource_folder, "scene.obj"))
+        for i, obj in enumerate(objs):
+            obj.set_cp("category_id", i % 3 + 1)
+        bvh_tree = bproc.object.create_bvh_tree_multi_objects(objs)
+
+        cam2world_matrices = []
+        for location in [[0, -13.741, 4.1242], [5, -10, 3], [0, -30, 10]]:
+            rotation_matrix = bproc.camera.rotation_from_forward_vec(-np.array(location))
+            cam2world_matrices.append(bproc.math.build_transformation_mat(location, rotation_matrix))
+
+        proximity_checks = {"min": 1.0, "avg": {"min": 2.0, "max": 20.0}}
+        result = bproc.camera.score_camera_poses_batch(cam2world_matrices, proximity_checks, bvh_tree,
+                                                       special_objects=[2])
+        for i, cam2world_matrix in enumerate(cam2world_matrices):
+            self.assertAlmostEqual(result["coverage_score"][i],
+                                   bproc.camera.scene_coverage_score(cam2world_matrix, [2]), places=6)
+            self.assertEqual(result["proximity_check"][i],
+                             bproc.camera.perform_obstacle_in_view_check(cam2world_matrix, proximity_checks, bvh_tree))
+            visible = bproc.camera.visible_objects(cam2world_matrix, special_objects=[2])
+            self.assertEqual({obj.get_name() for obj in result["visible_objects"][i]},
+                             {obj.get_name() for obj in visible})
+
+        # Casting the rays into a bvh tree with object lookup has to give the same results as the scene ray cast
+        object_bvh_tree = bproc.object.create_bvh_tree_multi_objects(objs, with_object_lookup=True)
+        result_bvh = bproc.camera.score_camera_poses_batch(cam2world_matrices, proximity_checks, object_bvh_tree,
+                                                           special_objects=[2])
+        np.testing.assert_almost_equal(result["coverage_score"], result_bvh["coverage_score"], decimal=6)
+        np.testing.assert_almost_equal(result["avg_dist"], result_bvh["avg_dist"], decimal=4)
+        self.assertEqual(result["proximity_check"].tolist(), result_bvh["proximity_check"].tolist())
+        for i, cam2world_matrix in enumerate(cam2world_matrices):
+            self.assertAlmostEqual(result["coverage_score"][i],
+                                   bproc.camera.scene_coverage_score(cam2world_matrix, [2], bvh_tree=object_bvh_tree),
+                                   places=6)
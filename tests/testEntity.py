@@ -90,6 +90,24 @@ def test_duplicate_linked(self):
         duplicate_light = light.duplicate(linked=True)
         self.assertEqual(light.blender_obj.data, duplicate_light.blender_obj.data)
 
+    def test_duplicate_linked_custom_properties(self):
+        """ Tests that linked duplicates share their mesh, but keep their own custom properties and pass index.
+        """
+        bproc.clean_up(True)
+
+        chair = bproc.object.create_primitive("CUBE")
+        chair.set_cp("category_id", 3)
+        duplicate_chair = chair.duplicate(linked=True)
+        duplicate_chair.set_cp("room_id", 1)
+        duplicate_chair.set_cp("category_id", 4)
+        duplicate_chair.blender_obj.pass_index = 2
+
+        self.assertEqual(chair.get_mesh(), duplicate_chair.get_mesh())
+        self.assertEqual(chair.get_cp("category_id"), 3)
+        self.assertEqual(duplicate_chair.get_cp("category_id"), 4)
+        self.assertFalse(chair.has_cp("room_id"))
+        self.assertNotEqual(chair.blender_obj.pass_index, duplicate_chair.blender_obj.pass_index)
+
     def test_duplicate_hierarchy(self):
         bproc.clean_up(True)
 
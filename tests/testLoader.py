@@ -5,7 +5,9 @@
 from pathlib import Path
 
 import bpy
+import numpy as np
 
+from blenderproc.python.loader.Front3DLoader import _Front3DLoader
 from blenderproc.python.tests.TestsPathManager import test_path_manager
 
 
@@ -69,3 +71,48 @@ def perform_material_checks(used_material: bproc.types.Material, used_path: Path
         texture = bpy.data.images.load(str(texture_path), check_existing=True)
         material = bproc.material.create_material_from_texture(texture, material_name="new_mat")
         perform_material_checks(material, texture_path)
+
+    def test_front3d_move_and_duplicate_furniture(self):
+        """ Tests if furniture used multiple times in a 3D-FRONT house is duplicated and placed in its rooms.
+        """
+        def child(instance_id: str, ref: str, pos: list, scale: float = 1) -> dict:
+            return {"instanceid": instance_id, "ref": ref, "pos": pos, "scale": [scale] * 3, "rot": [1, 0, 0, 0]}
+
+        house = {"scene": {"room": [
+            {"children": [child("furniture/0", "chair", [1, 2, 3]), child("furniture/1", "table", [0, 0, 0], 2),
+                          child("mesh/0", "chair", [9, 9, 9]), child("furniture/2", "not_loaded", [0, 0, 0])]},
+            {"children": [child("furniture/3", "chair", [4, 5, 6])]}
+        ]}}
+
+        for linked_duplicates in [False, True]:
+            bproc.clean_up(True)
+            furniture = []
+            for uid, category_id in [("chair", 3), ("table", 5)]:
+                obj = bproc.object.create_primitive("CUBE")
+                obj.set_cp("uid", uid)
+                obj.set_cp("category_id", category_id)
+                obj.set_cp("is_used", False)
+                furniture.append(obj)
+
+            objs = _Front3DLoader.move_and_duplicate_furniture(house, furniture, linked_duplicates)
+
+            self.assertEqual(len(objs), 3)
+            chairs = [obj for obj in objs if obj.get_cp("uid") == "chair"]
+            tables = [obj for obj in objs if obj.get_cp("uid") == "table"]
+            self.assertEqual(len(chairs), 2)
+            self.assertEqual(tables, [furniture[1]])
+            # The first usage places the loaded object itself, the second one a duplicate
+            self.assertEqual(chairs[0], furniture[0])
+            self.assertNotEqual(chairs[1], furniture[0])
+
+            # The y and z coordinates are swapped to bring them into the blender coordinate system
+            np.testing.assert_almost_equal(chairs[0].get_location(), [1, 3, 2])
+            np.testing.assert_almost_equal(chairs[1].get_location(), [4, 6, 5])
+            np.testing.assert_almost_equal(tables[0].get_scale(), [2, 2, 2])
+            np.testing.assert_almost_equal(chairs[1].get_rotation_euler(), [-np.pi / 2, 0, 0], decimal=5)
+            self.assertEqual([chair.get_cp("room_id") for chair in chairs], [0, 1])
+            self.assertEqual(chairs[1].get_cp("category_id"), 3)
+            self.assertEqual(chairs[1].get_cp("coarse_grained_class"), 3)
+
+            # Only linked duplicates share their mesh
+            self.assertEqual(chairs[0].get_mesh() == chairs[1].get_mesh(), linked_duplicates)
@@ -0,0 +1,79 @@
+import blenderproc as bproc
+
+import unittest
+
+import numpy as np
+
+from blenderproc.python.postprocessing.PostProcessingUtility import _PostProcessingUtility
+
+
+def remove_segmap_noise_reference(image: np.ndarray) -> np.ndarray:
+    """ The previous, pixel by pixel implementation of remove_segmap_noise(). """
+    scaled_image = ((image * 37) / 65536).astype(np.int32)
+    values, counts = np.unique(scaled_image.flatten(), return_counts=True)
+    noise_indices = np.argwhere(np.isin(scaled_image, values[counts <= 100]))
+
+    for index in noise_indices:
+        neighbors = _PostProcessingUtility.get_pixel_neighbors(image, index[0], index[1])
+        curr_val = image[index[0]][index[1]][0]
+        neighbor_vals = np.unique(np.array([image[neighbor[0]][neighbor[1]] for neighbor in neighbors]))
+
+        min_val = 10000000000
+        min_idx = 0
+        for idx, n in enumerate(neighbor_vals):
+            if n - curr_val <= min_val:
+                min_val = n - curr_val
+                min_idx = idx
+
+        new_val = neighbor_vals[min_idx]
+        image[index[0]][index[1]] = np.array([new_val, new_val, new_val])
+    return image
+
+
+def create_noisy_segmap(rng: np.random.Generator, height: int, width: int) -> np.ndarray:
+    """ Creates a segmap of square objects, whose borders are covered by interpolated values. """
+    labels = rng.integers(0, 5, (height // 8 + 1, width // 8 + 1))
+    segmap = np.kron(labels, np.ones((8, 8)))[:height, :width] * 2e6
+    border = np.zeros((height, width), dtype=bool)
+    border[:, 1:] |= segmap[:, 1:] != segmap[:, :-1]
+    border[1:] |= segmap[1:] != segmap[:-1]
+    border |= rng.random((height, width)) < 0.02
+    segmap[border] = rng.uniform(0, 1e7, np.count_nonzero(border))
+    return np.repeat(segmap[..., np.newaxis], 3, axis=2).astype(np.float32)
+
+
+class UnitTestCheckPostProcessing(unittest.TestCase):
+
+    def test_remove_segmap_noise(self):
+        """ Test if the vectorized remove_segmap_noise() returns the same segmaps as the pixel by pixel version.
+        """
+        rng = np.random.default_rng(0)
+        for _ in range(10):
+            segmap = create_noisy_segmap(rng, *rng.integers(3, 80, 2))
+            denoised_segmap = bproc.postprocessing.remove_segmap_noise(segmap.copy())
+            np.testing.assert_array_equal(denoised_segmap, remove_segmap_noise_reference(segmap.copy()))
+
+    def test_remove_segmap_noise_batch(self):
+        """ Test if a batch of segmaps is denoised in the same way as every single segmap.
+        """
+        rng = np.random.default_rng(1)
+        segmaps = [create_noisy_segmap(rng, 40, 60) for _ in range(4)]
+        denoised_segmaps = bproc.postprocessing.remove_segmap_noise(np.stack(segmaps))
+        self.assertEqual(len(denoised_segmaps), len(segmaps))
+        for denoised_segmap, segmap in zip(denoised_segmaps, segmaps):
+            np.testing.assert_array_equal(denoised_segmap, remove_segmap_noise_reference(segmap.copy()))
+
+    def test_dist2depth_stacked(self):
+        """ Test if a stack of distance images is converted like every single image and back again.
+        """
+        bproc.camera.set_intrinsics_from_K_matrix(np.array([[500, 0, 320.3], [0, 500, 240.7], [0, 0, 1]]), 640, 480)
+        rng = np.random.default_rng(2)
+        dists = rng.uniform(1, 10, (3, 480, 640)).astype(np.float32)
+
+        depths = bproc.postprocessing.dist2depth(dists)
+        self.assertEqual(depths.shape, dists.shape)
+        xs, ys = np.meshgrid(np.arange(640), np.arange(480))
+        expected_depth = dists[1] * 500 / np.sqrt((xs - 320.3) ** 2 + (ys - 240.7) ** 2 + 500 ** 2)
+        np.testing.assert_allclose(bproc.postprocessing.dist2depth(dists[1]), expected_depth, rtol=1e-6)
+        np.testing.assert_allclose(depths[1], expected_depth, rtol=1e-6)
+        np.testing.assert_allclose(bproc.postprocessing.depth2dist(depths), dists, rtol=1e-6)